@@ -38,6 +38,30 @@ async function copyData() {
       { recursive: true }
     );
     console.log('words_by_starting_letter copied!');
+
+    // Copy 'words_by_starting_letter_compact' directory
+    await fs.cp(
+      join(sourceDir, 'words_by_starting_letter_compact'),
+      join(destDir, 'words_by_starting_letter_compact'),
+      { recursive: true }
+    );
+    console.log('words_by_starting_letter_compact copied!');
+
+    // Copy 'alphagram_shards' directory
+    await fs.cp(
+      join(sourceDir, 'alphagram_shards'),
+      join(destDir, 'alphagram_shards'),
+      { recursive: true }
+    );
+    console.log('alphagram_shards copied!');
+
+    // Copy 'membership_filter' directory
+    await fs.cp(
+      join(sourceDir, 'membership_filter'),
+      join(destDir, 'membership_filter'),
+      { recursive: true }
+    );
+    console.log('membership_filter copied!');
   } catch (err) {
     console.error('Error during copy:', err.message);
   }
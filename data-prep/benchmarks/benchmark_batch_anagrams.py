@@ -0,0 +1,73 @@
+import json
+import random
+import time
+
+from lexicon.anagram_engine import AnagramEngine
+from lexicon.batch_anagram_solver import BatchAnagramSolver, normalize_rack
+from split_scrabble_data_for_web import group_words_by_alphagram
+from utils.greek_letters import BLANK_TILE_COUNT, TILE_COUNTS
+
+
+def draw_racks(count, rack_size=7, seed=2024):
+    """
+    Draw a seeded sample of racks from a full tile bag, blank tiles included.
+
+    :param count: Number of racks
+    :param rack_size: Number of tiles per rack
+    :param seed: Random seed
+    :return: List of racks
+    """
+    bag = [letter for letter, tile_count in TILE_COUNTS.items() for _ in range(tile_count)] + ["*"] * BLANK_TILE_COUNT
+    rng = random.Random(seed)
+    return ["".join(rng.sample(bag, rack_size)) for _ in range(count)]
+
+
+def run_benchmark(input_file="assets/data/json/scrabble_words_2_to_8_chars.json", racks=20000, checked=300):
+    """
+    Compare solving a batch of racks one by one with the anagram engine, and with the batch solver
+    without and with its memo table, and check a sample of the batch results against the engine.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param racks: Number of racks in the batch
+    :param checked: Number of racks also solved with the anagram engine and compared
+    :return: Dictionary with the racks per second of every method, the memo statistics and the number of mismatches
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    batch = [normalize_rack(rack) for rack in draw_racks(racks)]
+    grouped_words_by_alphagram = group_words_by_alphagram(data)
+
+    def racks_per_second(solve, sample):
+        start_time = time.perf_counter()
+        results = [solve(rack) for rack in sample]
+        return len(sample) / (time.perf_counter() - start_time), results
+
+    anagram_engine = AnagramEngine(data)
+    engine_rate, engine_results = racks_per_second(anagram_engine.search, batch[:checked])
+
+    no_memo_solver = BatchAnagramSolver(grouped_words_by_alphagram, memo_size=0)
+    no_memo_rate, _ = racks_per_second(no_memo_solver.solve, batch[:checked])
+
+    solver = BatchAnagramSolver(grouped_words_by_alphagram)
+    # Deduplicated and sorted, as solve_anagram_racks.py sends them to its workers
+    distinct = sorted(set(batch))
+    memo_rate, solved = racks_per_second(solver.solve, distinct)
+    memo_rate *= len(batch) / len(distinct)
+    results = dict(zip(distinct, solved))
+    mismatches = sum(results[rack] != expected for rack, expected in zip(batch, engine_results))
+
+    print(f"{len(batch)} racks ({len(distinct)} distinct, {sum('*' in rack for rack in batch)} with blanks)")
+    print(f"Anagram engine, one by one:  {engine_rate:>8.0f} racks/s")
+    print(f"Batch solver, no memo:       {no_memo_rate:>8.0f} racks/s")
+    print(f"Batch solver, memo:          {memo_rate:>8.0f} racks/s ({solver.memo.stats()})")
+    print(f"{mismatches} mismatches out of {checked} checked racks")
+    if mismatches:
+        raise SystemExit(1)
+    return {
+        "engine_racks_per_second": engine_rate, "no_memo_racks_per_second": no_memo_rate,
+        "memo_racks_per_second": memo_rate, "memo": solver.memo.stats(), "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import time
+
+from split_scrabble_data_for_web import expand_compact_words
+
+
+def run_benchmark(web_data_dir="assets/web_data", repeat=5):
+    """
+    Compare the size and load time of the full and compact per-letter files.
+
+    A compact file is timed twice: parsing only (enough to validate words, with the metadata of the
+    few words that have it at hand) and parsing plus rebuilding the full entries with their derived
+    fields. The rebuilt entries are checked against the full file.
+
+    :param web_data_dir: Directory holding the exported web data
+    :param repeat: Number of loads per file (the best time is kept)
+    :return: List of result rows (letter, full bytes, compact bytes, full parse ms, compact parse ms,
+        compact parse and rebuild ms)
+    """
+    full_dir = os.path.join(web_data_dir, "words_by_starting_letter")
+    compact_dir = os.path.join(web_data_dir, "words_by_starting_letter_compact")
+    letters = sorted(
+        file_name[len("words_starting_with_"):-len("_min.json")]
+        for file_name in os.listdir(full_dir) if file_name.endswith("_min.json"))
+
+    def best_load_ms(file_path, load):
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        best_ms = float("inf")
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            loaded = load(content)
+            best_ms = min(best_ms, (time.perf_counter() - start_time) * 1000)
+        return loaded, best_ms
+
+    rows = []
+    print(f"{'letter':<8} {'full KB':>10} {'compact KB':>11} {'full ms':>9} {'compact ms':>11} {'rebuild ms':>11}")
+    for letter in letters:
+        full_file = os.path.join(full_dir, f"words_starting_with_{letter}_min.json")
+        compact_file = os.path.join(compact_dir, f"words_starting_with_{letter}_compact_min.json")
+
+        full_entries, full_ms = best_load_ms(full_file, json.loads)
+        _, compact_ms = best_load_ms(compact_file, json.loads)
+        rebuilt_entries, rebuild_ms = best_load_ms(
+            compact_file, lambda content: expand_compact_words(json.loads(content)))
+        if rebuilt_entries != full_entries:
+            raise SystemExit(f"The compact file of letter {letter} does not rebuild the full entries")
+
+        row = (letter, os.path.getsize(full_file), os.path.getsize(compact_file), full_ms, compact_ms, rebuild_ms)
+        rows.append(row)
+        print(f"{letter:<8} {row[1] / 1024:>10.1f} {row[2] / 1024:>11.1f} {full_ms:>9.1f} {compact_ms:>11.1f} "
+              f"{rebuild_ms:>11.1f}")
+
+    full_bytes, compact_bytes, full_ms, compact_ms, rebuild_ms = (
+        sum(row[column] for row in rows) for column in range(1, 6))
+    print(f"\nTotal: {full_bytes / 2 ** 20:.1f} MB -> {compact_bytes / 2 ** 20:.1f} MB "
+          f"({(1 - compact_bytes / full_bytes) * 100:.0f}% smaller), parse {full_ms:.0f} ms -> {compact_ms:.0f} ms "
+          f"({(1 - compact_ms / full_ms) * 100:.0f}% faster), parse and rebuild {rebuild_ms:.0f} ms")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the full and compact per-letter web files.")
+    parser.add_argument("--web-data-dir", default="assets/web_data", help="Directory holding the exported web data")
+    args = parser.parse_args()
+
+    run_benchmark(args.web_data_dir)
@@ -0,0 +1,91 @@
+import json
+import re
+import time
+from collections import Counter
+
+from lexicon.dawg import ANY_LETTER, ANY_SEQUENCE, WILDCARD, LexiconIndex
+
+
+def time_query(func, *args, repeat=5):
+    """
+    Time a query function, keeping the best of several runs.
+
+    :param func: The query function
+    :param args: Arguments passed to the query function
+    :param repeat: Number of runs
+    :return: Tuple of (best time in milliseconds, query result)
+    """
+    best_ms = float("inf")
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func(*args)
+        best_ms = min(best_ms, (time.perf_counter() - start_time) * 1000)
+    return best_ms, result
+
+
+def scan_prefix(words, prefix):
+    """Linear scan equivalent of LexiconIndex.prefix."""
+    return [word for word in words if word.startswith(prefix)]
+
+
+def scan_pattern(words, pattern):
+    """Linear scan equivalent of LexiconIndex.pattern."""
+    regex = re.compile("".join(
+        "." if character == ANY_LETTER else ".*" if character == ANY_SEQUENCE else re.escape(character)
+        for character in pattern) + "$")
+    return [word for word in words if regex.match(word)]
+
+
+def scan_rack(words, rack):
+    """Linear scan equivalent of LexiconIndex.rack."""
+    tiles = Counter(rack.replace(WILDCARD, ""))
+    blanks = rack.count(WILDCARD)
+    return [
+        word for word in words
+        if len(word) >= 2 and sum(max(count - tiles[letter], 0) for letter, count in Counter(word).items()) <= blanks
+    ]
+
+
+def run_benchmark(input_file="assets/data/json/scrabble_words_2_to_8_chars.json"):
+    """
+    Compare lexicon index (DAWG) queries with a linear scan of the word list and check that both return the same words.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :return: List of result rows (query type, query, matches, DAWG ms, scan ms)
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        words = [entry["word"] for entry in json.load(f)]
+
+    start_time = time.perf_counter()
+    lexicon_index = LexiconIndex.from_words(words)
+    print(f"Lexicon index built in {time.perf_counter() - start_time:.2f} s "
+          f"({lexicon_index.forward.node_count} + {lexicon_index.backward.node_count} nodes)\n")
+
+    queries = [
+        ("prefix", "ΠΡΟΣ", lexicon_index.prefix, scan_prefix),
+        ("prefix", "ΨΑ", lexicon_index.prefix, scan_prefix),
+        ("suffix", "ΘΗΚΑ", lexicon_index.suffix, lambda words, suffix: scan_pattern(words, ANY_SEQUENCE + suffix)),
+        ("pattern", "*Ρ?ΣΗ", lexicon_index.pattern, scan_pattern),
+        ("pattern", "Α?Ε??Σ", lexicon_index.pattern, scan_pattern),
+        ("pattern", "??Ξ*Ω", lexicon_index.pattern, scan_pattern),
+        ("pattern", "*ΨΑ*", lexicon_index.pattern, scan_pattern),
+        ("rack", "ΑΕΡΙΣΤΟ", lexicon_index.rack, scan_rack),
+        ("rack", "ΑΕΡΙΣΤ*", lexicon_index.rack, scan_rack),
+    ]
+
+    rows = []
+    print(f"{'query':<8} {'argument':<10} {'matches':>8} {'DAWG ms':>10} {'scan ms':>10} {'speed-up':>9}")
+    for query_type, argument, dawg_query, scan_query in queries:
+        dawg_ms, dawg_result = time_query(dawg_query, argument)
+        scan_ms, scan_result = time_query(scan_query, words, argument, repeat=1)
+        if sorted(dawg_result) != sorted(scan_result):
+            print(f"Mismatch for {query_type} '{argument}': {len(dawg_result)} vs {len(scan_result)} words")
+        rows.append((query_type, argument, len(dawg_result), dawg_ms, scan_ms))
+        print(f"{query_type:<8} {argument:<10} {len(dawg_result):>8} {dawg_ms:>10.2f} {scan_ms:>10.2f} {scan_ms / dawg_ms:>8.1f}x")
+
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,65 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+from extractors.extract_scrabble_words_from_pdf import EXTRACTION_MODES, extract_pages_words
+
+
+def run_benchmark(
+        pdf_path="assets/pdf/scrabble-acceptable-greek-words-2-8-2024_09_01.pdf",
+        start_page=4,
+        end_page=463,
+        debug_dumps=False):
+    """
+    Time every text extraction mode on the word list PDF and check that they all extract the same words.
+
+    :param pdf_path: Path to the PDF file
+    :param start_page: The starting page number (1-based)
+    :param end_page: The ending page number (1-based, inclusive)
+    :param debug_dumps: Whether to also write the per-page debug dumps (to a temporary directory)
+    :return: List of result rows (mode, words extracted, unique words, seconds, pages per second)
+    """
+    page_indexes = range(start_page - 1, end_page)
+    dump_dir = tempfile.mkdtemp(prefix="extraction_dumps_") if debug_dumps else None
+
+    rows = []
+    word_sets = {}
+    try:
+        print(f"{'mode':<10} {'words':>9} {'unique':>9} {'seconds':>9} {'pages/s':>9}")
+        for mode in EXTRACTION_MODES:
+            start_time = time.perf_counter()
+            page_results = extract_pages_words(pdf_path, page_indexes, dump_dir, mode)
+            elapsed = time.perf_counter() - start_time
+
+            words = [word for _, page_words in page_results for word in page_words]
+            word_sets[mode] = set(words)
+            rows.append((mode, len(words), len(word_sets[mode]), elapsed, len(page_indexes) / elapsed))
+            print(f"{mode:<10} {len(words):>9} {len(word_sets[mode]):>9} {elapsed:>9.2f} "
+                  f"{len(page_indexes) / elapsed:>9.1f}")
+    finally:
+        if dump_dir:
+            shutil.rmtree(dump_dir, ignore_errors=True)
+
+    reference_mode = next(iter(EXTRACTION_MODES))
+    mismatches = [mode for mode in word_sets if word_sets[mode] != word_sets[reference_mode]]
+    for mode in mismatches:
+        missing = sorted(word_sets[reference_mode] - word_sets[mode])
+        extra = sorted(word_sets[mode] - word_sets[reference_mode])
+        print(f"Mode '{mode}' differs from '{reference_mode}': {len(missing)} missing {missing[:5]}, "
+              f"{len(extra)} extra {extra[:5]}")
+    if mismatches:
+        raise SystemExit(1)
+    print(f"\nAll {len(word_sets)} modes extract the same {len(word_sets[reference_mode])} words")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text extraction modes of the word list.")
+    parser.add_argument("--start-page", type=int, default=4, help="First page to extract (default: 4)")
+    parser.add_argument("--end-page", type=int, default=463, help="Last page to extract (default: 463)")
+    parser.add_argument("--debug-dumps", action="store_true",
+                        help="Also write the per-page debug dumps, through the background writer")
+    args = parser.parse_args()
+
+    run_benchmark(start_page=args.start_page, end_page=args.end_page, debug_dumps=args.debug_dumps)
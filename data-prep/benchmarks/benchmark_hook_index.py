@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from export_binary_lexicon import export_binary_lexicon
+from lexicon.binary_lexicon import BinaryLexicon
+from lexicon.hook_index import HookIndex
+from processors.build_hook_index import build_hook_index
+
+
+def scan_extensions(words, word):
+    """Linear scan equivalent of HookIndex.lookup: the words one letter longer that contain the word in order."""
+    hooks = {"front": set(), "back": set(), "insert": set()}
+    extensions = []
+    for candidate in words:
+        if len(candidate) != len(word) + 1:
+            continue
+        positions = [
+            position for position in range(len(candidate))
+            if candidate[:position] + candidate[position + 1:] == word
+        ]
+        if not positions:
+            continue
+        extensions.append(candidate)
+        for position in positions:
+            kind = "front" if position == 0 else "back" if position == len(word) else "insert"
+            hooks[kind].add(candidate[position])
+    return {**{kind: "".join(sorted(letters)) for kind, letters in hooks.items()}, "extensions": sorted(extensions)}
+
+
+def run_benchmark(input_file="assets/data/json/scrabble_words_2_to_8_chars.json", lookups=20000, checked=50, seed=2024):
+    """
+    Time building the hook index and looking up the hooks of words, and check a sample against a linear scan.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param lookups: Number of timed lookups
+    :param checked: Number of those words also answered with a linear scan and compared
+    :param seed: Random seed for the sampled words
+    :return: Dictionary with the build time, the index size, the lookup times and the number of mismatches
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    words = [entry["word"] for entry in data]
+    sample = random.Random(seed).choices(words, k=lookups)
+
+    work_dir = tempfile.mkdtemp(prefix="hook_index_")
+    try:
+        lexicon_file = os.path.join(work_dir, "scrabble_lexicon.bin")
+        hook_index_file = os.path.join(work_dir, "scrabble_hooks.bin")
+        export_binary_lexicon(data, lexicon_file)
+
+        start_time = time.perf_counter()
+        build_hook_index(output_file=hook_index_file, data=data)
+        build_seconds = time.perf_counter() - start_time
+
+        with BinaryLexicon(lexicon_file) as lexicon, HookIndex(hook_index_file) as hook_index:
+            word_ids = [lexicon.index_of(word) for word in sample]
+            start_time = time.perf_counter()
+            for word_id in word_ids:
+                hook_index.masks(word_id)
+            masks_us = (time.perf_counter() - start_time) / lookups * 1e6
+
+            start_time = time.perf_counter()
+            for word in sample:
+                hook_index.lookup(word, lexicon)
+            lookup_us = (time.perf_counter() - start_time) / lookups * 1e6
+
+            start_time = time.perf_counter()
+            mismatches = [word for word in sample[:checked] if hook_index.lookup(word, lexicon) != scan_extensions(words, word)]
+            scan_ms = (time.perf_counter() - start_time) / checked * 1000
+
+        index_size = os.path.getsize(hook_index_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\nBuilt in {build_seconds:.2f} s, {index_size} bytes ({index_size / len(words):.1f} bytes per word)")
+    print(f"Masks of a word ID:        {masks_us:>8.2f} us")
+    print(f"Hooks and extensions:      {lookup_us:>8.2f} us")
+    print(f"Linear scan (and compare): {scan_ms * 1000:>8.0f} us")
+    print(f"{len(mismatches)} mismatches out of {checked} checked words {mismatches[:5]}")
+    if mismatches:
+        raise SystemExit(1)
+    return {
+        "build_seconds": build_seconds, "index_bytes": index_size, "masks_us": masks_us, "lookup_us": lookup_us,
+        "scan_ms": scan_ms, "mismatches": len(mismatches),
+    }
+
+
+if __name__ == "__main__":
+    run_benchmark()
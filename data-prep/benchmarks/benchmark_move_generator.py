@@ -0,0 +1,124 @@
+import argparse
+import json
+import random
+import time
+
+from lexicon.gaddag import Gaddag
+from lexicon.move_generator import RACK_SIZE, WILDCARD, Board, MoveGenerator, format_move
+from utils.greek_letters import BLANK_TILE_COUNT, TILE_COUNTS
+
+
+# Target time to find the best moves of a position
+TARGET_MS = 1000
+
+
+def record_positions(move_generator, output_file, games=4, turns=(0, 2, 5, 9, 14), seed=2024):
+    """
+    Record benchmark positions from seeded self-play games, where each player plays the highest scoring move.
+
+    At every recorded turn the rack is given both blank tiles (the worst case for move generation)
+    and the best score is stored, so later runs can check that the generator still finds it.
+
+    :param move_generator: The move generator
+    :param output_file: Path to the positions JSON file
+    :param games: Number of self-play games
+    :param turns: Turns at which a position is recorded
+    :param seed: Random seed for the tile bag
+    :return: List of recorded positions
+    """
+    rng = random.Random(seed)
+    positions = []
+
+    for game in range(games):
+        bag = [letter for letter, count in TILE_COUNTS.items() for _ in range(count)]
+        rng.shuffle(bag)
+        board = Board()
+        rack = ""
+
+        for turn in range(max(turns) + 1):
+            while len(rack) < RACK_SIZE and bag:
+                rack += bag.pop()
+
+            if turn in turns:
+                blank_rack = rack[:RACK_SIZE - BLANK_TILE_COUNT] + WILDCARD * BLANK_TILE_COUNT
+                best_moves = move_generator.best_moves(board, blank_rack, count=1)
+                positions.append({
+                    "name": f"game {game + 1}, turn {turn + 1}",
+                    "board": board.to_rows(),
+                    "rack": blank_rack,
+                    "best_score": best_moves[0]["score"] if best_moves else 0,
+                })
+
+            best_moves = move_generator.best_moves(board, rack, count=1)
+            if not best_moves:
+                break
+            board.play(best_moves[0])
+            for _, _, letter, _ in best_moves[0]["tiles"]:
+                rack = rack.replace(letter, "", 1)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(positions, f, ensure_ascii=False, indent=4)
+    print(f"{len(positions)} positions saved to {output_file}")
+    return positions
+
+
+def run_benchmark(
+        positions_file="benchmarks/move_generator_positions.json",
+        gaddag_file="assets/data/bin/scrabble_words.gaddag",
+        count=10,
+        repeat=3,
+        record=False):
+    """
+    Time the move generator on the recorded positions and check that it still finds the recorded best scores.
+
+    :param positions_file: Path to the positions JSON file
+    :param gaddag_file: Path to the GADDAG file
+    :param count: Number of best moves to find per position
+    :param repeat: Number of runs per position (the best time is kept)
+    :param record: Whether to record new positions first
+    :return: List of result rows (position name, rack, moves found, best move, best time in milliseconds)
+    """
+    start_time = time.perf_counter()
+    move_generator = MoveGenerator(Gaddag.load(gaddag_file))
+    print(f"GADDAG loaded in {(time.perf_counter() - start_time) * 1000:.1f} ms\n")
+
+    if record:
+        record_positions(move_generator, positions_file)
+
+    with open(positions_file, "r", encoding="utf-8") as f:
+        positions = json.load(f)
+
+    rows = []
+    print(f"{'position':<18} {'rack':<8} {'best move':<28} {'ms':>8}")
+    for position in positions:
+        board = Board.from_rows(position["board"])
+
+        best_ms = float("inf")
+        best_moves = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            best_moves = move_generator.best_moves(board, position["rack"], count=count)
+            best_ms = min(best_ms, (time.perf_counter() - start_time) * 1000)
+
+        best_move = format_move(best_moves[0]) if best_moves else "-"
+        rows.append((position["name"], position["rack"], len(best_moves), best_move, best_ms))
+        print(f"{position['name']:<18} {position['rack']:<8} {best_move:<28} {best_ms:>8.1f}"
+              f"{'  SLOW' if best_ms > TARGET_MS else ''}")
+
+        best_score = best_moves[0]["score"] if best_moves else 0
+        if best_score != position["best_score"]:
+            print(f"  Best score changed: {best_score} (recorded {position['best_score']})")
+
+    times = sorted(row[-1] for row in rows)
+    print(f"\nTop {count} moves: median {times[len(times) // 2]:.1f} ms, max {times[-1]:.1f} ms "
+          f"(target {TARGET_MS} ms)")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the GADDAG move generator on recorded positions.")
+    parser.add_argument("--record", action="store_true", help="Record new positions from seeded self-play first")
+    parser.add_argument("--count", type=int, default=10, help="Number of best moves to find per position")
+    args = parser.parse_args()
+
+    run_benchmark(count=args.count, record=args.record)
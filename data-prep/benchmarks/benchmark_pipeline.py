@@ -0,0 +1,369 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from lexicon.anagram_engine import AnagramEngine
+from processors.build_hook_index import build_hook_index
+from processors.merge_scrabble_words_with_references import merge_scrabble_words_with_refs
+from processors.preprocess_scrabble_data import preprocess_scrabble_data
+from split_scrabble_data_for_web import split_data_by_alphagram, split_data_by_starting_letter
+from utils.greek_letters import GREEK_LETTERS
+from utils.helpers import save_to_json
+
+
+# Number of words in the real lexicon (scale 1x)
+REAL_LEXICON_SIZE = 162531
+
+# Share of each word length and frequency of each letter in the real lexicon
+LENGTH_DISTRIBUTION = {
+    2: 0.00066, 3: 0.00346, 4: 0.01872, 5: 0.05929, 6: 0.14555, 7: 0.28606, 8: 0.48626,
+}
+LETTER_FREQUENCIES = {
+    'Α': 0.1223, 'Β': 0.0113, 'Γ': 0.0191, 'Δ': 0.0180, 'Ε': 0.1056, 'Ζ': 0.0113, 'Η': 0.0309, 'Θ': 0.0129,
+    'Ι': 0.0807, 'Κ': 0.0389, 'Λ': 0.0351, 'Μ': 0.0347, 'Ν': 0.0604, 'Ξ': 0.0111, 'Ο': 0.0754, 'Π': 0.0303,
+    'Ρ': 0.0484, 'Σ': 0.0767, 'Τ': 0.0539, 'Υ': 0.0481, 'Φ': 0.0149, 'Χ': 0.0142, 'Ψ': 0.0065, 'Ω': 0.0391,
+}
+
+# Share of the words that have a word ref entry (lemma, dictionary, comments) in the real lexicon
+REF_SHARE = 0.0096
+DICTIONARIES = ["ΜΠΑΜΠ", "ΤΡΙΑΝ", "ΜΠΑΜΠ, ΤΡΙΑΝ"]
+
+# Number of lookups timed by the query benchmarks
+VALIDATION_LOOKUPS = 20000
+ANAGRAM_RACKS = 500
+ANAGRAM_ENGINE_RACKS = 50
+
+# Relative drop in throughput (or growth in peak memory) reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Operations timed at every scale, in the order they run (each one uses the files of the previous ones)
+OPERATIONS = [
+    "merge_words_with_refs",
+    "preprocess",
+    "hooks",
+    "split_by_starting_letter",
+    "split_by_alphagram",
+    "validate_words",
+    "anagram_lookup",
+    "anagram_engine",
+]
+
+
+def random_word(rng, length):
+    """Random word of the given length, with letters drawn by their frequency in the real lexicon."""
+    return "".join(rng.choices(GREEK_LETTERS, weights=[LETTER_FREQUENCIES[letter] for letter in GREEK_LETTERS], k=length))
+
+
+def generate_lexicon(word_count, seed=0):
+    """
+    Generate a synthetic lexicon that follows the alphabet, letter frequencies and length distribution of the real one.
+
+    Short lengths have few possible words (576 two-letter words), so at most half of them are used and the
+    remaining words are given the longest length.
+
+    :param word_count: Number of words to generate
+    :param seed: Random seed
+    :return: Tuple of (words, refs): the sorted word list and the word ref entries of some of the words
+    """
+    rng = random.Random(seed)
+    words = set()
+    lengths = sorted(LENGTH_DISTRIBUTION)
+    for length in lengths:
+        if length == lengths[-1]:
+            target = word_count - len(words)
+        else:
+            target = min(round(word_count * LENGTH_DISTRIBUTION[length]), len(GREEK_LETTERS) ** length // 2)
+        length_words = set()
+        while len(length_words) < target:
+            length_words.add(random_word(rng, length))
+        words |= length_words
+    words = sorted(words)
+
+    refs = [
+        {
+            "word": word,
+            "lemma": rng.choice(["", word[:-1] + "Σ", word]),
+            "dictionary": rng.choice(DICTIONARIES),
+            "comments": rng.choice(["", "διπλή γραφή", "πίνακας σελ. 627"]),
+        }
+        for word in rng.sample(words, round(len(words) * REF_SHARE))
+    ]
+    return words, refs
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of the current process.
+
+    On Linux this is read from /proc, as getrusage() keeps the peak of the parent process across fork and exec.
+    """
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024  # Kilobytes on Linux
+
+
+def load_json(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_operation(name, work_dir, seed):
+    """
+    Run one benchmarked operation on the files of a scale directory.
+
+    Runs in a fresh process, so the peak memory is that of the operation alone (including its input data).
+    Loading the inputs is not timed.
+
+    :param name: The operation name (see OPERATIONS)
+    :param work_dir: The scale directory, with the generated lexicon and the outputs of the previous operations
+    :param seed: Random seed for the queries
+    :return: Dictionary with the timed seconds, the number of records (or lookups) processed, the number of
+             words found by the queries and the peak RSS
+    """
+    rng = random.Random(seed)
+    matches = None
+    words_file = os.path.join(work_dir, "scrabble_words_raw.json")
+    refs_file = os.path.join(work_dir, "scrabble_word_refs.json")
+    merged_file = os.path.join(work_dir, "merged_scrabble_words_with_refs.json")
+    processed_file = os.path.join(work_dir, "scrabble_words_2_to_8_chars.json")
+    words_by_letter_dir = os.path.join(work_dir, "web_data", "words_by_starting_letter")
+    words_by_alphagram_dir = os.path.join(work_dir, "web_data", "words_by_alphagram")
+
+    if name == "merge_words_with_refs":
+        words, refs = load_json(words_file)["words"], load_json(refs_file)
+        start_time = time.perf_counter()
+        merged = merge_scrabble_words_with_refs(output_file=None, words=words, refs=refs)
+        seconds = time.perf_counter() - start_time
+        save_to_json(merged_file, merged)
+        records = len(words)
+
+    elif name == "preprocess":
+        merged = load_json(merged_file)
+        start_time = time.perf_counter()
+        preprocess_scrabble_data(
+            output_words_file=processed_file,
+            output_stats_file=os.path.join(work_dir, "scrabble_words_2_to_8_chars_metadata.json"),
+            data=merged)
+        seconds = time.perf_counter() - start_time
+        records = len(merged)
+
+    elif name == "hooks":
+        data = load_json(processed_file)
+        start_time = time.perf_counter()
+        build_hook_index(output_file=os.path.join(work_dir, "scrabble_hooks.bin"), data=data)
+        seconds = time.perf_counter() - start_time
+        records = len(data)
+
+    elif name in ("split_by_starting_letter", "split_by_alphagram"):
+        data = load_json(processed_file)
+        output_dir = words_by_letter_dir if name == "split_by_starting_letter" else words_by_alphagram_dir
+        os.makedirs(output_dir, exist_ok=True)
+        split = split_data_by_starting_letter if name == "split_by_starting_letter" else split_data_by_alphagram
+        start_time = time.perf_counter()
+        split(data, output_dir)
+        seconds = time.perf_counter() - start_time
+        records = len(data)
+
+    elif name == "validate_words":
+        # Half existing words, half random strings; the per-letter files are loaded on demand, as in the web app
+        words = load_json(words_file)["words"]
+        queries = rng.sample(words, min(VALIDATION_LOOKUPS // 2, len(words)))
+        queries += [random_word(rng, rng.randint(2, 8)) for _ in range(VALIDATION_LOOKUPS // 2)]
+        rng.shuffle(queries)
+        del words
+
+        start_time = time.perf_counter()
+        words_by_letter = {}
+        matches = 0
+        for word in queries:
+            letter = word[0]
+            if letter not in words_by_letter:
+                letter_file = os.path.join(words_by_letter_dir, f"words_starting_with_{letter}_min.json")
+                words_by_letter[letter] = (
+                    {entry["word"] for entry in load_json(letter_file)} if os.path.exists(letter_file) else set())
+            matches += word in words_by_letter[letter]
+        seconds = time.perf_counter() - start_time
+        records = len(queries)
+
+    elif name == "anagram_lookup":
+        # Every sub-rack of a 7-letter rack is looked up in the alphagram file
+        racks = [random_word(rng, 7) for _ in range(ANAGRAM_RACKS)]
+        start_time = time.perf_counter()
+        words_by_alphagram = load_json(os.path.join(words_by_alphagram_dir, "words_grouped_by_alphagram_min.json"))
+        matches = 0
+        for rack in racks:
+            letters = sorted(rack)
+            alphagrams = {
+                "".join(sub_rack)
+                for length in range(2, len(letters) + 1)
+                for sub_rack in combinations(letters, length)}
+            matches += sum(len(words_by_alphagram.get(alphagram, ())) for alphagram in alphagrams)
+        seconds = time.perf_counter() - start_time
+        records = len(racks)
+
+    elif name == "anagram_engine":
+        # Racks with one blank tile, searched with the letter-count-vector engine (building it is timed too)
+        racks = [random_word(rng, 6) + "*" for _ in range(ANAGRAM_ENGINE_RACKS)]
+        data = load_json(processed_file)
+        start_time = time.perf_counter()
+        anagram_engine = AnagramEngine(data)
+        matches = 0
+        for rack in racks:
+            matches += sum(len(words) for words in anagram_engine.search(rack).values())
+        seconds = time.perf_counter() - start_time
+        records = len(racks)
+
+    else:
+        raise ValueError(f"Unknown operation: {name}")
+
+    return {"seconds": round(seconds, 4), "records": records, "matches": matches, "peak_rss_bytes": peak_rss_bytes()}
+
+
+def run_scale(scale, work_dir, seed=0):
+    """
+    Generate the lexicon of a scale and run every operation on it, each one in a fresh process.
+
+    :param scale: Multiple of the real lexicon size
+    :param work_dir: Directory where the generated and produced files are written
+    :param seed: Random seed
+    :return: Dictionary mapping each operation name to its metrics
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    word_count = REAL_LEXICON_SIZE * scale
+
+    start_time = time.perf_counter()
+    words, refs = generate_lexicon(word_count, seed)
+    save_to_json(os.path.join(work_dir, "scrabble_words_raw.json"), {"words": words})
+    save_to_json(os.path.join(work_dir, "scrabble_word_refs.json"), refs)
+    print(f"Generated {len(words)} words and {len(refs)} word refs ({scale}x) in {time.perf_counter() - start_time:.1f} s")
+    del words, refs
+
+    results = {}
+    spawn_context = multiprocessing.get_context("spawn")
+    for name in OPERATIONS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as executor:
+            metrics = executor.submit(run_operation, name, work_dir, seed).result()
+        metrics["throughput"] = round(metrics["records"] / metrics["seconds"], 1) if metrics["seconds"] else None
+        results[name] = metrics
+        print(f"  {name:<26} {metrics['seconds']:>9.3f} s {metrics['throughput']:>14,.0f} /s "
+              f"{metrics['peak_rss_bytes'] / 2 ** 20:>9.1f} MB")
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Flag the operations whose throughput dropped, or whose peak memory grew, by more than the tolerance.
+
+    :param results: Benchmark results ({scale: {operation: metrics}})
+    :param baseline: Baseline results, in the same format
+    :param tolerance: Allowed relative change
+    :return: List of regression messages
+    """
+    regressions = []
+    for scale, operations in results.items():
+        for name, metrics in operations.items():
+            baseline_metrics = baseline.get(scale, {}).get(name)
+            if not baseline_metrics:
+                continue
+
+            if metrics["throughput"] < baseline_metrics["throughput"] * (1 - tolerance):
+                regressions.append(
+                    f"{scale} {name}: throughput {metrics['throughput']:,.0f}/s "
+                    f"vs {baseline_metrics['throughput']:,.0f}/s in the baseline")
+            if metrics["peak_rss_bytes"] > baseline_metrics["peak_rss_bytes"] * (1 + tolerance):
+                regressions.append(
+                    f"{scale} {name}: peak memory {metrics['peak_rss_bytes'] / 2 ** 20:.1f} MB "
+                    f"vs {baseline_metrics['peak_rss_bytes'] / 2 ** 20:.1f} MB in the baseline")
+    return regressions
+
+
+def run_benchmark(
+        scales=(1, 10),
+        baseline_file="benchmarks/results/pipeline_baseline.json",
+        results_file="benchmarks/results/pipeline_latest.json",
+        work_dir=None,
+        update_baseline=False,
+        tolerance=DEFAULT_TOLERANCE,
+        seed=0):
+    """
+    Run the pipeline and query benchmarks on synthetic lexicons and compare them with the stored baseline.
+
+    The baseline is only written when asked to, so later runs are compared with it. Scales that are not in
+    the baseline are reported without a comparison.
+
+    :param scales: Multiples of the real lexicon size to benchmark
+    :param baseline_file: Path to the baseline JSON file
+    :param results_file: Path to the JSON file with the results of this run
+    :param work_dir: Directory for the generated files (None uses a temporary directory, removed afterwards)
+    :param update_baseline: Store the results of this run in the baseline, replacing those of the same scales
+    :param tolerance: Allowed relative drop in throughput (or growth in peak memory)
+    :param seed: Random seed
+    :return: List of regression messages (empty if there are none)
+    """
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="benchmark_pipeline_")
+
+    results = {}
+    try:
+        for scale in scales:
+            print(f"\nScale {scale}x ({REAL_LEXICON_SIZE * scale:,} words)")
+            results[f"{scale}x"] = run_scale(scale, os.path.join(work_dir, f"scale_{scale}x"), seed)
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(results_file) or ".", exist_ok=True)
+    save_to_json(results_file, results)
+
+    baseline = {}
+    if os.path.exists(baseline_file):
+        baseline = load_json(baseline_file)
+
+    regressions = [] if update_baseline else compare_with_baseline(results, baseline, tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline_file} (tolerance {tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+    elif baseline and not update_baseline:
+        print(f"\nNo regressions against {baseline_file}")
+
+    new_scales = [scale for scale in results if scale not in baseline]
+    if update_baseline:
+        save_to_json(baseline_file, {**baseline, **results})
+    elif new_scales:
+        print(f"\nNo baseline for {', '.join(new_scales)}: their results are in {results_file} "
+              f"(run with --update-baseline to add them to {baseline_file})")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages and query paths on synthetic lexicons.")
+    parser.add_argument("--scales", default="1,10",
+                        help="Comma-separated multiples of the real lexicon size (default: 1,10)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results of this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative throughput drop or memory growth reported as a regression (default: 0.25)")
+    parser.add_argument("--work-dir", help="Keep the generated files in this directory instead of a temporary one")
+    args = parser.parse_args()
+
+    found_regressions = run_benchmark(
+        scales=[int(scale) for scale in args.scales.split(",")],
+        work_dir=args.work_dir,
+        update_baseline=args.update_baseline,
+        tolerance=args.tolerance)
+    sys.exit(1 if found_regressions else 0)
@@ -0,0 +1,131 @@
+import argparse
+import filecmp
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.benchmark_pipeline import REAL_LEXICON_SIZE, generate_lexicon, peak_rss_bytes
+from processors.merge_scrabble_words_with_references import (
+    merge_scrabble_words_with_refs, merge_scrabble_words_with_refs_streaming)
+from processors.preprocess_scrabble_data import preprocess_scrabble_data, preprocess_scrabble_data_streaming
+from split_scrabble_data_for_web import export_web_data, export_web_data_streaming
+from utils.helpers import save_to_json
+
+
+MODES = ["in_memory", "streaming"]
+
+
+def run_mode(mode, work_dir):
+    """
+    Merge the words with their refs, preprocess them and export the web data, in memory or in streaming mode.
+
+    Runs in a fresh process, so the peak memory is that of the run alone.
+
+    :param mode: "in_memory" or "streaming"
+    :param work_dir: The scale directory, with the generated lexicon
+    :return: Dictionary with the seconds and the peak RSS
+    """
+    words_file = os.path.join(work_dir, "scrabble_words_raw.json")
+    refs_file = os.path.join(work_dir, "scrabble_word_refs.json")
+    output_dir = os.path.join(work_dir, mode)
+    os.makedirs(output_dir, exist_ok=True)
+    processed_file = os.path.join(output_dir, "scrabble_words_2_to_8_chars.json")
+    stats_file = os.path.join(output_dir, "scrabble_words_2_to_8_chars_metadata.json")
+    web_output_dir = os.path.join(output_dir, "web_data")
+
+    start_time = time.perf_counter()
+    if mode == "in_memory":
+        with open(words_file, "r", encoding="utf-8") as f:
+            words = json.load(f)["words"]
+        with open(refs_file, "r", encoding="utf-8") as f:
+            refs = json.load(f)
+        merged = merge_scrabble_words_with_refs(output_file=None, words=words, refs=refs)
+        processed = preprocess_scrabble_data(
+            output_words_file=processed_file, output_stats_file=stats_file, data=merged)
+        export_web_data(processed, web_output_dir, compression_formats=())
+    else:
+        merged = merge_scrabble_words_with_refs_streaming(
+            dict_file=words_file,
+            fixed_file=refs_file,
+            output_file=os.path.join(output_dir, "merged_scrabble_words_with_refs.ndjson"),
+            spill_dir=output_dir)
+        preprocess_scrabble_data_streaming(
+            output_words_file=processed_file, output_stats_file=stats_file, data=merged)
+        export_web_data_streaming(processed_file, web_output_dir, compression_formats=())
+    seconds = time.perf_counter() - start_time
+
+    return {"seconds": round(seconds, 2), "peak_rss_bytes": peak_rss_bytes()}
+
+
+def same_outputs(work_dir):
+    """Whether both modes wrote the same processed words, statistics and web data files."""
+    first, second = (os.path.join(work_dir, mode) for mode in MODES)
+    for name in ("scrabble_words_2_to_8_chars.json", "scrabble_words_2_to_8_chars_metadata.json"):
+        if not filecmp.cmp(os.path.join(first, name), os.path.join(second, name), shallow=False):
+            return False
+
+    def same_dirs(comparison):
+        if comparison.left_only or comparison.right_only or comparison.funny_files:
+            return False
+        _, mismatch, errors = filecmp.cmpfiles(
+            comparison.left, comparison.right, comparison.common_files, shallow=False)
+        return not mismatch and not errors and all(same_dirs(sub) for sub in comparison.subdirs.values())
+
+    return same_dirs(filecmp.dircmp(os.path.join(first, "web_data"), os.path.join(second, "web_data")))
+
+
+def run_benchmark(scales=(1, 4), work_dir=None, seed=0):
+    """
+    Compare the peak memory of the in-memory and streaming processing at growing lexicon sizes.
+
+    :param scales: Multiples of the real lexicon size
+    :param work_dir: Directory for the generated and produced files (None uses a temporary directory, removed after)
+    :param seed: Random seed of the generated lexicons
+    :return: Dictionary mapping each scale to the metrics of each mode
+    """
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="streaming_benchmark_")
+    spawn_context = multiprocessing.get_context("spawn")
+    results = {}
+    try:
+        print(f"{'scale':>6} {'words':>10} {'mode':<10} {'seconds':>9} {'peak MB':>9}")
+        for scale in scales:
+            scale_dir = os.path.join(work_dir, f"{scale}x")
+            os.makedirs(scale_dir, exist_ok=True)
+            words, refs = generate_lexicon(REAL_LEXICON_SIZE * scale, seed)
+            save_to_json(os.path.join(scale_dir, "scrabble_words_raw.json"), {"words": words})
+            save_to_json(os.path.join(scale_dir, "scrabble_word_refs.json"), refs)
+            del words, refs
+
+            results[f"{scale}x"] = {}
+            for mode in MODES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as executor:
+                    metrics = executor.submit(run_mode, mode, scale_dir).result()
+                results[f"{scale}x"][mode] = metrics
+                print(f"{scale:>5}x {REAL_LEXICON_SIZE * scale:>10} {mode:<10} {metrics['seconds']:>9.1f} "
+                      f"{metrics['peak_rss_bytes'] / 2 ** 20:>9.1f}")
+
+            identical = same_outputs(scale_dir)
+            results[f"{scale}x"]["identical_outputs"] = identical
+            print(f"{'':>17} outputs {'identical' if identical else 'DIFFER'}")
+            if not identical:
+                raise SystemExit(1)
+            shutil.rmtree(scale_dir)
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the peak memory of the in-memory and streaming processing.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4],
+                        help="Multiples of the real lexicon size to run (default: 1 4)")
+    parser.add_argument("--work-dir", help="Directory for the generated and produced files (default: a temporary one)")
+    args = parser.parse_args()
+
+    run_benchmark(scales=args.scales, work_dir=args.work_dir)
@@ -0,0 +1,110 @@
+import json
+import random
+import statistics
+import time
+
+from lexicon.suggestions import MAX_EDIT_DISTANCE, SuggestionEngine
+from utils.greek_letters import GREEK_LETTERS
+
+
+def edit_distance(first, second):
+    """Levenshtein distance between two words (insertions, deletions and substitutions)."""
+    previous = list(range(len(second) + 1))
+    for row, first_letter in enumerate(first, start=1):
+        current = [row]
+        for column, second_letter in enumerate(second, start=1):
+            current.append(min(
+                previous[column - 1] + (first_letter != second_letter),
+                previous[column] + 1,
+                current[column - 1] + 1,
+            ))
+        previous = current
+    return previous[-1]
+
+
+def scan_matches(words, word, max_distance):
+    """Full scan equivalent of SuggestionEngine.matches."""
+    matches = {}
+    for candidate in words:
+        if abs(len(candidate) - len(word)) <= max_distance:
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                matches[candidate] = distance
+    return matches
+
+
+def make_typos(words, count, seed=2024):
+    """
+    Make a seeded sample of misspelled words: one or two random substitutions, insertions,
+    deletions or swaps of neighbouring letters applied to lexicon words.
+
+    :param words: The lexicon words
+    :param count: Number of typos
+    :param seed: Random seed
+    :return: List of typos
+    """
+    rng = random.Random(seed)
+    typos = []
+    while len(typos) < count:
+        typo = list(rng.choice(words))
+        for _ in range(rng.randint(1, 2)):
+            position = rng.randrange(len(typo))
+            edit = rng.choice(("substitute", "insert", "delete", "swap"))
+            if edit == "substitute":
+                typo[position] = rng.choice(GREEK_LETTERS)
+            elif edit == "insert":
+                typo.insert(position, rng.choice(GREEK_LETTERS))
+            elif edit == "delete" and len(typo) > 2:
+                del typo[position]
+            elif edit == "swap" and position + 1 < len(typo):
+                typo[position], typo[position + 1] = typo[position + 1], typo[position]
+        typos.append("".join(typo))
+    return typos
+
+
+def run_benchmark(input_file="assets/data/json/scrabble_words_2_to_8_chars.json", queries=500, checked=25):
+    """
+    Time suggestion queries at every edit distance, and check a subset of them against a full scan.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param queries: Number of misspelled words queried per edit distance
+    :param checked: Number of those queries also answered with a full scan and compared
+    :return: List of result rows (max distance, mean matches, mean ms, p50 ms, p95 ms, scan ms, mismatches)
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    words = [entry["word"] for entry in data]
+
+    start_time = time.perf_counter()
+    suggestion_engine = SuggestionEngine.from_data(data)
+    print(f"Suggestion engine built in {time.perf_counter() - start_time:.2f} s "
+          f"({suggestion_engine.dawg.node_count} DAWG nodes)\n")
+
+    typos = make_typos(words, queries)
+    rows = []
+    print(f"{'distance':>8} {'matches':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'scan ms':>9} {'mismatches':>10}")
+    for max_distance in range(1, MAX_EDIT_DISTANCE + 1):
+        latencies = []
+        match_counts = []
+        for typo in typos:
+            start_time = time.perf_counter()
+            match_counts.append(len(suggestion_engine.matches(typo, max_distance)))
+            latencies.append((time.perf_counter() - start_time) * 1000)
+
+        mismatches = 0
+        start_time = time.perf_counter()
+        for typo in typos[:checked]:
+            mismatches += scan_matches(words, typo, max_distance) != suggestion_engine.matches(typo, max_distance)
+        scan_ms = (time.perf_counter() - start_time) * 1000 / checked
+
+        latencies.sort()
+        row = (max_distance, statistics.mean(match_counts), statistics.mean(latencies),
+               latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], scan_ms, mismatches)
+        rows.append(row)
+        print(f"{row[0]:>8} {row[1]:>8.1f} {row[2]:>8.2f} {row[3]:>8.2f} {row[4]:>8.2f} {row[5]:>9.1f} {row[6]:>10}")
+
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,309 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from lexicon.anagram_engine import AnagramEngine
+from lexicon.rack_stats import (
+    FORMAT_VERSION, MAGIC, RACK_KEY_DTYPE, RACK_SIZES, SECTIONS, TABLES, RackStats, table_name,
+)
+from lexicon.sectioned_file import write_sectioned_file
+from utils.greek_letters import GREEK_LETTERS, LETTER_CODES, MAX_WORD_LENGTH, TILE_COUNTS, decode_word
+from utils.stage_cache import hash_file
+
+
+# Tile limit of every letter code (index 0 is the zero padding, which is never drawn)
+TILE_LIMITS = np.array([0] + [TILE_COUNTS[letter] for letter in GREEK_LETTERS], dtype=np.uint8)
+
+# Sorted alphagram keys and word counts per word length, set up once per worker process by init_worker
+_worker_alphagrams = None
+
+
+def alphagram_counts(data, length):
+    """
+    Count the words of a length per alphagram.
+
+    :param data: The processed word entries
+    :param length: The word length
+    :return: Tuple of (sorted unique alphagram keys as uint64, number of words with each alphagram)
+    """
+    alphagrams = [entry["alphagram"] for entry in data if entry["length"] == length]
+    rows = np.zeros((len(alphagrams), MAX_WORD_LENGTH), dtype=np.uint8)
+    for row, alphagram in zip(rows, alphagrams):
+        row[:length] = [LETTER_CODES[letter] for letter in alphagram]
+    return np.unique(rack_keys(rows), return_counts=True)
+
+
+def rack_keys(rows):
+    """
+    Convert racks to sortable keys.
+
+    :param rows: (racks x 8) uint8 array of sorted, zero-padded letter codes
+    :return: Array of the racks as native uint64, in the same order as the racks' bytes
+    """
+    return np.ascontiguousarray(rows).view(RACK_KEY_DTYPE).ravel().astype(np.uint64)
+
+
+def drawable_racks(rack_size, first_code):
+    """
+    Enumerate the multisets of letters drawable from the tile bag whose lowest letter is the given one.
+
+    The racks are grown one letter at a time, keeping every row sorted: a row can only be extended
+    with a letter at least as high as its last one, and only while the bag still has that letter.
+    Each step handles all the rows at once, one letter at a time.
+
+    :param rack_size: Number of letters of the racks
+    :param first_code: Letter code of the lowest letter of the racks
+    :return: (racks x 8) uint8 array of sorted, zero-padded letter codes
+    """
+    rows = np.zeros((1, MAX_WORD_LENGTH), dtype=np.uint8)
+    rows[0, 0] = first_code
+    for position in range(1, rack_size):
+        last = rows[:, position - 1]
+        extended = []
+        for code in range(first_code, len(TILE_LIMITS)):
+            used = (rows[:, :position] == code).sum(axis=1)
+            extendable = rows[(last <= code) & (used < TILE_LIMITS[code])]
+            extendable[:, position] = code
+            extended.append(extendable)
+        rows = np.concatenate(extended)
+    return rows
+
+
+def init_worker(alphagrams):
+    """
+    Set up the alphagram counts in a worker process.
+
+    :param alphagrams: Dictionary mapping each word length to its alphagram keys and counts
+    :return: None
+    """
+    global _worker_alphagrams
+    _worker_alphagrams = alphagrams
+
+
+def count_words(rows, alphagrams):
+    """
+    Look up how many words are anagrams of every rack.
+
+    :param rows: (racks x 8) uint8 array of sorted, zero-padded letter codes
+    :param alphagrams: Tuple of (sorted alphagram keys, word counts) for the racks' length
+    :return: Array of the word count of every rack
+    """
+    keys, counts = alphagrams
+    wanted = rack_keys(rows)
+    indexes = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return np.where(keys[indexes] == wanted, counts[indexes], 0)
+
+
+def count_partition(rack_size, blank, first_code, checkpoint_file, alphagrams=None):
+    """
+    Count the bingos of every drawable rack of a size and lowest letter, and checkpoint the result.
+
+    A rack of n letters forms the words of length n with its alphagram. A rack of n - 1 letters
+    plus one blank forms, for every letter the blank can stand for, the words whose alphagram is
+    the rack plus that letter; every word is counted once, as the letter it adds is fixed.
+
+    :param rack_size: Number of tiles of the racks (7 or 8)
+    :param blank: Whether the racks hold one blank
+    :param first_code: Letter code of the lowest letter of the racks
+    :param checkpoint_file: Path of the partition's checkpoint file
+    :param alphagrams: Alphagram counts per word length (defaults to the ones set up by init_worker)
+    :return: Tuple of (number of drawable racks, number of racks with at least one bingo)
+    """
+    alphagrams = (alphagrams or _worker_alphagrams)[rack_size]
+    letter_count = rack_size - 1 if blank else rack_size
+    rows = drawable_racks(letter_count, first_code)
+
+    if blank:
+        counts = np.zeros(len(rows), dtype=np.int64)
+        extended = rows.copy()
+        for code in range(1, len(TILE_LIMITS)):
+            extended[:, letter_count] = code
+            extended[:, :rack_size].sort(axis=1)
+            counts += count_words(extended, alphagrams)
+            extended[:] = rows
+    else:
+        counts = count_words(rows, alphagrams)
+
+    # Keep the racks with bingos only, sorted by key so the partitions can be concatenated
+    with_bingos = np.flatnonzero(counts)
+    order = np.argsort(rack_keys(rows[with_bingos]), kind="stable")
+    racks = rows[with_bingos][order]
+    bingo_counts = counts[with_bingos][order].astype(np.uint16)
+
+    # Write to a temporary file first, so a crash never leaves a partial checkpoint behind
+    temporary_file = f"{checkpoint_file}.tmp"
+    with open(temporary_file, "wb") as f:
+        np.savez(f, racks=racks, counts=bingo_counts, total=np.array([len(rows)]))
+    os.replace(temporary_file, checkpoint_file)
+    return len(rows), len(racks)
+
+
+def partition_file(checkpoint_dir, rack_size, blank, first_code):
+    """Path of the checkpoint file of a partition."""
+    return os.path.join(checkpoint_dir, f"{table_name(rack_size, blank)}_{first_code:02d}.npz")
+
+
+def build_rack_stats(
+        input_file="assets/data/json/scrabble_words_2_to_8_chars.json",
+        output_file="assets/data/bin/scrabble_rack_stats.bin",
+        checkpoint_dir="assets/data/bin/rack_stats_checkpoints",
+        workers=None):
+    """
+    Build the rack statistics file: the number of bingos of every drawable rack of 7 and 8 tiles.
+
+    The racks are enumerated in partitions (one per table and lowest letter) on a process pool.
+    Every finished partition is saved to the checkpoint directory, which is tied to the content of
+    the input file: after a crash, running the build again only counts the missing partitions.
+    The checkpoints are removed once the file is written.
+
+    See lexicon/rack_stats.py for the file layout.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param output_file: Path to the rack statistics file
+    :param checkpoint_dir: Directory for the per-partition checkpoints
+    :param workers: Number of worker processes (defaults to the number of CPUs)
+    :return: Dictionary mapping each table to its number of drawable racks and racks with bingos
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Checkpoints left by a build over another edition of the lexicon cannot be reused
+    lexicon_hash = hash_file(input_file)
+    hash_file_path = os.path.join(checkpoint_dir, "lexicon.sha256")
+    if os.path.exists(hash_file_path):
+        with open(hash_file_path, "r", encoding="utf-8") as f:
+            if f.read().strip() != lexicon_hash:
+                print(f"Discarding checkpoints of another lexicon in {checkpoint_dir}")
+                shutil.rmtree(checkpoint_dir)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(hash_file_path, "w", encoding="utf-8") as f:
+        f.write(lexicon_hash)
+
+    partitions = [
+        (rack_size, blank, first_code)
+        for rack_size in RACK_SIZES for blank in (False, True) for first_code in range(1, len(GREEK_LETTERS) + 1)
+    ]
+    pending = [partition for partition in partitions if not os.path.exists(partition_file(checkpoint_dir, *partition))]
+    print(f"Rack statistics: {len(partitions) - len(pending)} of {len(partitions)} partitions already checkpointed")
+
+    if pending:
+        alphagrams = {rack_size: alphagram_counts(data, rack_size) for rack_size in RACK_SIZES}
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(alphagrams,)) as executor:
+            # Largest partitions (lowest first letters of the 8-tile tables) first, to balance the workers
+            futures = {
+                executor.submit(count_partition, *partition, partition_file(checkpoint_dir, *partition)): partition
+                for partition in sorted(pending, key=lambda partition: (-partition[0], partition[2]))
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                rack_size, blank, first_code = futures[future]
+                total, with_bingos = future.result()
+                print(f"  [{done}/{len(futures)}] {table_name(rack_size, blank)} {GREEK_LETTERS[first_code - 1]}: "
+                      f"{total} racks, {with_bingos} with bingos ({time.perf_counter() - start_time:.1f} s)")
+
+    # Merge the checkpoints: partitions in letter order are already in key order
+    sections = {}
+    totals = {}
+    for rack_size in RACK_SIZES:
+        for blank in (False, True):
+            name = table_name(rack_size, blank)
+            racks, counts, total = [], [], 0
+            for first_code in range(1, len(GREEK_LETTERS) + 1):
+                with np.load(partition_file(checkpoint_dir, rack_size, blank, first_code)) as checkpoint:
+                    racks.append(checkpoint["racks"])
+                    counts.append(checkpoint["counts"])
+                    total += int(checkpoint["total"][0])
+            sections[f"racks_{name}"] = np.concatenate(racks).tobytes()
+            sections[f"counts_{name}"] = np.concatenate(counts).astype("<u2").tobytes()
+            totals[name] = {"racks": total, "with_bingos": sum(len(table_racks) for table_racks in racks)}
+    sections["totals"] = np.array([totals[name]["racks"] for name in TABLES], dtype="<u4").tobytes()
+
+    word_count = sum(entry["length"] in RACK_SIZES for entry in data)
+    write_sectioned_file(output_file, MAGIC, FORMAT_VERSION, word_count, [sections[name] for name in SECTIONS])
+
+    shutil.rmtree(checkpoint_dir)
+    for name in TABLES:
+        print(f"  {name}: {totals[name]['racks']} drawable racks, {totals[name]['with_bingos']} with bingos")
+    print(f"Rack statistics saved to {output_file} ({os.path.getsize(output_file)} bytes)")
+    return totals
+
+
+def verify_rack_stats(stats_file, input_file, samples=200, seed=2024):
+    """
+    Check a seeded sample of racks from the rack statistics file against the anagram engine.
+
+    Half the racks of every table are taken from the file (racks with bingos), half are drawn
+    from the tile bag (mostly racks without bingos).
+
+    :param stats_file: Path to the rack statistics file
+    :param input_file: Path to the processed lexicon JSON file
+    :param samples: Number of racks checked per table
+    :param seed: Random seed for the sample
+    :return: List of (rack, stored count, engine count) tuples for the racks that do not match
+    """
+    rng = random.Random(seed)
+    anagram_engine = AnagramEngine.from_json_file(input_file)
+    bag = [letter for letter in GREEK_LETTERS for _ in range(TILE_COUNTS[letter])]
+
+    mismatches = []
+    with RackStats(stats_file) as rack_stats:
+        for rack_size in RACK_SIZES:
+            for blank in (False, True):
+                keys, _ = rack_stats.table(rack_size, blank)
+                letter_count = rack_size - blank
+                racks = [
+                    decode_word(int(keys[rng.randrange(len(keys))]).to_bytes(MAX_WORD_LENGTH, "big"))
+                    for _ in range(samples // 2)
+                ] + ["".join(rng.sample(bag, letter_count)) for _ in range(samples - samples // 2)]
+                racks = [rack + "*" * blank for rack in racks]
+                for rack, stored in zip(racks, rack_stats.bingo_counts(racks)):
+                    expected = len(anagram_engine.search(rack, rack_size).get(rack_size, []))
+                    if stored != expected:
+                        mismatches.append((rack, stored, expected))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the bingo counts of every drawable rack of 7 and 8 tiles.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--checkpoint-dir", default="assets/data/bin/rack_stats_checkpoints",
+                        help="Directory for the per-partition checkpoints; an interrupted build resumes from them")
+    args = parser.parse_args()
+
+    # File paths
+    final_scrabble_words_json_file = "assets/data/json/scrabble_words_2_to_8_chars.json"
+    rack_stats_file = "assets/data/bin/scrabble_rack_stats.bin"
+
+    start_time = time.perf_counter()
+    build_rack_stats(final_scrabble_words_json_file, rack_stats_file, args.checkpoint_dir, args.workers)
+    print(f"Built in {time.perf_counter() - start_time:.1f} s")
+
+    with RackStats(rack_stats_file) as loaded_stats:
+        example_racks = ["ΑΕΙΝΡΣΤ", "ΑΕΙΝΡΣ*", "ΑΕΙΚΝΟΣΤ", "ΑΕΙΚΝΟΣ*"]
+        for rack, count in zip(example_racks, loaded_stats.bingo_counts(example_racks)):
+            print(f"{rack}: {count} bingos")
+
+        # Time single lookups, then the same racks as one batch
+        timed_racks = example_racks * 1000
+        start_time = time.perf_counter()
+        for rack in timed_racks:
+            loaded_stats.bingo_count(rack)
+        single_us = (time.perf_counter() - start_time) / len(timed_racks) * 1e6
+        start_time = time.perf_counter()
+        loaded_stats.bingo_counts(timed_racks)
+        batch_us = (time.perf_counter() - start_time) / len(timed_racks) * 1e6
+    print(f"{single_us:.1f} us per lookup, {batch_us:.1f} us per rack in a batch")
+
+    verification_mismatches = verify_rack_stats(rack_stats_file, final_scrabble_words_json_file)
+    for rack, stored, expected in verification_mismatches:
+        print(f"Mismatch for {rack}: {stored} stored, {expected} from the anagram engine")
+    if verification_mismatches:
+        raise SystemExit("The rack statistics do not match the anagram engine")
+    print("Sampled racks match the anagram engine")
@@ -0,0 +1,256 @@
+import argparse
+import hashlib
+import json
+import os
+
+from processors.preprocess_scrabble_data import add_derived_fields
+
+
+# Fields stored in the delta files; the other fields (alphagram, length, points) are derived from the word
+DELTA_FIELDS = ["word", "lemma", "dictionary", "comments"]
+DELTA_FORMAT_VERSION = 1
+DELTA_MANIFEST_FILE = "delta_manifest.json"
+
+
+def shard_of(word):
+    """Shard of a word: its starting letter, as in the words_by_starting_letter web files."""
+    return word[0].upper()
+
+
+def shard_checksum(entries):
+    """
+    SHA-256 checksum of a shard, computed over its minified JSON (the content of its _min.json web file).
+
+    :param entries: The word entries of the shard
+    :return: The hex digest
+    """
+    content = json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def group_by_shard(data):
+    """
+    Group the word entries by shard, keeping their order.
+
+    :param data: The processed word entries
+    :return: Dictionary mapping each shard to its entries
+    """
+    shards = {}
+    for entry in data:
+        shards.setdefault(shard_of(entry["word"]), []).append(entry)
+    return shards
+
+
+def diff_lexicons(old_data, new_data):
+    """
+    Compare two processed lexicons with a sorted merge over their words.
+
+    Both lexicons are sorted by word, as the pipeline writes them, so the diff walks each of them
+    once. A word present in both editions is modified when any of its fields differs.
+
+    :param old_data: The processed word entries of the old edition
+    :param new_data: The processed word entries of the new edition
+    :return: Dictionary mapping each changed shard to its "add", "remove" and "modify" lists
+    """
+    old_data = sorted(old_data, key=lambda entry: entry["word"])
+    new_data = sorted(new_data, key=lambda entry: entry["word"])
+    changes = {}
+
+    def shard_changes(word):
+        return changes.setdefault(shard_of(word), {"add": [], "remove": [], "modify": []})
+
+    old_index = new_index = 0
+    while old_index < len(old_data) or new_index < len(new_data):
+        old_entry = old_data[old_index] if old_index < len(old_data) else None
+        new_entry = new_data[new_index] if new_index < len(new_data) else None
+
+        if new_entry is None or (old_entry is not None and old_entry["word"] < new_entry["word"]):
+            shard_changes(old_entry["word"])["remove"].append(old_entry["word"])
+            old_index += 1
+        elif old_entry is None or new_entry["word"] < old_entry["word"]:
+            shard_changes(new_entry["word"])["add"].append(new_entry)
+            new_index += 1
+        else:
+            if old_entry != new_entry:
+                shard_changes(new_entry["word"])["modify"].append(new_entry)
+            old_index += 1
+            new_index += 1
+
+    return changes
+
+
+def build_deltas(old_data, new_data, from_version, to_version):
+    """
+    Build the per-shard delta patches that turn the old edition into the new one.
+
+    Added and modified entries are stored as rows of DELTA_FIELDS values, removed entries as words.
+    Every delta carries the versions it applies between and the checksum of the shard it rebuilds.
+
+    :param old_data: The processed word entries of the old edition
+    :param new_data: The processed word entries of the new edition
+    :param from_version: Version number of the old edition
+    :param to_version: Version number of the new edition
+    :return: Dictionary mapping each changed shard to its delta
+    """
+    new_shards = group_by_shard(sorted(new_data, key=lambda entry: entry["word"]))
+    deltas = {}
+    for shard, changes in sorted(diff_lexicons(old_data, new_data).items()):
+        deltas[shard] = {
+            "format": DELTA_FORMAT_VERSION,
+            "shard": shard,
+            "from_version": from_version,
+            "to_version": to_version,
+            "fields": DELTA_FIELDS,
+            "add": [[entry[field] for field in DELTA_FIELDS] for entry in changes["add"]],
+            "remove": changes["remove"],
+            "modify": [[entry[field] for field in DELTA_FIELDS] for entry in changes["modify"]],
+            "sha256": shard_checksum(new_shards.get(shard, [])),
+        }
+    return deltas
+
+
+def write_deltas(deltas, output_dir, from_version, to_version):
+    """
+    Write every delta to its own minified JSON file, plus a manifest listing them.
+
+    :param deltas: The deltas, as returned by build_deltas
+    :param output_dir: Directory where the delta files should be saved
+    :param from_version: Version number of the old edition
+    :param to_version: Version number of the new edition
+    :return: The manifest
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shards = {}
+    for shard, delta in deltas.items():
+        file_name = f"delta_{from_version}_to_{to_version}_{shard}.json"
+        content = json.dumps(delta, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+        with open(os.path.join(output_dir, file_name), "wb") as f:
+            f.write(content)
+        shards[shard] = {
+            "file": file_name,
+            "add": len(delta["add"]),
+            "remove": len(delta["remove"]),
+            "modify": len(delta["modify"]),
+            "bytes": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+    manifest = {
+        "format": DELTA_FORMAT_VERSION,
+        "from_version": from_version,
+        "to_version": to_version,
+        "shards": shards,
+    }
+    with open(os.path.join(output_dir, DELTA_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_deltas(delta_dir):
+    """
+    Load the deltas listed in a delta manifest, checking the checksum of every file.
+
+    :param delta_dir: Directory holding the delta manifest and files
+    :return: Dictionary mapping each changed shard to its delta
+    """
+    with open(os.path.join(delta_dir, DELTA_MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    deltas = {}
+    for shard, shard_info in manifest["shards"].items():
+        with open(os.path.join(delta_dir, shard_info["file"]), "rb") as f:
+            content = f.read()
+        if hashlib.sha256(content).hexdigest() != shard_info["sha256"]:
+            raise ValueError(f"Checksum mismatch for delta file {shard_info['file']}")
+        deltas[shard] = json.loads(content)
+    return deltas
+
+
+def apply_shard_delta(old_entries, delta):
+    """
+    Rebuild a shard of the new edition from the shard of the old edition and its delta.
+
+    :param old_entries: The word entries of the old shard, sorted by word
+    :param delta: The delta of the shard
+    :return: The word entries of the new shard, sorted by word
+    """
+    removed = set(delta["remove"])
+    rows = [dict(zip(delta["fields"], row)) for row in delta["modify"] + delta["add"]]
+    changed = {entry["word"]: add_derived_fields(entry) for entry in rows}
+
+    # Merge the kept (possibly modified) old entries with the added ones, in word order
+    kept = [changed.pop(entry["word"], entry) for entry in old_entries if entry["word"] not in removed]
+    added = sorted(changed.values(), key=lambda entry: entry["word"])
+    new_entries = []
+    kept_index = added_index = 0
+    while kept_index < len(kept) or added_index < len(added):
+        if added_index == len(added) or (
+                kept_index < len(kept) and kept[kept_index]["word"] < added[added_index]["word"]):
+            new_entries.append(kept[kept_index])
+            kept_index += 1
+        else:
+            new_entries.append(added[added_index])
+            added_index += 1
+
+    if shard_checksum(new_entries) != delta["sha256"]:
+        raise ValueError(f"Shard {delta['shard']} does not match the version {delta['to_version']} checksum")
+    return new_entries
+
+
+def apply_deltas(old_data, deltas, from_version):
+    """
+    Rebuild the new edition from the old edition and the deltas of its changed shards.
+
+    :param old_data: The processed word entries of the old edition, sorted by word
+    :param deltas: Dictionary mapping each changed shard to its delta
+    :param from_version: Version number of the old edition
+    :return: The processed word entries of the new edition, sorted by word
+    """
+    shards = group_by_shard(old_data)
+    for shard, delta in deltas.items():
+        if delta["from_version"] != from_version:
+            raise ValueError(
+                f"Delta of shard {shard} applies to version {delta['from_version']}, not version {from_version}")
+        shards[shard] = apply_shard_delta(shards.get(shard, []), delta)
+
+    return [entry for shard in sorted(shards) for entry in shards[shard]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Diff two editions of the processed lexicon and write per-shard delta patches.")
+    parser.add_argument("old_file", help="Processed lexicon JSON file of the old edition")
+    parser.add_argument("new_file", help="Processed lexicon JSON file of the new edition")
+    parser.add_argument("--from-version", type=int, required=True, help="Version number of the old edition")
+    parser.add_argument("--to-version", type=int, required=True, help="Version number of the new edition")
+    parser.add_argument("--output-dir", default="assets/data/deltas",
+                        help="Directory where the delta files are written (default: assets/data/deltas)")
+    args = parser.parse_args()
+
+    # Load the data
+    with open(args.old_file, "r", encoding="utf-8") as f:
+        old_scrabble_data = json.load(f)
+    with open(args.new_file, "r", encoding="utf-8") as f:
+        new_scrabble_data = json.load(f)
+
+    delta_dir = os.path.join(args.output_dir, f"{args.from_version}_to_{args.to_version}")
+    delta_manifest = write_deltas(
+        build_deltas(old_scrabble_data, new_scrabble_data, args.from_version, args.to_version),
+        delta_dir, args.from_version, args.to_version)
+
+    for delta_shard, delta_info in delta_manifest["shards"].items():
+        print(f"{delta_shard}: +{delta_info['add']} -{delta_info['remove']} ~{delta_info['modify']} "
+              f"({delta_info['bytes']} bytes)")
+
+    # Check that the deltas rebuild the new edition and compare their size with the full shards they replace
+    rebuilt_data = apply_deltas(old_scrabble_data, load_deltas(delta_dir), args.from_version)
+    if rebuilt_data != sorted(new_scrabble_data, key=lambda entry: entry["word"]):
+        raise SystemExit("The deltas do not rebuild the new edition")
+
+    new_shards = group_by_shard(new_scrabble_data)
+    delta_bytes = sum(delta_info["bytes"] for delta_info in delta_manifest["shards"].values())
+    full_bytes = sum(
+        len(json.dumps(new_shards.get(delta_shard, []), ensure_ascii=False, separators=(',', ':')).encode("utf-8"))
+        for delta_shard in delta_manifest["shards"])
+    print(f"Deltas from version {args.from_version} to {args.to_version} saved to {delta_dir}: "
+          f"{len(delta_manifest['shards'])} shards, {delta_bytes} bytes (full minified shards: {full_bytes} bytes)")
@@ -0,0 +1,85 @@
+import json
+import os
+import struct
+import time
+
+from lexicon.binary_lexicon import FORMAT_VERSION, MAGIC, METADATA_FIELDS, SECTIONS, BinaryLexicon
+from lexicon.sectioned_file import write_sectioned_file
+from utils.greek_letters import encode_word
+
+
+def build_binary_lexicon_sections(data):
+    """
+    Build the sections of the binary lexicon from the processed word entries.
+
+    :param data: The processed word entries (with word, lemma, dictionary, comments, alphagram, length and points)
+    :return: Tuple of (sections, word_count), where sections maps each section name to its bytes
+    """
+    entries = []
+    for entry in data:
+        word_codes = encode_word(entry["word"])
+        if word_codes is None:
+            print(f"Skipping word that cannot be encoded: {entry['word']}")
+            continue
+        entries.append((word_codes, entry))
+
+    # Sort by the encoded word, which is what the reader binary-searches on
+    entries.sort(key=lambda item: item[0])
+
+    sections = {
+        "words": b"".join(word_codes for word_codes, _ in entries),
+        "alphagrams": b"".join(encode_word(entry["alphagram"]) for _, entry in entries),
+        "lengths": bytes(entry["length"] for _, entry in entries),
+        "points": bytes(entry["points"] for _, entry in entries),
+    }
+
+    for field in METADATA_FIELDS:
+        offsets = [0]
+        strings = bytearray()
+        for _, entry in entries:
+            strings += entry.get(field, "").encode("utf-8")
+            offsets.append(len(strings))
+        sections[f"{field}_offsets"] = struct.pack(f"<{len(offsets)}I", *offsets)
+        sections[f"{field}_strings"] = bytes(strings)
+
+    return sections, len(entries)
+
+
+def export_binary_lexicon(data, output_file="assets/data/bin/scrabble_lexicon.bin"):
+    """
+    Write the processed word entries to a packed binary lexicon file.
+
+    See lexicon/binary_lexicon.py for the file layout.
+
+    :param data: The processed word entries
+    :param output_file: Path to the binary lexicon file
+    :return: None
+    """
+    sections, word_count = build_binary_lexicon_sections(data)
+
+    write_sectioned_file(output_file, MAGIC, FORMAT_VERSION, word_count, [sections[name] for name in SECTIONS])
+
+    print(f"Binary lexicon with {word_count} words saved to {output_file} ({os.path.getsize(output_file)} bytes)")
+
+
+if __name__ == "__main__":
+    # File paths
+    final_scrabble_words_json_file = "assets/data/json/scrabble_words_2_to_8_chars.json"
+    binary_lexicon_file = "assets/data/bin/scrabble_lexicon.bin"
+
+    # Load the data
+    with open(final_scrabble_words_json_file, "r", encoding="utf-8") as f:
+        scrabble_data = json.load(f)
+
+    export_binary_lexicon(scrabble_data, binary_lexicon_file)
+
+    # Check that every word can be found again and report the cold-start lookup time
+    start_time = time.perf_counter()
+    with BinaryLexicon(binary_lexicon_file) as binary_lexicon:
+        binary_lexicon.contains(scrabble_data[0]["word"])
+        cold_start_ms = (time.perf_counter() - start_time) * 1000
+        missing_words = [entry["word"] for entry in scrabble_data if not binary_lexicon.contains(entry["word"])]
+
+    print(f"Cold-start lookup: {cold_start_ms:.2f} ms")
+    if missing_words:
+        print(f"Words missing from the binary lexicon: {', '.join(missing_words[:10])} ...")
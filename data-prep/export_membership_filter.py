@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import random
+import time
+
+from lexicon.membership_filter import DEFAULT_FALSE_POSITIVE_RATE, MembershipFilter
+from utils.greek_letters import GREEK_LETTERS
+
+
+def export_membership_filter(
+        data, output_file="assets/data/bin/scrabble_words.bloom", false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+    """
+    Write a membership filter over all the processed words to a binary file.
+
+    See lexicon/membership_filter.py for the file layout.
+
+    :param data: The processed word entries
+    :param output_file: Path to the filter file
+    :param false_positive_rate: Target false positive rate, between 0 and 1
+    :return: The filter
+    """
+    membership_filter = MembershipFilter.build((entry["word"] for entry in data), false_positive_rate)
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    membership_filter.save(output_file)
+
+    print(f"Membership filter with {membership_filter.word_count} words saved to {output_file} "
+          f"({os.path.getsize(output_file)} bytes, {membership_filter.hash_count} hashes, "
+          f"target false positive rate {false_positive_rate:.2%})")
+    return membership_filter
+
+
+def verify_false_positive_rate(membership_filter, words, samples=100000, seed=2024):
+    """
+    Check a membership filter against the words it was built from.
+
+    Every word must be accepted (a filter has no false negatives). The false positive rate is
+    measured on two seeded samples of non-words: random letter strings with the length distribution
+    of the lexicon, and lexicon words with a single letter replaced (the typical typo).
+
+    :param membership_filter: The filter
+    :param words: The words the filter was built from
+    :param samples: Number of non-words per sample
+    :param seed: Random seed for the samples
+    :return: Dictionary with the false negatives and the measured false positive rate of each sample
+    """
+    word_set = set(words)
+    rng = random.Random(seed)
+    word_list = sorted(word_set)
+
+    def random_string():
+        return "".join(rng.choice(GREEK_LETTERS) for _ in range(len(rng.choice(word_list))))
+
+    def typo():
+        word = rng.choice(word_list)
+        position = rng.randrange(len(word))
+        return word[:position] + rng.choice(GREEK_LETTERS) + word[position + 1:]
+
+    results = {"false_negatives": sum(word not in membership_filter for word in word_list)}
+    for name, make_non_word in (("random", random_string), ("typo", typo)):
+        false_positives = checked = 0
+        while checked < samples:
+            non_word = make_non_word()
+            if non_word in word_set:
+                continue
+            checked += 1
+            false_positives += non_word in membership_filter
+        results[f"{name}_false_positive_rate"] = false_positives / checked
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the word membership filter and verify its false positive rate.")
+    parser.add_argument("--false-positive-rate", type=float, default=DEFAULT_FALSE_POSITIVE_RATE,
+                        help=f"Target false positive rate (default: {DEFAULT_FALSE_POSITIVE_RATE})")
+    args = parser.parse_args()
+
+    # File paths
+    final_scrabble_words_json_file = "assets/data/json/scrabble_words_2_to_8_chars.json"
+    membership_filter_file = "assets/data/bin/scrabble_words.bloom"
+
+    # Load the data
+    with open(final_scrabble_words_json_file, "r", encoding="utf-8") as f:
+        scrabble_data = json.load(f)
+
+    export_membership_filter(scrabble_data, membership_filter_file, args.false_positive_rate)
+
+    # Read the filter back and check it: no false negatives, and a false positive rate close to the target
+    start_time = time.perf_counter()
+    loaded_filter = MembershipFilter.load(membership_filter_file)
+    print(f"Filter loaded in {(time.perf_counter() - start_time) * 1000:.2f} ms")
+
+    verification = verify_false_positive_rate(loaded_filter, [entry["word"] for entry in scrabble_data])
+    print(f"False negatives: {verification['false_negatives']}")
+    for sample in ("random", "typo"):
+        print(f"False positive rate ({sample} non-words): {verification[f'{sample}_false_positive_rate']:.3%} "
+              f"(target {args.false_positive_rate:.3%})")
+
+    # Allow some sampling noise around the target rate
+    if verification["false_negatives"] or max(
+            verification["random_false_positive_rate"], verification["typo_false_positive_rate"]
+    ) > 1.5 * args.false_positive_rate:
+        raise SystemExit("The membership filter does not meet its target false positive rate")
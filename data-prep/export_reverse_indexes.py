@@ -0,0 +1,104 @@
+import json
+import os
+import struct
+import time
+
+from lexicon.binary_lexicon import BinaryLexicon, word_ids
+from lexicon.reverse_index import FORMAT_VERSION, MAGIC, SECTIONS, ReverseIndex, split_dictionaries, split_lemmas
+from lexicon.sectioned_file import write_sectioned_file
+
+
+def build_reverse_index_postings(data):
+    """
+    Build the postings of the lemma and dictionary reverse indexes.
+
+    A word whose lemma or dictionary field names several lemmas or dictionaries is posted under each
+    of them. References in the lemma field (page numbers, grammar sections) are not indexed.
+
+    :param data: The processed word entries
+    :return: Tuple of (lemma postings, dictionary postings), each mapping a normalized key to its sorted word IDs
+    """
+    lemma_postings = {}
+    dictionary_postings = {}
+    for word_id, entry in word_ids(data):
+        for lemma in split_lemmas(entry["lemma"]):
+            lemma_postings.setdefault(lemma, []).append(word_id)
+        for dictionary in split_dictionaries(entry["dictionary"]):
+            dictionary_postings.setdefault(dictionary, []).append(word_id)
+    return lemma_postings, dictionary_postings
+
+
+def export_reverse_index(postings, output_file):
+    """
+    Write a reverse index to a packed binary file.
+
+    See lexicon/reverse_index.py for the file layout.
+
+    :param postings: Dictionary mapping each key to its sorted word IDs
+    :param output_file: Path to the reverse index file
+    :return: None
+    """
+    keys = sorted(postings, key=lambda key: key.encode("utf-8"))
+
+    key_offsets = [0]
+    key_strings = bytearray()
+    posting_offsets = [0]
+    all_postings = []
+    for key in keys:
+        key_strings += key.encode("utf-8")
+        key_offsets.append(len(key_strings))
+        all_postings.extend(sorted(postings[key]))
+        posting_offsets.append(len(all_postings))
+
+    sections = {
+        "key_offsets": struct.pack(f"<{len(key_offsets)}I", *key_offsets),
+        "key_strings": bytes(key_strings),
+        "posting_offsets": struct.pack(f"<{len(posting_offsets)}I", *posting_offsets),
+        "postings": struct.pack(f"<{len(all_postings)}I", *all_postings),
+    }
+
+    write_sectioned_file(output_file, MAGIC, FORMAT_VERSION, len(keys), [sections[name] for name in SECTIONS])
+
+    print(f"Reverse index with {len(keys)} keys and {len(all_postings)} postings saved to {output_file} "
+          f"({os.path.getsize(output_file)} bytes)")
+
+
+if __name__ == "__main__":
+    # File paths
+    final_scrabble_words_json_file = "assets/data/json/scrabble_words_2_to_8_chars.json"
+    binary_lexicon_file = "assets/data/bin/scrabble_lexicon.bin"
+    lemma_index_file = "assets/data/bin/scrabble_lemma_index.bin"
+    dictionary_index_file = "assets/data/bin/scrabble_dictionary_index.bin"
+
+    # Load the data
+    with open(final_scrabble_words_json_file, "r", encoding="utf-8") as f:
+        scrabble_data = json.load(f)
+
+    lemma_postings, dictionary_postings = build_reverse_index_postings(scrabble_data)
+    export_reverse_index(lemma_postings, lemma_index_file)
+    export_reverse_index(dictionary_postings, dictionary_index_file)
+
+    # Check every key against a full scan and report the lookup time
+    for index_file, postings in ((lemma_index_file, lemma_postings), (dictionary_index_file, dictionary_postings)):
+        with ReverseIndex(index_file) as reverse_index:
+            start_time = time.perf_counter()
+            mismatches = [key for key in postings if reverse_index.lookup(key) != postings[key]]
+            lookup_us = (time.perf_counter() - start_time) / max(len(postings), 1) * 1e6
+        print(f"{index_file}: {len(postings)} keys checked, {len(mismatches)} mismatches, {lookup_us:.1f} us per lookup")
+
+    # Every word naming several lemmas must be found under each of them
+    with ReverseIndex(lemma_index_file) as lemma_index:
+        multi_lemma_words = [(word_id, split_lemmas(entry["lemma"])) for word_id, entry in word_ids(scrabble_data)
+                             if len(split_lemmas(entry["lemma"])) > 1]
+        missing = [(word_id, lemma) for word_id, lemmas in multi_lemma_words for lemma in lemmas
+                   if word_id not in lemma_index.lookup(lemma)]
+    print(f"{len(multi_lemma_words)} words with several lemmas checked, {len(missing)} missing postings")
+    if not multi_lemma_words or missing:
+        raise SystemExit("The lemma index does not post every word under each of its lemmas")
+
+    # Resolve the word IDs of a lemma to words, as the lookups are meant to be used
+    if lemma_postings and os.path.exists(binary_lexicon_file):
+        example_lemma = max(lemma_postings, key=lambda key: len(lemma_postings[key]))
+        with ReverseIndex(lemma_index_file) as lemma_index, BinaryLexicon(binary_lexicon_file) as binary_lexicon:
+            forms = [binary_lexicon.word(word_id) for word_id in lemma_index.lookup(example_lemma)]
+        print(f"Forms of {example_lemma}: {', '.join(forms)}")
@@ -1,19 +1,188 @@
 
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 import pymupdf  # PyMuPDF
 
+from extractors.extract_scrabble_words_from_pdf import CHUNKS_PER_WORKER, split_page_range
 from utils.helpers import save_to_json, save_to_txt
 
 
+def merge_text(current, new):
+    """Helper to merge text spans."""
+    return f"{current} {new}".strip()
+
+
+def parse_page_entries(page):
+    """
+    Parse the word reference entries of a single PDF page.
+
+    Columns are identified by the x0 coordinate of the first span of every line
+    (word: 30, lemma: 102, dictionary: 185, comments: 232). Entries are built block by block,
+    so a page can be parsed independently of the pages around it.
+
+    :param page: The pymupdf page to parse
+    :return: Tuple of (entries, dictionaries), where entries is the list of parsed entries
+             and dictionaries the dictionary values seen while parsing, in page order
+    """
+    entries = []
+    dictionaries = []
+
+    """
+    Extract text blocks. Textpage content as a list of text lines grouped by block. Each list items looks like this:
+    (x0, y0, x1, y1, "lines in the block", block_no, block_type)
+    """
+    page_dict = page.get_text("dict", sort=True)
+    page_blocks = page_dict.get("blocks", [])
+
+    # Iterate through the blocks
+    for block in page_blocks:
+        # Skip first block as it includes the table headers
+        if block["number"] == 0:
+            continue
+
+        # Skip non-text blocks
+        if block["type"] != 0:
+            continue
+        
+        current_entry = {"word": "", "lemma": "", "dictionary": "", "comments": ""}
+        last_field = "word"
+
+        # Iterate through the lines and spans
+        for line in block.get("lines", []):
+            # Process the first span and check if there are multiple spans in the line
+            spans = line.get("spans", [])
+            if spans:
+                first_span = spans[0]
+                x0 = first_span["bbox"][0]
+                text = first_span["text"].strip()
+
+                # Debug known problematic cases
+                if text in {"ΑΔΗΛΟΣ, ΚΡΥΦΙΟΣ ΤΡΙΑΝ", "ΑΔΟΛΕΣΧΩ (-ΕΙΣ) ΑΔΟΛΕΣΧΙΑ"}:
+                    print("\n### Debugging Specific Case ###\n")
+                    print(f"Full Line Details: {line}\n")
+                    print(f"Line Text: {text}, x0: {x0}\n")
+                    for span in spans:
+                        print(f"Span Text: {span['text']}, x0: {span['bbox'][0]}\n")
+
+                # Identify columns based on x0 and assign values
+                if 30.00 <= x0 <= 30.99:  # Indicates a new word
+                    # Save the previous entry if not empty
+                    if current_entry["word"] and last_field != "word":
+                        entries.append(current_entry)
+                        current_entry = {"word": "", "lemma": "", "dictionary": "", "comments": ""}
+                    current_entry["word"] = merge_text(current_entry["word"], text)
+                    last_field = "word"
+
+                elif 102.00 <= x0 <= 102.99:  # Indicates lemma
+                    current_entry["lemma"] = merge_text(current_entry["lemma"], text)
+                    last_field = "lemma"
+
+                elif 185.00 <= x0 <= 185.99:  # Indicates dictionary
+                    current_entry["dictionary"] = merge_text(current_entry["dictionary"], text)
+                    dictionaries.append(current_entry["dictionary"])
+                    last_field = "dictionary"
+
+                elif 232.00 <= x0 <= 232.99:  # Indicates comment
+                    if last_field == "comments":
+                        current_entry["comments"] = merge_text(current_entry["comments"], text)
+                    else:
+                        current_entry["comments"] = text
+                    last_field = "comments"
+
+                # Merge the remaining spans (if any) to the first span's text
+                for span in spans[1:]:
+                    current_text = span["text"].strip()
+                    if current_text:
+                        current_entry[last_field] = merge_text(current_entry[last_field], current_text)
+
+        # Append the final entry
+        if current_entry["word"]:
+            entries.append(current_entry)
+
+    return entries, dictionaries
+
+
+def parse_pages_entries(pdf_path, page_indexes):
+    """
+    Parse the word reference entries of a range of PDF pages. Every call opens its own document,
+    so it can safely run inside a worker process.
+
+    :param pdf_path: Path to the PDF file
+    :param page_indexes: The page indexes to process (0-based)
+    :return: List of (page_index, entries, dictionaries) tuples, in page order
+    """
+    pdf_doc = pymupdf.open(pdf_path)
+    try:
+        return [(page_index, *parse_page_entries(pdf_doc[page_index])) for page_index in page_indexes]
+    finally:
+        pdf_doc.close()
+
+
+def record_entry(entry, word_refs, stats):
+    """
+    Append a parsed entry to the word refs and update the extraction statistics.
+
+    :param entry: The parsed entry
+    :param word_refs: The list of word refs to append the entry to
+    :param stats: The extraction statistics to update
+    :return: None
+    """
+    # Check for empty lemma
+    if not entry["lemma"]:
+        stats["entries_missing_fields"] += 1
+        stats["empty_lemma"]["count"] += 1
+        stats["empty_lemma"]["words"].append(entry["word"])
+
+    # Check for empty dictionary
+    if not entry["dictionary"]:
+        stats["entries_missing_fields"] += 1
+        stats["empty_dictionary"]["count"] += 1
+        stats["empty_dictionary"]["words"].append(entry["word"])
+
+    # Check for empty comments
+    if not entry["comments"]:
+        stats["empty_comments_count"] += 1
+
+    word_refs.append(entry)
+    stats["total_entries_extracted"] += 1
+
+
+def stitch_page_entries(page_results, stats):
+    """
+    Join the partial results of independently parsed pages into the final list of word refs.
+
+    Pages are stitched in page order and every entry is recorded exactly once, in the order
+    it appears in the document, so the word refs and statistics are the same as parsing the
+    whole document in a single pass.
+
+    :param page_results: List of (page_index, entries, dictionaries) tuples
+    :param stats: The extraction statistics to update
+    :return: List of word refs
+    """
+    word_refs = []
+    for _, entries, dictionaries in sorted(page_results, key=lambda page_result: page_result[0]):
+        stats["total_pages_processed"] += 1
+        stats["unique_dictionaries"].update(dictionaries)
+        for entry in entries:
+            record_entry(entry, word_refs, stats)
+    return word_refs
+
+
 def extract_scrabble_word_refs(
         swr_pdf_path="assets/pdf/scrabble-word-refs-2020-02-12.pdf", 
         swr_start_page=4, 
         swr_end_page=67, 
         swr_output_txt_dir="assets/data/txt/scrabble_word_refs_raw", 
         swr_output_json_file="assets/data/json/scrabble_word_refs_raw.json",
-        swr_stats_file="assets/data/txt/scrabble_word_refs_raw_stats.txt"):
+        swr_stats_file="assets/data/txt/scrabble_word_refs_raw_stats.txt",
+        workers=1):
     """
     Extract Scrabble words from a given PDF, clean up the text, and save the results.
+
+    When more than one worker is requested, the pages are parsed independently by a pool
+    of processes and the partial entries are stitched back together in page order.
     
     :param pdf_path: Path to the PDF file
     :param start_page: The starting page number (0-based index)
@@ -21,14 +190,15 @@ def extract_scrabble_word_refs(
     :param output_txt_dir: Directory where text files should be saved
     :param output_json_file: Path to the JSON file where words will be saved
     :param stats_file: Path to the text file where statistics will be saved
+    :param workers: Number of worker processes to use (1 processes the pages serially)
     :return: None
     """
 
     # Open the PDF file
-    pdf_doc = pymupdf.open(swr_pdf_path)
+    with pymupdf.open(swr_pdf_path) as pdf_doc:
+        print(f"PDF doc pages: {pdf_doc.page_count}\n")
 
-    # Containers for all the word refs and stats
-    word_refs = []
+    # Containers for the stats
     stats = {
         "total_pages_to_process": swr_end_page - swr_start_page + 1,
         "total_pages_processed": 0,
@@ -40,124 +210,17 @@ def extract_scrabble_word_refs(
         "empty_dictionary": {"count": 0, "words": []},
     }
 
-    print(f"PDF doc pages: {pdf_doc.page_count}\n")
-
-    def merge_text(current, new):
-        """Helper to merge text spans."""
-        return f"{current} {new}".strip()
-
-    # Iterate through the specified pages
-    for page_number in range(swr_start_page - 1, swr_end_page):
-        page = pdf_doc[page_number]
-        stats["total_pages_processed"] += 1
-
-        """
-        Extract text blocks. Textpage content as a list of text lines grouped by block. Each list items looks like this:
-        (x0, y0, x1, y1, "lines in the block", block_no, block_type)
-        """
-        page_dict = page.get_text("dict", sort=True)
-        page_blocks = page_dict.get("blocks", [])
-
-        # Iterate through the blocks
-        for block in page_blocks:
-            # Skip first block as it includes the table headers
-            if block["number"] == 0:
-                continue
-
-            # Skip non-text blocks
-            if block["type"] != 0:
-                continue
-            
-            current_entry = {"word": "", "lemma": "", "dictionary": "", "comments": ""}
-            last_field = "word"
-
-            # Iterate through the lines and spans
-            for line in block.get("lines", []):
-                # Process the first span and check if there are multiple spans in the line
-                spans = line.get("spans", [])
-                if spans:
-                    first_span = spans[0]
-                    x0 = first_span["bbox"][0]
-                    text = first_span["text"].strip()
-
-                    # Debug known problematic cases
-                    if text in {"ΑΔΗΛΟΣ, ΚΡΥΦΙΟΣ ΤΡΙΑΝ", "ΑΔΟΛΕΣΧΩ (-ΕΙΣ) ΑΔΟΛΕΣΧΙΑ"}:
-                        print("\n### Debugging Specific Case ###\n")
-                        print(f"Full Line Details: {line}\n")
-                        print(f"Line Text: {text}, x0: {x0}\n")
-                        for span in spans:
-                            print(f"Span Text: {span['text']}, x0: {span['bbox'][0]}\n")
-
-                    # Identify columns based on x0 and assign values
-                    if 30.00 <= x0 <= 30.99:  # Indicates a new word
-                        # Save the previous entry if not empty
-                        if current_entry["word"] and last_field != "word":
-                            # Check for empty lemma
-                            if not current_entry["lemma"]:
-                                stats["entries_missing_fields"] += 1
-                                stats["empty_lemma"]["count"] += 1
-                                stats["empty_lemma"]["words"].append(current_entry["word"])
-                            
-                            # Check for empty dictionary
-                            if not current_entry["dictionary"]:
-                                stats["entries_missing_fields"] += 1
-                                stats["empty_dictionary"]["count"] += 1
-                                stats["empty_dictionary"]["words"].append(current_entry["word"])
-                            
-                            # Check for empty comments
-                            if not current_entry["comments"]:
-                                stats["empty_comments_count"] += 1
-
-                            word_refs.append(current_entry)
-                            stats["total_entries_extracted"] += 1
-                            current_entry = {"word": "", "lemma": "", "dictionary": "", "comments": ""}
-                        current_entry["word"] = merge_text(current_entry["word"], text)
-                        last_field = "word"
-
-                    elif 102.00 <= x0 <= 102.99:  # Indicates lemma
-                        current_entry["lemma"] = merge_text(current_entry["lemma"], text)
-                        last_field = "lemma"
-
-                    elif 185.00 <= x0 <= 185.99:  # Indicates dictionary
-                        current_entry["dictionary"] = merge_text(current_entry["dictionary"], text)
-                        stats["unique_dictionaries"].add(current_entry["dictionary"])
-                        last_field = "dictionary"
-
-                    elif 232.00 <= x0 <= 232.99:  # Indicates comment
-                        if last_field == "comments":
-                            current_entry["comments"] = merge_text(current_entry["comments"], text)
-                        else:
-                            current_entry["comments"] = text
-                        last_field = "comments"
-
-                    # Merge the remaining spans (if any) to the first span's text
-                    for span in spans[1:]:
-                        current_text = span["text"].strip()
-                        if current_text:
-                            current_entry[last_field] = merge_text(current_entry[last_field], current_text)
-
-            # Append the final entry
-            if current_entry["word"]:
-                # Check for empty lemma
-                if not current_entry["lemma"]:
-                    stats["entries_missing_fields"] += 1
-                    stats["empty_lemma"]["count"] += 1
-                    stats["empty_lemma"]["words"].append(current_entry["word"])
-                
-                # Check for empty dictionary
-                if not current_entry["dictionary"]:
-                    stats["entries_missing_fields"] += 1
-                    stats["empty_dictionary"]["count"] += 1
-                    stats["empty_dictionary"]["words"].append(current_entry["word"])
-                
-                # Check for empty comments
-                if not current_entry["comments"]:
-                    stats["empty_comments_count"] += 1
-                word_refs.append(current_entry)
-                stats["total_entries_extracted"] += 1
-
-    # Close the document
-    pdf_doc.close()
+    # Parse the specified pages
+    if workers > 1:
+        page_ranges = split_page_range(swr_start_page - 1, swr_end_page, workers * CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(parse_pages_entries, repeat(swr_pdf_path), page_ranges))
+        page_results = [page_result for chunk_result in chunk_results for page_result in chunk_result]
+    else:
+        page_results = parse_pages_entries(swr_pdf_path, range(swr_start_page - 1, swr_end_page))
+
+    # Stitch the per-page entries together
+    word_refs = stitch_page_entries(page_results, stats)
 
     # Save results to JSON
     save_to_json(swr_output_json_file, word_refs)
@@ -1,18 +1,209 @@
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, repeat
 
 import pymupdf  # PyMuPDF
 
 from utils.helpers import extract_words, remove_date_text, remove_header_text, remove_page_numbers, save_to_json, save_to_txt
 
 
+# Define regex patterns for header, page number, and date
+HEADER_PATTERN = r"ΑΠΟΔΕΚΤΕΣ ΛΕΞΕΙΣ 2-8 ΓΡΑΜΜΑΤΩΝ"  # Header text
+DATE_PATTERN = r"[Α-Ωα-ωΊΪΌΆΈΎΫΉΏίϊΐόάέύϋΰήώ]+\s+\d{4}"  # Month and year
+PAGE_NUMBER_PATTERN = r"\d{1,3}" # Page number (e.g., "1", "2", etc.)
+
+# Number of page chunks handed to each worker, so that slow pages do not leave workers idle
+CHUNKS_PER_WORKER = 4
+
+
+def page_text_from_text(page):
+    """Page text as laid out by PyMuPDF's plain text extraction."""
+    return page.get_text("text")
+
+
+def page_text_from_words(page):
+    """Page text rebuilt from the extracted words, one line of the page per line of text."""
+    words = page.get_text("words")
+    # Every word is (x0, y0, x1, y1, word, block number, line number, word number)
+    return "\n".join(
+        " ".join(word[4] for word in line_words)
+        for _, line_words in groupby(words, key=lambda word: (word[5], word[6])))
+
+
+def page_text_from_blocks(page):
+    """Page text rebuilt from the text blocks (image blocks are skipped)."""
+    # Every block is (x0, y0, x1, y1, text, block number, block type), with type 0 for text
+    return "".join(block[4] for block in page.get_text("blocks") if block[6] == 0)
+
+
+def page_text_from_rawdict(page):
+    """Page text rebuilt character by character from the raw dictionary of the page."""
+    page_dict = page.get_text("rawdict")
+    return "\n".join(
+        "".join(char["c"] for span in line["spans"] for char in span["chars"])
+        for block in page_dict["blocks"] if block["type"] == 0
+        for line in block["lines"])
+
+
+# Text extraction modes, by name. Every mode returns the text of a page; the header, date and page
+# number are then removed from it the same way, so all modes must produce the same words
+EXTRACTION_MODES = {
+    "text": page_text_from_text,
+    "words": page_text_from_words,
+    "blocks": page_text_from_blocks,
+    "rawdict": page_text_from_rawdict,
+}
+
+
+class DebugTextWriter:
+    """
+    Background thread writing the per-page debug text dumps, so the parse loop never waits on them.
+    """
+
+    def __init__(self, output_dir):
+        """
+        :param output_dir: Directory where the text files are saved
+        """
+        self.output_dir = output_dir
+        self.files_written = 0
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            file_name, text, intro_text = item
+            try:
+                with open(os.path.join(self.output_dir, file_name), "w", encoding="utf-8") as text_file:
+                    text_file.write(intro_text)
+                    text_file.write("\n\n")
+                    text_file.write(text)
+                self.files_written += 1
+            except OSError as e:
+                self._error = self._error or e
+
+    def write(self, file_name, text, intro_text=""):
+        """
+        Queue a text file to be written.
+
+        :param file_name: Name of the file, in the output directory
+        :param text: The text to be saved
+        :param intro_text: Text added at the beginning of the file
+        :return: None
+        """
+        self._queue.put((file_name, text, intro_text))
+
+    def close(self):
+        """
+        Wait for the queued files to be written and stop the thread.
+
+        :return: None
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            print(f"Error saving debug text to {self.output_dir}: {self._error}")
+
+
+def split_page_range(first_page_index, last_page_index, chunks):
+    """
+    Split a range of page indexes into contiguous chunks of (almost) equal size.
+
+    :param first_page_index: The first page index of the range (0-based, inclusive)
+    :param last_page_index: The last page index of the range (0-based, exclusive)
+    :param chunks: The number of chunks to split the range into
+    :return: List of page index ranges, in page order
+    """
+    total_pages = max(last_page_index - first_page_index, 0)
+    chunks = max(1, min(chunks, total_pages))
+    chunk_size, remainder = divmod(total_pages, chunks)
+
+    page_ranges = []
+    chunk_start = first_page_index
+    for chunk_number in range(chunks):
+        chunk_end = chunk_start + chunk_size + (1 if chunk_number < remainder else 0)
+        page_ranges.append(range(chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return page_ranges
+
+
+def extract_page_words(page, mode="text", debug_writer=None):
+    """
+    Extract the words of a single PDF page, after removing the header, date and page number.
+
+    :param page: The pymupdf page to extract the words from
+    :param mode: The text extraction mode (a key of EXTRACTION_MODES)
+    :param debug_writer: Optional DebugTextWriter the page full text is dumped to
+    :return: List of words in uppercase, in the order they appear on the page
+    """
+    display_page_number = page.number + 1
+
+    # Extract full text from the page
+    full_text = EXTRACTION_MODES[mode](page).strip()
+
+    # Save full text to a file
+    if debug_writer:
+        debug_writer.write(
+            f"page_{display_page_number}_full_text.txt", full_text,
+            intro_text=f"Full text from page {display_page_number}:")
+
+    # Remove header, page number, and date entries using regex
+    cleaned_text = remove_header_text(full_text, HEADER_PATTERN)
+    cleaned_text = remove_date_text(cleaned_text, DATE_PATTERN)
+    cleaned_text = remove_page_numbers(cleaned_text, PAGE_NUMBER_PATTERN)
+
+    # Split the cleaned text into words and store in uppercase
+    return extract_words(cleaned_text)
+
+
+def extract_pages_words(pdf_path, page_indexes, output_txt_dir=None, mode="text"):
+    """
+    Extract the words of a range of PDF pages. Every call opens its own document,
+    so it can safely run inside a worker process.
+
+    :param pdf_path: Path to the PDF file
+    :param page_indexes: The page indexes to process (0-based)
+    :param output_txt_dir: Directory where the pages full text should be saved (None skips the debug dumps)
+    :param mode: The text extraction mode (a key of EXTRACTION_MODES)
+    :return: List of (page_index, words) tuples, in page order
+    """
+    document = pymupdf.open(pdf_path)
+    debug_writer = DebugTextWriter(output_txt_dir) if output_txt_dir else None
+    try:
+        return [
+            (page_index, extract_page_words(document[page_index], mode, debug_writer))
+            for page_index in page_indexes]
+    finally:
+        if debug_writer:
+            debug_writer.close()
+        document.close()
+
+
 def extract_scrabble_words(
         pdf_path="assets/pdf/scrabble-acceptable-greek-words-2-8-2024_09_01.pdf", 
         start_page=4, 
         end_page=463, 
         output_txt_dir="assets/data/txt/scrabble_words_raw", 
         output_json_file="assets/data/json/scrabble_words_raw.json",
-        stats_file="assets/data/txt/scrabble_words_raw_stats.txt"):
+        stats_file="assets/data/txt/scrabble_words_raw_stats.txt",
+        workers=1,
+        mode="text",
+        debug_dumps=True):
     """
     Extract Scrabble words from a given PDF, clean up the text, and save the results.
+
+    When more than one worker is requested, the page range is split into chunks that are
+    processed by a pool of processes, each one with its own document. The per-page results
+    are merged back in page order, so the output is identical to the serial run.
+
+    The full text of every page is dumped to the text output directory for debugging, by a
+    background thread per process, unless the dumps are turned off.
     
     :param pdf_path: Path to the PDF file
     :param start_page: The starting page number (0-based index)
@@ -20,16 +211,14 @@ def extract_scrabble_words(
     :param output_txt_dir: Directory where text files should be saved
     :param output_json_file: Path to the JSON file where words will be saved
     :param stats_file: Path to the text file where statistics will be saved
+    :param workers: Number of worker processes to use (1 processes the pages serially)
+    :param mode: The text extraction mode (a key of EXTRACTION_MODES)
+    :param debug_dumps: Whether to save the full text of every page to output_txt_dir
     :return: None
     """
-
-    # Open the PDF file
-    document = pymupdf.open(pdf_path)
-
-    # Define regex patterns for header, page number, and date
-    header_pattern = r"ΑΠΟΔΕΚΤΕΣ ΛΕΞΕΙΣ 2-8 ΓΡΑΜΜΑΤΩΝ"  # Header text
-    date_pattern = r"[Α-Ωα-ωΊΪΌΆΈΎΫΉΏίϊΐόάέύϋΰήώ]+\s+\d{4}"  # Month and year
-    page_number_pattern = r"\d{1,3}" # Page number (e.g., "1", "2", etc.)
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}', expected one of {', '.join(EXTRACTION_MODES)}")
+    dump_dir = output_txt_dir if debug_dumps else None
 
     # Containers for all the words and stats
     all_words = []
@@ -39,38 +228,24 @@ def extract_scrabble_words(
     total_pages = end_page - start_page + 1
     pages_processed = 0
 
-    # Iterate through the specified pages
-    for page_number in range(start_page - 1, end_page):
-        page = document[page_number]
-        display_page_number = page_number + 1
-        
-        # Extract full text from the page
-        # TODO: we may use "words" here instead of "text" to get the words
-        full_text = page.get_text("text").strip()
-
-        # print(f"Full text from page {page_number + 1}:")
-        # print(full_text)
-
-        # Save full text to a file
-        output_text_file = f"{output_txt_dir}/page_{display_page_number}_full_text.txt"
-        save_to_txt(output_text_file, full_text, intro_text=f"Full text from page {display_page_number}:")
-
-        
-        # Remove header, page number, and date entries using regex
-        cleaned_text = remove_header_text(full_text, header_pattern)
-        cleaned_text = remove_date_text(cleaned_text, date_pattern)
-        cleaned_text = remove_page_numbers(cleaned_text, page_number_pattern)
-
-        # Split the cleaned text into words and store in uppercase
-        words = extract_words(cleaned_text)
+    # Extract the words of the specified pages
+    if workers > 1:
+        page_ranges = split_page_range(start_page - 1, end_page, workers * CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # executor.map returns the chunk results in submission (page) order
+            chunk_results = list(executor.map(
+                extract_pages_words, repeat(pdf_path), page_ranges, repeat(dump_dir), repeat(mode)))
+        page_results = [page_result for chunk_result in chunk_results for page_result in chunk_result]
+    else:
+        page_results = extract_pages_words(pdf_path, range(start_page - 1, end_page), dump_dir, mode)
+
+    # Merge the per-page words in page order
+    for page_index, words in page_results:
         all_words.extend(words)
 
         # Record stats for the page
-        stats.append(f"Page {display_page_number}: {len(words)} words extracted")
+        stats.append(f"Page {page_index + 1}: {len(words)} words extracted")
         pages_processed += 1
-    
-    # Close the document
-    document.close()
 
     # Remove duplicates and sort the words alphabetically
     unique_words = sorted(set(all_words))
@@ -82,6 +257,9 @@ def extract_scrabble_words(
         f"Total unique words: {len(unique_words)}",
     ])
 
+    if debug_dumps:
+        stats.append(f"Full text of every page saved to {output_txt_dir}")
+
     # Save statistics to a file
     save_to_txt(stats_file, "\n".join(stats), intro_text="Scrabble Words Extraction Statistics")
 
@@ -91,4 +269,3 @@ def extract_scrabble_words(
 
     # Store the sorted words in a JSON file
     save_to_json(output_json_file, {"words": unique_words})
-    
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+import sys
+import time
+
+import numpy as np
+
+from utils.greek_letters import GREEK_LETTERS, LETTER_CODES
+
+
+# Character used for blank tiles in a rack
+WILDCARD = "*"
+
+
+def parse_rack(rack):
+    """
+    Split a rack into its letter counts and number of blank tiles.
+
+    :param rack: The rack, e.g. "ΑΒΓ*" (case-insensitive, '*' for blank tiles)
+    :return: Tuple of (counts, blanks), where counts is a 24-column int8 letter-count vector
+    """
+    counts = np.zeros(len(GREEK_LETTERS), dtype=np.int8)
+    blanks = 0
+    for letter in rack.strip().upper():
+        if letter == WILDCARD:
+            blanks += 1
+        elif letter in LETTER_CODES:
+            counts[LETTER_CODES[letter] - 1] += 1
+        elif not letter.isspace():
+            raise ValueError(f"Invalid letter '{letter}' in rack '{rack}'")
+    return counts, blanks
+
+
+class AnagramEngine:
+    """
+    Anagram search over letter-count vectors.
+
+    Every word is stored as a row of a (words x 24) matrix holding how many times each letter
+    appears in it (taken from its alphagram). A word can be formed from a rack with k blanks
+    when the letters it needs beyond the rack, summed over all letters, are at most k, which
+    is a single vectorized comparison over the whole lexicon.
+    """
+
+    def __init__(self, data):
+        """
+        :param data: The processed word entries (with word, alphagram, length and points)
+        """
+        self.words = [entry["word"] for entry in data]
+        self.lengths = np.fromiter((entry["length"] for entry in data), dtype=np.int8, count=len(data))
+        self.points = np.fromiter((entry["points"] for entry in data), dtype=np.int16, count=len(data))
+
+        # Build the letter-count matrix from the alphagrams in one scatter-add
+        rows = np.repeat(np.arange(len(data)), [len(entry["alphagram"]) for entry in data])
+        columns = np.fromiter(
+            (LETTER_CODES[letter] - 1 for entry in data for letter in entry["alphagram"]),
+            dtype=np.intp, count=len(rows))
+        self.letter_counts = np.zeros((len(data), len(GREEK_LETTERS)), dtype=np.uint8)
+        np.add.at(self.letter_counts, (rows, columns), 1)
+
+    @classmethod
+    def from_json_file(cls, input_file="assets/data/json/scrabble_words_2_to_8_chars.json"):
+        """
+        Build the engine from the processed lexicon JSON file.
+
+        :param input_file: Path to the processed lexicon JSON file
+        :return: The anagram engine
+        """
+        with open(input_file, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def matching_indexes(self, counts, blanks, min_length=2):
+        """
+        Find the words that can be formed from the given letter counts and blanks.
+
+        :param counts: 24-column letter-count vector of the rack
+        :param blanks: Number of blank tiles in the rack
+        :param min_length: Minimum word length to include
+        :return: Array of the matching word indexes
+        """
+        max_length = int(counts.sum()) + blanks
+        candidates = np.flatnonzero((self.lengths >= min_length) & (self.lengths <= max_length))
+
+        # Letters each candidate needs beyond the rack; the blanks have to cover all of them
+        deficit = self.letter_counts[candidates].astype(np.int8) - counts
+        np.maximum(deficit, 0, out=deficit)
+        return candidates[deficit.sum(axis=1) <= blanks]
+
+    def search(self, rack, min_length=2):
+        """
+        Find all words that can be formed from a rack, grouped by length and ranked by points.
+
+        :param rack: The rack, e.g. "ΑΒΓ*" ('*' for blank tiles)
+        :param min_length: Minimum word length to include
+        :return: Dictionary mapping each word length (longest first) to its words, highest points first
+        """
+        counts, blanks = parse_rack(rack)
+        indexes = self.matching_indexes(counts, blanks, min_length)
+
+        # Sort by length (descending), then points (descending), then alphabetically (index order)
+        order = np.lexsort((indexes, -self.points[indexes], -self.lengths[indexes]))
+
+        results = {}
+        for index in indexes[order]:
+            results.setdefault(int(self.lengths[index]), []).append(self.words[index])
+        return results
+
+
+if __name__ == "__main__":
+    racks = sys.argv[1:] or ["ΑΕΡΙΣΤΟ*", "ΑΕΡΙΣΤ**"]
+
+    start_time = time.perf_counter()
+    anagram_engine = AnagramEngine.from_json_file()
+    print(f"Anagram engine built in {time.perf_counter() - start_time:.2f} s")
+
+    for rack in racks:
+        start_time = time.perf_counter()
+        results = anagram_engine.search(rack)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        total_words = sum(len(words) for words in results.values())
+        print(f"{rack}: {total_words} words in {elapsed_ms:.2f} ms")
+        for length, words in results.items():
+            print(f"  {length} letters: {', '.join(words[:10])}{' ...' if len(words) > 10 else ''}")
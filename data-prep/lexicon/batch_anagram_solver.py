@@ -0,0 +1,139 @@
+import json
+from itertools import combinations
+
+from lexicon.anagram_engine import WILDCARD
+from processors.preprocess_scrabble_data import scrabble_points_gr
+from utils.caching import LRUCache, canonical_rack
+from utils.greek_letters import BLANK_TILE_COUNT, GREEK_LETTERS, LETTER_CODES, normalize_word
+
+
+# Maximum number of sub-rack results kept in the memo table
+DEFAULT_MEMO_SIZE = 200000
+
+
+def normalize_rack(rack):
+    """
+    Canonical form of a typed rack: without accents, its letters sorted, followed by its blank tiles.
+
+    :param rack: The rack, e.g. "ρίζα*" ('*' for blank tiles)
+    :return: The canonical rack, e.g. "ΑΖΙΡ*"
+    """
+    canonical = canonical_rack(normalize_word(rack))
+    for letter in canonical:
+        if letter != WILDCARD and letter not in LETTER_CODES:
+            raise ValueError(f"Invalid letter '{letter}' in rack '{rack}'")
+    # Every blank multiplies the sub-racks by the 24 letters it can stand for
+    if canonical.count(WILDCARD) > BLANK_TILE_COUNT:
+        raise ValueError(f"Rack '{rack}' has more than {BLANK_TILE_COUNT} blank tiles")
+    return canonical
+
+
+def alphagram_points(alphagram):
+    """Scrabble points of the words of an alphagram, which all have the same letters."""
+    return sum(scrabble_points_gr.get(letter, 0) for letter in alphagram)
+
+
+class BatchAnagramSolver:
+    """
+    Anagram solver for batches of racks, over the words grouped by alphagram (see split_data_by_alphagram).
+
+    The alphagrams a rack can form are the sub-multisets of its letters that are alphagrams of the
+    lexicon. They are found recursively: those of a rack are the rack itself, if it is an alphagram,
+    and those of every rack with one letter less. Every sub-rack result is kept in a bounded
+    least-recently-used memo table, so racks that share letters, as most racks of a batch do, share
+    the work on their common sub-racks. A blank tile is tried as every letter in turn, and the 24
+    racks it gives share most of their sub-racks too.
+
+    Only racks no longer than the longest alphagram are memoized. A longer rack is split straight into its
+    distinct sub-racks of that length, so it neither fills the memo table nor recurses through every
+    one of its longer sub-racks.
+    """
+
+    def __init__(self, grouped_words_by_alphagram, memo_size=DEFAULT_MEMO_SIZE):
+        """
+        :param grouped_words_by_alphagram: Dictionary mapping each alphagram to its words, in alphabetical order
+        :param memo_size: Maximum number of sub-rack results kept in the memo table (0 disables it)
+        """
+        self.words_by_alphagram = grouped_words_by_alphagram
+        self.min_length = min(map(len, grouped_words_by_alphagram), default=0)
+        self.max_length = max(map(len, grouped_words_by_alphagram), default=0)
+        self.memo = LRUCache(memo_size)
+
+    @classmethod
+    def from_json_file(
+            cls, input_file="assets/web_data/words_by_alphagram/words_grouped_by_alphagram_min.json",
+            memo_size=DEFAULT_MEMO_SIZE):
+        """
+        Load the solver from the alphagram file written by split_data_by_alphagram.
+
+        :param input_file: Path to the words grouped by alphagram JSON file
+        :param memo_size: Maximum number of sub-rack results kept in the memo table
+        :return: The solver
+        """
+        with open(input_file, "r", encoding="utf-8") as f:
+            return cls(json.load(f), memo_size)
+
+    def sub_alphagrams(self, letters, blanks=0):
+        """
+        Find the alphagrams of the lexicon that can be formed from a rack.
+
+        :param letters: The letters of the rack, sorted
+        :param blanks: Number of blank tiles of the rack
+        :return: Frozen set of the alphagrams
+        """
+        if len(letters) + blanks > self.max_length:
+            return self._find_long_rack_sub_alphagrams(letters, blanks)
+        return self.memo.get((letters, blanks), lambda: self._find_sub_alphagrams(letters, blanks))
+
+    def _find_long_rack_sub_alphagrams(self, letters, blanks):
+        """
+        Uncached sub_alphagrams of a rack longer than the longest alphagram.
+
+        Every alphagram fits in a sub-rack of max_length tiles that keeps as many of the blanks as possible,
+        since a blank can stand in for any letter left out.
+        """
+        blanks = min(blanks, self.max_length)
+        found = set()
+        for sub_letters in set(combinations(letters, self.max_length - blanks)):
+            found.update(self.sub_alphagrams("".join(sub_letters), blanks))
+        return frozenset(found)
+
+    def _find_sub_alphagrams(self, letters, blanks):
+        """Uncached sub_alphagrams, which recurses through the memo table."""
+        found = set()
+        if blanks:
+            # The racks with the blank as a letter also hold all the sub-racks that leave it unused
+            for letter in GREEK_LETTERS:
+                found.update(self.sub_alphagrams("".join(sorted(letters + letter)), blanks - 1))
+            return frozenset(found)
+
+        if letters in self.words_by_alphagram:
+            found.add(letters)
+        if len(letters) > self.min_length:
+            for index, letter in enumerate(letters):
+                # Removing either of two equal letters gives the same sub-rack
+                if index and letters[index - 1] == letter:
+                    continue
+                found.update(self.sub_alphagrams(letters[:index] + letters[index + 1:]))
+        return frozenset(found)
+
+    def solve(self, rack, min_length=2):
+        """
+        Find all words that can be formed from a rack, in the same order as AnagramEngine.search.
+
+        :param rack: The canonical rack, as returned by normalize_rack
+        :param min_length: Minimum word length to include
+        :return: Dictionary mapping each word length (longest first) to its words, highest points first
+        """
+        blanks = rack.count(WILDCARD)
+        ranked = sorted(
+            (-len(alphagram), -alphagram_points(alphagram), word)
+            for alphagram in self.sub_alphagrams(rack[:len(rack) - blanks], blanks)
+            if len(alphagram) >= min_length
+            for word in self.words_by_alphagram[alphagram]
+        )
+
+        results = {}
+        for negative_length, _, word in ranked:
+            results.setdefault(-negative_length, []).append(word)
+        return results
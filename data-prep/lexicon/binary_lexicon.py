@@ -0,0 +1,167 @@
+"""
+Binary lexicon file layout: a sectioned file (see lexicon/sectioned_file.py) whose record count is the
+word count, with the sections (all integers little-endian):
+
+    words           word count x 8 letter codes (uint8), sorted, zero padded
+    alphagrams      word count x 8 letter codes (uint8), zero padded
+    lengths         word count x uint8
+    points          word count x uint8
+    <field>_offsets (word count + 1) x uint32 offsets into <field>_strings, for lemma, dictionary and comments
+    <field>_strings the UTF-8 encoded strings of the field, concatenated
+"""
+import mmap
+import struct
+
+from lexicon.sectioned_file import read_section_table
+from utils.greek_letters import MAX_WORD_LENGTH, decode_word, encode_word
+
+
+MAGIC = b"SWFLEX\0\0"
+FORMAT_VERSION = 1
+METADATA_FIELDS = ["lemma", "dictionary", "comments"]
+SECTIONS = [
+    "words",
+    "alphagrams",
+    "lengths",
+    "points",
+    *[f"{field}_{part}" for field in METADATA_FIELDS for part in ("offsets", "strings")],
+]
+
+OFFSET = struct.Struct("<I")
+
+
+def word_ids(data):
+    """
+    Assign every word its ID: its index in the binary lexicon, which is sorted by encoded word.
+
+    :param data: The processed word entries
+    :return: List of (word ID, entry) tuples, skipping the words the binary lexicon cannot encode
+    """
+    encoded = ((encode_word(entry["word"]), entry) for entry in data)
+    entries = sorted(((key, entry) for key, entry in encoded if key is not None), key=lambda item: item[0])
+    return [(word_id, entry) for word_id, (_, entry) in enumerate(entries)]
+
+
+class BinaryLexicon:
+    """
+    Read-only view over a binary lexicon file.
+
+    The file is memory-mapped and never deserialized as a whole: lookups binary-search the
+    sorted fixed-width word array, and metadata is decoded only for the entries that are read.
+    """
+
+    def __init__(self, file_path="assets/data/bin/scrabble_lexicon.bin"):
+        """
+        :param file_path: Path to the binary lexicon file
+        """
+        self._file = open(file_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.word_count, self._sections = read_section_table(
+                self._mm, MAGIC, FORMAT_VERSION, SECTIONS, "binary lexicon", file_path)
+        except ValueError:
+            self.close()
+            raise
+        self._words_offset = self._sections["words"][0]
+
+    def __len__(self):
+        return self.word_count
+
+    def __contains__(self, word):
+        return self.contains(word)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and close the file.
+
+        :return: None
+        """
+        self._mm.close()
+        self._file.close()
+
+    def _codes_at(self, section, index):
+        """Return the fixed-width letter codes stored at the given index of a section."""
+        start = self._sections[section][0] + index * MAX_WORD_LENGTH
+        return self._mm[start:start + MAX_WORD_LENGTH]
+
+    def _string_at(self, field, index):
+        """Return the string of a metadata field for the given word index."""
+        offsets_start = self._sections[f"{field}_offsets"][0] + index * OFFSET.size
+        start, = OFFSET.unpack_from(self._mm, offsets_start)
+        end, = OFFSET.unpack_from(self._mm, offsets_start + OFFSET.size)
+        strings_start = self._sections[f"{field}_strings"][0]
+        return self._mm[strings_start + start:strings_start + end].decode("utf-8")
+
+    def index_of(self, word):
+        """
+        Find the index of a word using binary search over the sorted word array.
+
+        :param word: The word to look up (uppercase Greek letters)
+        :return: The index of the word, or None if the word is not in the lexicon
+        """
+        key = encode_word(word)
+        if key is None:
+            return None
+
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._words_offset + middle * MAX_WORD_LENGTH
+            if self._mm[start:start + MAX_WORD_LENGTH] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.word_count and self._codes_at("words", low) == key:
+            return low
+        return None
+
+    def contains(self, word):
+        """
+        Check whether a word is in the lexicon.
+
+        :param word: The word to look up (uppercase Greek letters)
+        :return: True if the word is in the lexicon
+        """
+        return self.index_of(word) is not None
+
+    def word(self, index):
+        """
+        Return the word at the given index.
+
+        :param index: The word index
+        :return: The word
+        """
+        return decode_word(self._codes_at("words", index))
+
+    def entry(self, index):
+        """
+        Return the full entry at the given index, in the same shape as the processed JSON lexicon.
+
+        :param index: The word index
+        :return: Dictionary with the word, its metadata, alphagram, length and points
+        """
+        entry = {"word": self.word(index)}
+        for field in METADATA_FIELDS:
+            entry[field] = self._string_at(field, index)
+        entry["alphagram"] = decode_word(self._codes_at("alphagrams", index))
+        entry["length"] = self._mm[self._sections["lengths"][0] + index]
+        entry["points"] = self._mm[self._sections["points"][0] + index]
+        return entry
+
+    def lookup(self, word):
+        """
+        Return the entry of a word.
+
+        :param word: The word to look up (uppercase Greek letters)
+        :return: The word entry, or None if the word is not in the lexicon
+        """
+        index = self.index_of(word)
+        return None if index is None else self.entry(index)
@@ -0,0 +1,583 @@
+"""
+DAWG file layout (all integers little-endian):
+
+    header          magic (8 bytes), format version (uint16), symbol count (uint16), node count (uint32), edge count (uint32)
+    final flags     node count x uint8 (1 if a word ends at the node)
+    edge starts     (node count + 1) x uint32, index of the first edge of every node in the edge arrays
+    edge symbols    edge count x uint8, sorted within every node
+    edge targets    edge count x uint32
+
+Node 0 is the root. Symbols are letter codes (1-24, see utils/greek_letters.py); other indexes built
+on this format may add their own symbols after the letters.
+"""
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+
+from utils.greek_letters import GREEK_LETTERS, LETTER_CODES
+
+
+MAGIC = b"SWFDAWG\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHII")
+
+# Pattern characters
+ANY_LETTER = "?"
+ANY_SEQUENCE = "*"
+WILDCARD = "*"
+
+
+def encode_symbols(word):
+    """
+    Convert a word to its sequence of letter codes.
+
+    :param word: The word (uppercase Greek letters)
+    :return: Tuple of letter codes, or None if the word has letters outside the alphabet
+    """
+    try:
+        return tuple(LETTER_CODES[letter] for letter in word)
+    except KeyError:
+        return None
+
+
+class DawgBuilder:
+    """
+    Incremental builder of a minimized DAWG (Daciuk et al.), fed with sequences in sorted order.
+
+    Equivalent suffixes are merged as soon as a sequence can no longer be extended, so memory
+    stays proportional to the minimized automaton rather than to the full trie.
+    """
+
+    def __init__(self):
+        # A node is a [final, {symbol: child}] list; nodes are compared by identity in the register
+        self.root = [False, {}]
+        self._register = {}
+        self._unchecked = []  # (parent, symbol, child) path of the last inserted sequence
+        self._previous = ()
+
+    def insert(self, symbols):
+        """
+        Add a sequence of symbols. Sequences must be inserted in increasing order.
+
+        :param symbols: Tuple of symbols (ints)
+        :return: None
+        """
+        if self._previous and symbols <= self._previous:
+            if symbols == self._previous:
+                return
+            raise ValueError("Sequences must be inserted in sorted order")
+
+        common_prefix = 0
+        for previous_symbol, symbol in zip(self._previous, symbols):
+            if previous_symbol != symbol:
+                break
+            common_prefix += 1
+
+        self._minimize(common_prefix)
+
+        node = self._unchecked[-1][2] if self._unchecked else self.root
+        for symbol in symbols[common_prefix:]:
+            child = [False, {}]
+            node[1][symbol] = child
+            self._unchecked.append((node, symbol, child))
+            node = child
+        node[0] = True
+        self._previous = symbols
+
+    def _minimize(self, down_to):
+        """Merge the nodes of the last inserted path, below the given depth, with their registered equivalents."""
+        while len(self._unchecked) > down_to:
+            parent, symbol, child = self._unchecked.pop()
+            signature = (child[0], tuple((edge_symbol, id(target)) for edge_symbol, target in sorted(child[1].items())))
+            registered = self._register.get(signature)
+            if registered is None:
+                self._register[signature] = child
+            else:
+                parent[1][symbol] = registered
+
+    def finish(self):
+        """
+        Minimize the remaining path and flatten the automaton into arrays.
+
+        :return: Tuple of (final_flags, edge_starts, edge_symbols, edge_targets)
+        """
+        self._minimize(0)
+
+        # Number the nodes breadth-first from the root
+        node_ids = {id(self.root): 0}
+        nodes = [self.root]
+        for node in nodes:
+            for _, child in sorted(node[1].items()):
+                if id(child) not in node_ids:
+                    node_ids[id(child)] = len(nodes)
+                    nodes.append(child)
+
+        final_flags = bytearray(len(nodes))
+        edge_starts = array("I", [0])
+        edge_symbols = bytearray()
+        edge_targets = array("I")
+        for node_id, node in enumerate(nodes):
+            final_flags[node_id] = node[0]
+            for symbol, child in sorted(node[1].items()):
+                edge_symbols.append(symbol)
+                edge_targets.append(node_ids[id(child)])
+            edge_starts.append(len(edge_symbols))
+
+        return final_flags, edge_starts, edge_symbols, edge_targets
+
+
+class Dawg:
+    """
+    Array-backed minimized DAWG with prefix, pattern and rack queries.
+    """
+
+    def __init__(self, final_flags, edge_starts, edge_symbols, edge_targets, symbol_count=len(GREEK_LETTERS)):
+        """
+        :param final_flags: One byte per node, 1 if a word ends at the node
+        :param edge_starts: array('I') with the index of the first edge of every node (plus an end sentinel)
+        :param edge_symbols: One byte per edge, its symbol
+        :param edge_targets: array('I') with the target node of every edge
+        :param symbol_count: Number of distinct symbols (24 letters, more for indexes with extra symbols)
+        """
+        self.final_flags = final_flags
+        self.edge_starts = edge_starts
+        self.edge_symbols = edge_symbols
+        self.edge_targets = edge_targets
+        self.symbol_count = symbol_count
+        self._transitions = [None] * len(final_flags)
+
+    @classmethod
+    def from_sequences(cls, sequences, symbol_count=len(GREEK_LETTERS)):
+        """
+        Build a DAWG from sequences of symbols.
+
+        :param sequences: Iterable of tuples of symbols (sorted here, duplicates are ignored)
+        :param symbol_count: Number of distinct symbols
+        :return: The DAWG
+        """
+        builder = DawgBuilder()
+        for symbols in sorted(sequences):
+            builder.insert(symbols)
+        return cls(*builder.finish(), symbol_count=symbol_count)
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Build a DAWG from a list of words.
+
+        :param words: Iterable of words (uppercase Greek letters)
+        :return: The DAWG
+        """
+        sequences = []
+        for word in words:
+            symbols = encode_symbols(word)
+            if symbols is None:
+                print(f"Skipping word that cannot be encoded: {word}")
+                continue
+            sequences.append(symbols)
+        return cls.from_sequences(sequences)
+
+    @classmethod
+    def load(cls, file_path="assets/data/bin/scrabble_words.dawg"):
+        """
+        Load a DAWG written by save().
+
+        :param file_path: Path to the DAWG file
+        :return: The DAWG
+        """
+        with open(file_path, "rb") as f:
+            content = f.read()
+
+        magic, version, symbol_count, node_count, edge_count = HEADER.unpack_from(content, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{file_path} is not a DAWG file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported DAWG version {version} in {file_path}")
+
+        position = HEADER.size
+        final_flags = content[position:position + node_count]
+        position += node_count
+        edge_starts = array("I")
+        edge_starts.frombytes(content[position:position + 4 * (node_count + 1)])
+        position += 4 * (node_count + 1)
+        edge_symbols = content[position:position + edge_count]
+        position += edge_count
+        edge_targets = array("I")
+        edge_targets.frombytes(content[position:position + 4 * edge_count])
+
+        if sys.byteorder == "big":
+            edge_starts.byteswap()
+            edge_targets.byteswap()
+
+        return cls(final_flags, edge_starts, edge_symbols, edge_targets, symbol_count)
+
+    def save(self, file_path="assets/data/bin/scrabble_words.dawg"):
+        """
+        Write the DAWG to a file.
+
+        :param file_path: Path to the DAWG file
+        :return: None
+        """
+        edge_starts = array("I", self.edge_starts)
+        edge_targets = array("I", self.edge_targets)
+        if sys.byteorder == "big":
+            edge_starts.byteswap()
+            edge_targets.byteswap()
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.symbol_count, len(self.final_flags), len(self.edge_symbols)))
+            f.write(bytes(self.final_flags))
+            f.write(edge_starts.tobytes())
+            f.write(bytes(self.edge_symbols))
+            f.write(edge_targets.tobytes())
+
+    @property
+    def node_count(self):
+        return len(self.final_flags)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_symbols)
+
+    def transitions(self, node):
+        """
+        Return the outgoing edges of a node as a {symbol: target} dictionary (cached per node).
+
+        :param node: The node id
+        :return: Dictionary mapping each symbol to its target node
+        """
+        node_transitions = self._transitions[node]
+        if node_transitions is None:
+            start, end = self.edge_starts[node], self.edge_starts[node + 1]
+            node_transitions = dict(zip(self.edge_symbols[start:end], self.edge_targets[start:end]))
+            self._transitions[node] = node_transitions
+        return node_transitions
+
+    def is_final(self, node):
+        """
+        Check whether a word ends at a node.
+
+        :param node: The node id
+        :return: True if a word ends at the node
+        """
+        return self.final_flags[node] == 1
+
+    def walk(self, symbols, node=0):
+        """
+        Follow a sequence of symbols from a node.
+
+        :param symbols: Iterable of symbols
+        :param node: The node to start from (root by default)
+        :return: The node reached, or None if the sequence leaves the DAWG
+        """
+        for symbol in symbols:
+            node = self.transitions(node).get(symbol)
+            if node is None:
+                return None
+        return node
+
+    def contains(self, word):
+        """
+        Check whether a word is in the DAWG.
+
+        :param word: The word (uppercase Greek letters)
+        :return: True if the word is in the DAWG
+        """
+        symbols = encode_symbols(word)
+        if symbols is None:
+            return False
+        node = self.walk(symbols)
+        return node is not None and self.is_final(node)
+
+    def _words_from(self, node, prefix, results):
+        """Collect every word reachable from a node, in alphabetical order."""
+        if self.is_final(node):
+            results.append(prefix)
+        for symbol, child in self.transitions(node).items():
+            self._words_from(child, prefix + GREEK_LETTERS[symbol - 1], results)
+
+    def prefix(self, prefix):
+        """
+        Find all words starting with a prefix.
+
+        :param prefix: The prefix (uppercase Greek letters)
+        :return: Sorted list of words
+        """
+        symbols = encode_symbols(prefix)
+        node = None if symbols is None else self.walk(symbols)
+        results = []
+        if node is not None:
+            self._words_from(node, prefix, results)
+        return results
+
+    def pattern(self, pattern):
+        """
+        Find all words matching a pattern, where '?' matches exactly one letter and '*' any number of letters.
+
+        Example: "Α?Ε??Σ" (6-letter words), "*ΣΗ" (words ending in ΣΗ), "ΠΡΟ*" (words starting with ΠΡΟ).
+
+        :param pattern: The pattern (uppercase Greek letters, '?' and '*')
+        :return: Sorted list of words
+        """
+        pattern = pattern.strip().upper()
+        for letter in pattern:
+            if letter not in LETTER_CODES and letter not in (ANY_LETTER, ANY_SEQUENCE):
+                raise ValueError(f"Invalid character '{letter}' in pattern '{pattern}'")
+
+        # Whether the rest of the pattern can still match from a node only depends on (node, position), so
+        # it is computed once per state; the enumeration below then never enters a branch without matches
+        viable = {}
+
+        def can_match(node, position):
+            state = (node, position)
+            if state not in viable:
+                if position == len(pattern):
+                    viable[state] = self.is_final(node)
+                elif pattern[position] == ANY_SEQUENCE:
+                    # Either the '*' matches nothing more, or it consumes one more letter
+                    viable[state] = can_match(node, position + 1) or any(
+                        can_match(child, position) for child in self.transitions(node).values())
+                elif pattern[position] == ANY_LETTER:
+                    viable[state] = any(can_match(child, position + 1) for child in self.transitions(node).values())
+                else:
+                    child = self.transitions(node).get(LETTER_CODES[pattern[position]])
+                    viable[state] = child is not None and can_match(child, position + 1)
+            return viable[state]
+
+        # Sets of pattern positions are bit masks. Letting a '*' match nothing moves on to the next position
+        # for free, so every mask includes the positions reachable that way
+        closures = []
+        for position in range(len(pattern) + 1):
+            closure = 1 << position
+            while position < len(pattern) and pattern[position] == ANY_SEQUENCE:
+                position += 1
+                closure |= 1 << position
+            closures.append(closure)
+
+        steps = {}
+
+        def step(positions, letter):
+            # The positions reached from a set of positions by matching one more letter
+            key = (positions, letter)
+            if key not in steps:
+                next_positions = 0
+                for position, character in enumerate(pattern):
+                    if positions >> position & 1:
+                        if character == ANY_SEQUENCE:
+                            next_positions |= closures[position]
+                        elif character == ANY_LETTER or character == letter:
+                            next_positions |= closures[position + 1]
+                steps[key] = next_positions
+            return steps[key]
+
+        live = {}
+
+        def live_positions(node, positions):
+            # The positions that can still match from a node
+            key = (node, positions)
+            if key not in live:
+                live[key] = sum(
+                    1 << position for position in range(len(pattern) + 1)
+                    if positions >> position & 1 and can_match(node, position))
+            return live[key]
+
+        # Every path of the DAWG (i.e. every word prefix) is visited at most once, with the set of pattern
+        # positions it can be at, so each matching word is produced exactly once. Once a path reaches the
+        # trailing '*'s of the pattern, every word below it matches and is collected without further checks.
+        results = []
+        end_position = 1 << len(pattern)
+        any_rest = 1 << len(pattern.rstrip(ANY_SEQUENCE)) if pattern.endswith(ANY_SEQUENCE) else 0
+        start_positions = live_positions(0, closures[0])
+        stack = [(0, "", start_positions)] if start_positions else []
+        while stack:
+            node, prefix, positions = stack.pop()
+            if positions & any_rest:
+                self._words_from(node, prefix, results)
+                continue
+            if positions & end_position:
+                results.append(prefix)
+            for symbol, child in self.transitions(node).items():
+                letter = GREEK_LETTERS[symbol - 1]
+                next_positions = step(positions, letter)
+                if next_positions:
+                    next_positions = live_positions(child, next_positions)
+                    if next_positions:
+                        stack.append((child, prefix + letter, next_positions))
+
+        return sorted(results)
+
+    def suffix(self, suffix):
+        """
+        Find all words ending with a suffix.
+
+        :param suffix: The suffix (uppercase Greek letters)
+        :return: Sorted list of words
+        """
+        return self.pattern(ANY_SEQUENCE + suffix)
+
+    def rack(self, rack, min_length=2):
+        """
+        Find all words that can be formed from the tiles of a rack, traversing only the
+        branches the remaining tiles allow.
+
+        :param rack: The rack, e.g. "ΑΒΓ*" ('*' for blank tiles)
+        :param min_length: Minimum word length to include
+        :return: Sorted list of words
+        """
+        rack = rack.strip().upper()
+        for letter in rack:
+            if letter not in LETTER_CODES and letter != WILDCARD and not letter.isspace():
+                raise ValueError(f"Invalid letter '{letter}' in rack '{rack}'")
+        tiles = Counter(LETTER_CODES[letter] for letter in rack if letter in LETTER_CODES)
+        blanks = rack.count(WILDCARD)
+        results = set()
+
+        def traverse(node, prefix, blanks_left):
+            if len(prefix) >= min_length and self.is_final(node):
+                results.add(prefix)
+            for symbol, child in self.transitions(node).items():
+                letter = GREEK_LETTERS[symbol - 1]
+                if tiles[symbol] > 0:
+                    tiles[symbol] -= 1
+                    traverse(child, prefix + letter, blanks_left)
+                    tiles[symbol] += 1
+                elif blanks_left > 0:
+                    traverse(child, prefix + letter, blanks_left - 1)
+
+        traverse(0, "", blanks)
+        return sorted(results)
+
+
+class LexiconIndex:
+    """
+    Word index made of two DAWGs: one over the words and one over the reversed words, so that
+    suffix queries (and patterns starting with '*') are answered by walking from the end of the word.
+    """
+
+    def __init__(self, forward, backward):
+        """
+        :param forward: DAWG over the words
+        :param backward: DAWG over the reversed words
+        """
+        self.forward = forward
+        self.backward = backward
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Build the index from a list of words.
+
+        :param words: List of words (uppercase Greek letters)
+        :return: The lexicon index
+        """
+        return cls(Dawg.from_words(words), Dawg.from_words(word[::-1] for word in words))
+
+    @classmethod
+    def load(cls, forward_file="assets/data/bin/scrabble_words.dawg",
+             backward_file="assets/data/bin/scrabble_words_reversed.dawg"):
+        """
+        Load an index written by save().
+
+        :param forward_file: Path to the DAWG file over the words
+        :param backward_file: Path to the DAWG file over the reversed words
+        :return: The lexicon index
+        """
+        return cls(Dawg.load(forward_file), Dawg.load(backward_file))
+
+    def save(self, forward_file="assets/data/bin/scrabble_words.dawg",
+             backward_file="assets/data/bin/scrabble_words_reversed.dawg"):
+        """
+        Write both DAWGs to their files.
+
+        :param forward_file: Path to the DAWG file over the words
+        :param backward_file: Path to the DAWG file over the reversed words
+        :return: None
+        """
+        self.forward.save(forward_file)
+        self.backward.save(backward_file)
+
+    def contains(self, word):
+        """
+        Check whether a word is in the index.
+
+        :param word: The word (uppercase Greek letters)
+        :return: True if the word is in the index
+        """
+        return self.forward.contains(word)
+
+    def prefix(self, prefix):
+        """
+        Find all words starting with a prefix.
+
+        :param prefix: The prefix (uppercase Greek letters)
+        :return: Sorted list of words
+        """
+        return self.forward.prefix(prefix)
+
+    def suffix(self, suffix):
+        """
+        Find all words ending with a suffix.
+
+        :param suffix: The suffix (uppercase Greek letters)
+        :return: Sorted list of words
+        """
+        return sorted(word[::-1] for word in self.backward.prefix(suffix[::-1]))
+
+    def pattern(self, pattern):
+        """
+        Find all words matching a pattern ('?' matches one letter, '*' any number of letters).
+
+        Patterns that start with '*' but end with a fixed part are matched on the reversed words.
+
+        :param pattern: The pattern (uppercase Greek letters, '?' and '*')
+        :return: Sorted list of words
+        """
+        pattern = pattern.strip().upper()
+        if pattern.startswith(ANY_SEQUENCE) and not pattern.endswith(ANY_SEQUENCE):
+            return sorted(word[::-1] for word in self.backward.pattern(pattern[::-1]))
+        return self.forward.pattern(pattern)
+
+    def rack(self, rack, min_length=2):
+        """
+        Find all words that can be formed from the tiles of a rack.
+
+        :param rack: The rack, e.g. "ΑΒΓ*" ('*' for blank tiles)
+        :param min_length: Minimum word length to include
+        :return: Sorted list of words
+        """
+        return self.forward.rack(rack, min_length)
+
+
+def build_lexicon_index(
+        input_file="assets/data/json/scrabble_words_2_to_8_chars.json",
+        forward_file="assets/data/bin/scrabble_words.dawg",
+        backward_file="assets/data/bin/scrabble_words_reversed.dawg"):
+    """
+    Compile the processed lexicon into minimized DAWGs (over the words and the reversed words) and save them.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param forward_file: Path to the DAWG file over the words
+    :param backward_file: Path to the DAWG file over the reversed words
+    :return: The lexicon index
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        words = [entry["word"] for entry in json.load(f)]
+
+    start_time = time.perf_counter()
+    lexicon_index = LexiconIndex.from_words(words)
+    print(f"Lexicon index built in {time.perf_counter() - start_time:.2f} s: {len(words)} words, "
+          f"{lexicon_index.forward.node_count} + {lexicon_index.backward.node_count} nodes, "
+          f"{lexicon_index.forward.edge_count} + {lexicon_index.backward.edge_count} edges")
+
+    lexicon_index.save(forward_file, backward_file)
+    print(f"Lexicon index saved to {forward_file} and {backward_file}")
+    return lexicon_index
+
+
+if __name__ == "__main__":
+    build_lexicon_index()
@@ -0,0 +1,119 @@
+import json
+import time
+
+from lexicon.dawg import Dawg, encode_symbols
+from utils.greek_letters import GREEK_LETTERS
+
+
+# Separator symbol, placed after the 24 letter codes. A GADDAG path reads the letters
+# before the separator right-to-left from the anchor, and the letters after it left-to-right.
+SEPARATOR = len(GREEK_LETTERS) + 1
+
+
+def gaddag_sequences(word):
+    """
+    Build the GADDAG paths of a word: REV(word[:i]) + SEPARATOR + word[i:], for i = 1..len(word).
+
+    :param word: The word (uppercase Greek letters)
+    :return: List of symbol tuples, or an empty list if the word has letters outside the alphabet
+    """
+    symbols = encode_symbols(word)
+    if symbols is None:
+        return []
+    return [symbols[:i][::-1] + (SEPARATOR,) + symbols[i:] for i in range(1, len(symbols) + 1)]
+
+
+class Gaddag:
+    """
+    GADDAG (Gordon, 1994) stored as a minimized DAWG over the paths produced by gaddag_sequences().
+
+    A word ends at a node reached after the separator that is final in the DAWG.
+    """
+
+    def __init__(self, dawg):
+        """
+        :param dawg: The minimized DAWG over the GADDAG paths
+        """
+        self.dawg = dawg
+        self.transitions = dawg.transitions
+        self.is_final = dawg.is_final
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Build a GADDAG from a list of words.
+
+        :param words: Iterable of words (uppercase Greek letters)
+        :return: The GADDAG
+        """
+        sequences = [sequence for word in words for sequence in gaddag_sequences(word)]
+        return cls(Dawg.from_sequences(sequences, symbol_count=SEPARATOR))
+
+    @classmethod
+    def load(cls, file_path="assets/data/bin/scrabble_words.gaddag"):
+        """
+        Load a GADDAG written by save().
+
+        :param file_path: Path to the GADDAG file
+        :return: The GADDAG
+        """
+        return cls(Dawg.load(file_path))
+
+    def save(self, file_path="assets/data/bin/scrabble_words.gaddag"):
+        """
+        Write the GADDAG to a file (in the DAWG file format).
+
+        :param file_path: Path to the GADDAG file
+        :return: None
+        """
+        self.dawg.save(file_path)
+
+    def contains_symbols(self, symbols):
+        """
+        Check whether a sequence of letter codes is a word.
+
+        :param symbols: Sequence of letter codes
+        :return: True if the sequence is a word
+        """
+        if not symbols:
+            return False
+        # Path for i = 1: the first letter, the separator, then the rest of the word
+        node = self.dawg.walk((symbols[0], SEPARATOR, *symbols[1:]))
+        return node is not None and self.is_final(node)
+
+    def contains(self, word):
+        """
+        Check whether a word is in the GADDAG.
+
+        :param word: The word (uppercase Greek letters)
+        :return: True if the word is in the GADDAG
+        """
+        symbols = encode_symbols(word)
+        return symbols is not None and self.contains_symbols(symbols)
+
+
+def build_gaddag(
+        input_file="assets/data/json/scrabble_words_2_to_8_chars.json",
+        output_file="assets/data/bin/scrabble_words.gaddag"):
+    """
+    Compile the processed lexicon into a GADDAG and save it.
+
+    :param input_file: Path to the processed lexicon JSON file
+    :param output_file: Path to the GADDAG file
+    :return: The GADDAG
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        words = [entry["word"] for entry in json.load(f)]
+
+    start_time = time.perf_counter()
+    gaddag = Gaddag.from_words(words)
+    print(f"GADDAG built in {time.perf_counter() - start_time:.2f} s: "
+          f"{len(words)} words, {gaddag.dawg.node_count} nodes, {gaddag.dawg.edge_count} edges")
+
+    gaddag.save(output_file)
+    print(f"GADDAG saved to {output_file}")
+    return gaddag
+
+
+if __name__ == "__main__":
+    build_gaddag()
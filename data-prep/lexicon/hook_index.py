@@ -0,0 +1,121 @@
+"""
+Hook index file layout: a sectioned file (see lexicon/sectioned_file.py) whose record count is the
+word count, with the sections, each holding one 24-bit letter mask (3 bytes, little-endian) per word ID:
+
+    front           letters that make another valid word when added before the word
+    back            letters that make another valid word when added after the word
+    insert          letters that make another valid word when inserted between two letters of the word
+
+Bit (code - 1) of a mask stands for the letter with that code (see utils/greek_letters.py).
+Word IDs are the indexes of the words in the binary lexicon (see lexicon/binary_lexicon.py).
+"""
+import mmap
+
+from lexicon.sectioned_file import read_section_table
+from utils.greek_letters import GREEK_LETTERS
+
+
+MAGIC = b"SWHOOKS\0"
+FORMAT_VERSION = 1
+SECTIONS = ["front", "back", "insert"]
+MASK_SIZE = 3
+
+
+def mask_letters(mask):
+    """
+    Decode a letter mask.
+
+    :param mask: The 24-bit letter mask
+    :return: The letters of the mask, in alphabetical order
+    """
+    return "".join(letter for bit, letter in enumerate(GREEK_LETTERS) if mask >> bit & 1)
+
+
+class HookIndex:
+    """
+    Read-only view over a hook index file: the front hooks, back hooks and one-letter insert
+    extensions of every word, as letter masks addressed by word ID.
+
+    The file is memory-mapped; reading the hooks of a word decodes three 3-byte masks.
+    """
+
+    def __init__(self, file_path="assets/data/bin/scrabble_hooks.bin"):
+        """
+        :param file_path: Path to the hook index file
+        """
+        self._file = open(file_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.word_count, sections = read_section_table(
+                self._mm, MAGIC, FORMAT_VERSION, SECTIONS, "hook index", file_path)
+        except ValueError:
+            self.close()
+            raise
+        self._section_offsets = [sections[name][0] for name in SECTIONS]
+
+    def __len__(self):
+        return self.word_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and close the file.
+
+        :return: None
+        """
+        self._mm.close()
+        self._file.close()
+
+    def masks(self, word_id):
+        """
+        Return the letter masks of a word.
+
+        :param word_id: The word ID
+        :return: Tuple of (front, back, insert) 24-bit letter masks
+        """
+        if not 0 <= word_id < self.word_count:
+            raise IndexError(f"Word ID {word_id} out of range")
+        position = word_id * MASK_SIZE
+        return tuple(
+            int.from_bytes(self._mm[offset + position:offset + position + MASK_SIZE], "little")
+            for offset in self._section_offsets
+        )
+
+    def hooks(self, word_id):
+        """
+        Return the hook letters of a word.
+
+        :param word_id: The word ID
+        :return: Dictionary with the "front", "back" and "insert" letters, each in alphabetical order
+        """
+        return {name: mask_letters(mask) for name, mask in zip(SECTIONS, self.masks(word_id))}
+
+    def lookup(self, word, lexicon):
+        """
+        Return the hooks of a word and the words they make.
+
+        :param word: The word (uppercase Greek letters)
+        :param lexicon: The binary lexicon the index was built with, to resolve the word ID and check the insertions
+        :return: Dictionary with the hook letters ("front", "back", "insert") and the sorted "extensions",
+                 or None if the word is not in the lexicon
+        """
+        word_id = lexicon.index_of(word)
+        if word_id is None:
+            return None
+
+        hooks = self.hooks(word_id)
+        extensions = {letter + word for letter in hooks["front"]} | {word + letter for letter in hooks["back"]}
+        # A letter of the insert mask fits in at least one inner position, not necessarily all of them
+        extensions.update(
+            candidate
+            for letter in hooks["insert"]
+            for position in range(1, len(word))
+            if lexicon.contains(candidate := word[:position] + letter + word[position:])
+        )
+        return {**hooks, "extensions": sorted(extensions)}
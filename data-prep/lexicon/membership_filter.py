@@ -0,0 +1,234 @@
+"""
+Membership filter file layout (all integers little-endian):
+
+    header      magic (8 bytes), format version (uint16), hash count (uint16), bit count (uint32),
+                word count (uint32), target false positive rate (float64)
+    bits        bit count / 8 bytes; bit i is bit (i % 8) of byte i // 8
+
+The filter is a Bloom filter over the UTF-8 encoded words. The k bit positions of a word are
+derived from two 32-bit FNV-1a hashes with different offset bases, each followed by the
+MurmurHash3 finalizer to spread the bits of short, similar words (double hashing):
+position_i = (h1 + i * (h2 | 1)) mod bit count, which is simple to port to the web app.
+"""
+import math
+import struct
+from itertools import islice
+
+import numpy as np
+
+
+MAGIC = b"SWBLOOM\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHIId")
+
+FNV_PRIME = 0x01000193
+FNV_OFFSET_BASIS = 0x811C9DC5
+# Second offset basis, for the independent hash used as the double hashing step
+FNV_OFFSET_BASIS_2 = 0x050C5D1F
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+# Number of words hashed together by MembershipFilter.add_words
+HASH_BATCH_SIZE = 65536
+
+
+def fnv1a_32(data, offset_basis=FNV_OFFSET_BASIS):
+    """
+    32-bit FNV-1a hash of some bytes, followed by the MurmurHash3 finalizer.
+
+    :param data: The bytes to hash
+    :param offset_basis: The initial hash value
+    :return: The hash, as an unsigned 32-bit integer
+    """
+    value = offset_basis
+    for byte in data:
+        value = ((value ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+
+    value ^= value >> 16
+    value = (value * 0x85EBCA6B) & 0xFFFFFFFF
+    value ^= value >> 13
+    value = (value * 0xC2B2AE35) & 0xFFFFFFFF
+    return value ^ (value >> 16)
+
+
+def fnv1a_32_batch(words, offset_basis=FNV_OFFSET_BASIS):
+    """
+    Vectorized fnv1a_32 of many words at once, one byte column at a time.
+
+    :param words: The words, as bytes
+    :param offset_basis: The initial hash value
+    :return: Numpy array of the hashes, as unsigned 32-bit integers
+    """
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    # One row of bytes per word, padded with zeros; the padding is skipped below
+    matrix = np.zeros((len(words), int(lengths.max(initial=0))), dtype=np.uint8)
+    matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = np.frombuffer(b"".join(words), dtype=np.uint8)
+
+    # Unsigned 32-bit numpy arithmetic wraps around, like the masks of fnv1a_32
+    value = np.full(len(words), offset_basis, dtype=np.uint32)
+    for column in range(matrix.shape[1]):
+        hashed = (value ^ matrix[:, column]) * np.uint32(FNV_PRIME)
+        value = np.where(column < lengths, hashed, value)
+
+    value ^= value >> np.uint32(16)
+    value *= np.uint32(0x85EBCA6B)
+    value ^= value >> np.uint32(13)
+    value *= np.uint32(0xC2B2AE35)
+    return value ^ (value >> np.uint32(16))
+
+
+def filter_size(word_count, false_positive_rate):
+    """
+    Optimal Bloom filter size for a number of words and a target false positive rate.
+
+    :param word_count: Number of words in the filter
+    :param false_positive_rate: Target false positive rate, between 0 and 1
+    :return: Tuple of (bit count, rounded up to a whole byte, hash count)
+    """
+    if not 0 < false_positive_rate < 1:
+        raise ValueError(f"The false positive rate must be between 0 and 1, got {false_positive_rate}")
+    bit_count = math.ceil(-max(word_count, 1) * math.log(false_positive_rate) / math.log(2) ** 2)
+    bit_count += -bit_count % 8
+    hash_count = max(1, round(bit_count / max(word_count, 1) * math.log(2)))
+    return bit_count, hash_count
+
+
+class MembershipFilter:
+    """
+    Compact probabilistic word membership filter (a Bloom filter).
+
+    A word that is not in the filter is always rejected; a word that is in the filter may be a
+    false positive, at about the configured rate, so accepted words still need a lexicon lookup.
+    """
+
+    def __init__(self, bits, bit_count, hash_count, word_count=0, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """
+        :param bits: The bit array
+        :param bit_count: Number of bits of the filter
+        :param hash_count: Number of bit positions per word
+        :param word_count: Number of words added to the filter
+        :param false_positive_rate: Target false positive rate the filter was sized for
+        """
+        self.bits = bits
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.word_count = word_count
+        self.false_positive_rate = false_positive_rate
+
+    @classmethod
+    def build(cls, words, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE, word_count=None):
+        """
+        Build a filter sized for the given words and target false positive rate.
+
+        :param words: The words to add (uppercase Greek letters)
+        :param false_positive_rate: Target false positive rate, between 0 and 1
+        :param word_count: Number of words, when known in advance, so the words are added as they are
+            iterated instead of being collected first
+        :return: The filter
+        """
+        if word_count is None:
+            words = list(words)
+            word_count = len(words)
+        bit_count, hash_count = filter_size(word_count, false_positive_rate)
+        membership_filter = cls(bytearray(bit_count // 8), bit_count, hash_count, 0, false_positive_rate)
+        words = iter(words)
+        while batch := list(islice(words, HASH_BATCH_SIZE)):
+            membership_filter.add_words(batch)
+        return membership_filter
+
+    def _positions(self, word):
+        """Bit positions of a word."""
+        data = word.encode("utf-8")
+        first_hash = fnv1a_32(data)
+        step = fnv1a_32(data, FNV_OFFSET_BASIS_2) | 1  # Never a zero step
+        return ((first_hash + index * step) % self.bit_count for index in range(self.hash_count))
+
+    def add(self, word):
+        """
+        Add a word to the filter.
+
+        :param word: The word (uppercase Greek letters)
+        :return: None
+        """
+        for position in self._positions(word):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.word_count += 1
+
+    def add_words(self, words):
+        """
+        Add many words to the filter, hashing them together with numpy.
+
+        Sets the same bits as calling add for every word, much faster.
+
+        :param words: List of the words (uppercase Greek letters)
+        :return: None
+        """
+        data = [word.encode("utf-8") for word in words]
+        first_hash = fnv1a_32_batch(data).astype(np.uint64)
+        step = (fnv1a_32_batch(data, FNV_OFFSET_BASIS_2) | np.uint32(1)).astype(np.uint64)
+        positions = (first_hash[:, None] + np.arange(self.hash_count, dtype=np.uint64) * step[:, None]) \
+            % np.uint64(self.bit_count)
+
+        bitmap = np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), bitorder="little")
+        bitmap[positions.ravel()] = 1
+        self.bits = bytearray(np.packbits(bitmap, bitorder="little").tobytes())
+        self.word_count += len(words)
+
+    def __contains__(self, word):
+        return self.might_contain(word)
+
+    def might_contain(self, word):
+        """
+        Check whether a word may be in the filter.
+
+        :param word: The word (uppercase Greek letters)
+        :return: False if the word is certainly not in the filter, True if it probably is
+        """
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(word))
+
+    def to_bytes(self):
+        """
+        :return: The filter in its binary file format
+        """
+        return HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.hash_count, self.bit_count, self.word_count,
+            self.false_positive_rate) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Read a filter from its binary file format.
+
+        :param data: The file content
+        :return: The filter
+        """
+        magic, version, hash_count, bit_count, word_count, false_positive_rate = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a membership filter file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported membership filter version {version}")
+        bits = bytes(data[HEADER.size:HEADER.size + bit_count // 8])
+        if len(bits) != bit_count // 8:
+            raise ValueError("Truncated membership filter file")
+        return cls(bits, bit_count, hash_count, word_count, false_positive_rate)
+
+    def save(self, file_path):
+        """
+        Write the filter to a binary file.
+
+        :param file_path: Path to the filter file
+        :return: None
+        """
+        with open(file_path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, file_path="assets/data/bin/scrabble_words.bloom"):
+        """
+        Read a filter from a binary file.
+
+        :param file_path: Path to the filter file
+        :return: The filter
+        """
+        with open(file_path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,590 @@
+import heapq
+import itertools
+import sys
+import time
+
+from lexicon.gaddag import SEPARATOR, Gaddag
+from processors.preprocess_scrabble_data import scrabble_points_gr
+from utils.greek_letters import GREEK_LETTERS, LETTER_CODES
+
+
+BOARD_SIZE = 15
+CENTER = BOARD_SIZE // 2
+RACK_SIZE = 7
+BINGO_BONUS = 50
+
+# Characters used in board and rack strings
+EMPTY_SQUARE = "."
+WILDCARD = "*"
+
+# Standard premium squares: T = triple word, D = double word, t = triple letter, d = double letter
+PREMIUM_SQUARES = [
+    "T..d...T...d..T",
+    ".D...t...t...D.",
+    "..D...d.d...D..",
+    "d..D...d...D..d",
+    "....D.....D....",
+    ".t...t...t...t.",
+    "..d...d.d...d..",
+    "T..d...D...d..T",
+    "..d...d.d...d..",
+    ".t...t...t...t.",
+    "....D.....D....",
+    "d..D...d...D..d",
+    "..D...d.d...D..",
+    ".D...t...t...D.",
+    "T..d...T...d..T",
+]
+LETTER_MULTIPLIERS = {"d": 2, "t": 3}
+WORD_MULTIPLIERS = {"D": 2, "T": 3}
+
+# Letter values indexed by letter code (index 0 is the blank tile)
+LETTER_POINTS = [0] + [scrabble_points_gr[letter] for letter in GREEK_LETTERS]
+
+ALL_LETTERS_MASK = sum(1 << code for code in range(1, len(GREEK_LETTERS) + 1))
+
+
+class Board:
+    """
+    A 15x15 Greek Scrabble board.
+
+    Squares hold a letter code or None. Blank tiles on the board are tracked separately,
+    as they spell a letter but score no points.
+    """
+
+    def __init__(self, squares=None, blanks=None):
+        """
+        :param squares: 15x15 list of letter codes (or None for empty squares)
+        :param blanks: Set of (row, col) squares holding a blank tile
+        """
+        self.squares = squares or [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        self.blanks = blanks or set()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a board from 15 strings of 15 characters: '.' for an empty square,
+        an uppercase letter for a tile and a lowercase letter for a blank tile.
+
+        :param rows: List of 15 strings
+        :return: The board
+        """
+        if len(rows) != BOARD_SIZE or any(len(row) != BOARD_SIZE for row in rows):
+            raise ValueError(f"A board needs {BOARD_SIZE} rows of {BOARD_SIZE} squares")
+
+        board = cls()
+        for row_index, row in enumerate(rows):
+            for col_index, character in enumerate(row):
+                if character == EMPTY_SQUARE:
+                    continue
+                letter = character.upper()
+                if letter not in LETTER_CODES:
+                    raise ValueError(f"Invalid letter '{character}' on row {row_index + 1}")
+                board.squares[row_index][col_index] = LETTER_CODES[letter]
+                if character != letter:
+                    board.blanks.add((row_index, col_index))
+        return board
+
+    def to_rows(self):
+        """
+        Convert the board back to 15 strings (see from_rows).
+
+        :return: List of 15 strings
+        """
+        rows = []
+        for row_index, row in enumerate(self.squares):
+            characters = []
+            for col_index, code in enumerate(row):
+                if code is None:
+                    characters.append(EMPTY_SQUARE)
+                elif (row_index, col_index) in self.blanks:
+                    characters.append(GREEK_LETTERS[code - 1].lower())
+                else:
+                    characters.append(GREEK_LETTERS[code - 1])
+            rows.append("".join(characters))
+        return rows
+
+    def transposed(self):
+        """
+        Return the board mirrored over its main diagonal, so down moves can be generated as across moves.
+
+        :return: The transposed board
+        """
+        squares = [list(column) for column in zip(*self.squares)]
+        return Board(squares, {(col, row) for row, col in self.blanks})
+
+    def is_empty(self):
+        """
+        Check whether no tile has been played yet.
+
+        :return: True if the board is empty
+        """
+        return all(code is None for row in self.squares for code in row)
+
+    def play(self, move):
+        """
+        Place the tiles of a move on the board.
+
+        :param move: A move returned by the move generator
+        :return: None
+        """
+        for row, col, letter, is_blank in move["tiles"]:
+            self.squares[row][col] = LETTER_CODES[letter]
+            if is_blank:
+                self.blanks.add((row, col))
+
+
+def parse_rack(rack):
+    """
+    Convert a rack string to tile counts indexed by letter code (index 0 counts the blank tiles).
+
+    :param rack: The rack, e.g. "ΑΒΓ*" ('*' for blank tiles)
+    :return: List of 25 tile counts
+    """
+    counts = [0] * (len(GREEK_LETTERS) + 1)
+    for letter in rack.strip().upper():
+        if letter == WILDCARD:
+            counts[0] += 1
+        elif letter in LETTER_CODES:
+            counts[LETTER_CODES[letter]] += 1
+        elif not letter.isspace():
+            raise ValueError(f"Invalid letter '{letter}' in rack '{rack}'")
+    return counts
+
+
+class MoveGenerator:
+    """
+    Legal move generator and scorer for Greek Scrabble, based on a GADDAG (Gordon, 1994).
+
+    Moves are generated row by row from every anchor square (an empty square next to a tile).
+    Cross-checks (Appel & Jacobson, 1988) restrict each empty square to the letters that form
+    a valid perpendicular word. Down moves are generated as across moves on the transposed board.
+    """
+
+    def __init__(self, gaddag):
+        """
+        :param gaddag: The GADDAG of the lexicon
+        """
+        self.gaddag = gaddag
+        self._transitions = gaddag.transitions
+        self._is_final = gaddag.is_final
+
+    def cross_checks(self, board, row):
+        """
+        Compute the cross-check masks and cross-word scores of every square of a row.
+
+        :param board: The board (across orientation)
+        :param row: The row index
+        :return: Tuple of (masks, cross_scores); masks[col] has bit `code` set for every allowed letter,
+                 cross_scores[col] is the score of the perpendicular tiles (None if there are none)
+        """
+        masks = [0] * BOARD_SIZE
+        cross_scores = [None] * BOARD_SIZE
+        squares = board.squares
+
+        for col in range(BOARD_SIZE):
+            if squares[row][col] is not None:
+                continue
+
+            above = []
+            above_row = row - 1
+            while above_row >= 0 and squares[above_row][col] is not None:
+                above.append(squares[above_row][col])  # Collected upwards, i.e. already reversed
+                above_row -= 1
+            below = []
+            below_row = row + 1
+            while below_row < BOARD_SIZE and squares[below_row][col] is not None:
+                below.append(squares[below_row][col])
+                below_row += 1
+
+            if not above and not below:
+                masks[col] = ALL_LETTERS_MASK
+                continue
+
+            cross_scores[col] = sum(
+                LETTER_POINTS[squares[tile_row][col]]
+                for tile_row in list(range(above_row + 1, row)) + list(range(row + 1, below_row))
+                if (tile_row, col) not in board.blanks)
+
+            # The perpendicular word is above + letter + below; its GADDAG path is
+            # letter + REV(above) + SEPARATOR + below
+            mask = 0
+            for code, node in self._transitions(0).items():
+                if code == SEPARATOR:
+                    continue
+                node = self.gaddag.dawg.walk(above, node)
+                if node is None:
+                    continue
+                node = self._transitions(node).get(SEPARATOR)
+                if node is None:
+                    continue
+                node = self.gaddag.dawg.walk(below, node)
+                if node is not None and self._is_final(node):
+                    mask |= 1 << code
+            masks[col] = mask
+
+        return masks, cross_scores
+
+    def anchors(self, board, row):
+        """
+        Find the anchor squares of a row: empty squares next to a tile, or the center square on an empty board.
+
+        :param board: The board (across orientation)
+        :param row: The row index
+        :return: List of booleans, one per column
+        """
+        squares = board.squares
+        if board.is_empty():
+            return [row == CENTER and col == CENTER for col in range(BOARD_SIZE)]
+
+        anchors = [False] * BOARD_SIZE
+        for col in range(BOARD_SIZE):
+            if squares[row][col] is not None:
+                continue
+            anchors[col] = (
+                (row > 0 and squares[row - 1][col] is not None)
+                or (row < BOARD_SIZE - 1 and squares[row + 1][col] is not None)
+                or (col > 0 and squares[row][col - 1] is not None)
+                or (col < BOARD_SIZE - 1 and squares[row][col + 1] is not None)
+            )
+        return anchors
+
+    def generate_row_moves(self, board, row, rack, record, all_designations=True, score_floor=None):
+        """
+        Generate and score every across move of a row.
+
+        The GADDAG is walked with each rack letter taken from a real tile while one is left and from
+        a blank tile otherwise, so every word placement is found once. The score is accumulated on the way
+        as if all placed tiles were real; which placed tiles the blanks stand for is only chosen when a move
+        is recorded (see designate_blanks()).
+
+        With a score floor, the walk is cut wherever an upper bound on the score of the moves it could
+        still reach (see score_bound()) is not above the floor, so only the moves scoring above it are
+        certain to be recorded.
+
+        :param board: The board (across orientation)
+        :param row: The row index
+        :param rack: Tile counts indexed by letter code (index 0 counts the blank tiles); restored on return
+        :param record: Callable receiving (row, start_col, letters, placed, score) for every legal move,
+                       where placed is a tuple of (col, is_blank) pairs
+        :param all_designations: Whether to record every choice of blank tiles, or only the highest scoring one
+        :param score_floor: One-element list holding the score the recorded moves must beat, which record()
+                            may raise while moves are generated (None records every move)
+        :return: None
+        """
+        anchors = self.anchors(board, row)
+        if not any(anchors):
+            return
+
+        squares = board.squares[row]
+        board_points = [
+            0 if code is None or (row, col) in board.blanks else LETTER_POINTS[code]
+            for col, code in enumerate(squares)]
+        letter_multipliers = [LETTER_MULTIPLIERS.get(premium, 1) for premium in PREMIUM_SQUARES[row]]
+        word_multipliers = [WORD_MULTIPLIERS.get(premium, 1) for premium in PREMIUM_SQUARES[row]]
+        masks, cross_scores = self.cross_checks(board, row)
+        transitions = self._transitions
+        final_flags = self.gaddag.dawg.final_flags
+        tile_count = sum(rack)
+
+        # Only real tiles score, whichever placed tiles the blanks end up on
+        rack_points = sorted(
+            (LETTER_POINTS[code] for code in range(1, len(rack)) for _ in range(rack[code])), reverse=True)
+        bingo_bound = BINGO_BONUS if tile_count == RACK_SIZE else 0
+
+        def reach(col, step, tiles_left, anchor):
+            # Squares a word can still cover from col onwards: it stops at the first empty square it
+            # cannot fill (no tiles left, no letter allowed, or another anchor to the left of its own)
+            empty_cols = []
+            board_total = 0
+            while 0 <= col < BOARD_SIZE:
+                if squares[col] is not None:
+                    board_total += board_points[col]
+                elif len(empty_cols) == tiles_left or not masks[col] or (step < 0 and col != anchor and anchors[col]):
+                    break
+                else:
+                    empty_cols.append(col)
+                col += step
+            return empty_cols, board_total
+
+        def score_bound(anchor, position, tiles_left):
+            # Optimistic score that the tiles left can add to a partial move: the best rack letters on the
+            # best letter premiums, every word premium within reach, and the best cross-word on every square
+            col = anchor + position
+            empty_cols, board_total = reach(col, 1 if position > 0 else -1, tiles_left, anchor)
+            if position <= 0 and anchor + 1 < BOARD_SIZE:
+                right_cols, right_total = reach(anchor + 1, 1, tiles_left, anchor)
+                empty_cols += right_cols
+                board_total += right_total
+
+            placeable = min(tiles_left, len(empty_cols))
+            best_letter_multipliers = sorted((letter_multipliers[col] for col in empty_cols), reverse=True)
+            main_bound = board_total + sum(
+                points * multiplier for points, multiplier in zip(rack_points[:placeable], best_letter_multipliers))
+            multiplier_bound = 1
+            for multiplier in sorted((word_multipliers[col] for col in empty_cols), reverse=True)[:placeable]:
+                multiplier_bound *= multiplier
+            top_points = rack_points[0] if rack_points else 0
+            cross_bound = sum(sorted(
+                ((cross_scores[col] + top_points * letter_multipliers[col]) * word_multipliers[col]
+                 for col in empty_cols if cross_scores[col] is not None), reverse=True)[:placeable])
+            return main_bound, multiplier_bound, cross_bound + bingo_bound
+
+        def designate_blanks(start_col, letters, placed, blank_codes, main_score, main_multiplier, cross_total):
+            # Score with every placed tile real, then take off what each blank tile would have scored
+            score = main_score * main_multiplier + cross_total
+            if len(placed) == RACK_SIZE:
+                score += BINGO_BONUS
+            if not blank_codes and not (all_designations and rack[0]):
+                record(row, start_col, letters, tuple((col, False) for col, _ in placed), score)
+                return
+
+            values = [
+                LETTER_POINTS[code] * letter_multipliers[col] * (
+                    main_multiplier + (word_multipliers[col] if cross_scores[col] is not None else 0))
+                for col, code in placed]
+
+            if not all_designations:
+                # The best choice puts the blanks on the lowest valued tiles of the letters they stand for
+                blank_indexes = set()
+                for code in set(blank_codes):
+                    indexes = sorted((index for index, (_, placed_code) in enumerate(placed) if placed_code == code),
+                                     key=values.__getitem__)
+                    blank_indexes.update(indexes[:blank_codes.count(code)])
+                record(row, start_col, letters,
+                       tuple((col, index in blank_indexes) for index, (col, _) in enumerate(placed)),
+                       score - sum(values[index] for index in blank_indexes))
+                return
+
+            # Every choice: the blanks used must cover the letters missing from the rack,
+            # and any blanks left on the rack can stand in for real tiles as well
+            for blank_count in range(len(blank_codes), len(blank_codes) + rack[0] + 1):
+                for blank_indexes in itertools.combinations(range(len(placed)), blank_count):
+                    blank_letters = [placed[index][1] for index in blank_indexes]
+                    if any(blank_letters.count(code) < blank_codes.count(code) for code in blank_codes):
+                        continue
+                    record(row, start_col, letters,
+                           tuple((col, index in blank_indexes) for index, (col, _) in enumerate(placed)),
+                           score - sum(values[index] for index in blank_indexes))
+
+        for anchor in range(BOARD_SIZE):
+            if not anchors[anchor]:
+                continue
+
+            right_of_anchor_empty = anchor + 1 >= BOARD_SIZE or squares[anchor + 1] is None
+            bounds = {}  # Score bounds by (position, number of placed tiles)
+
+            def go_on(position, code, letters, placed, blank_codes, node, main_score, main_multiplier, cross_total):
+                # Empty squares are only worth visiting while tiles are left on the rack
+                has_tiles = len(placed) < tile_count
+                col = anchor + position
+                if position <= 0:
+                    letters = (code,) + letters
+                    left_empty = col == 0 or squares[col - 1] is None
+
+                    separator_node = transitions(node).get(SEPARATOR)
+                    if left_empty and right_of_anchor_empty and separator_node is not None \
+                            and final_flags[separator_node]:
+                        designate_blanks(col, letters, placed, blank_codes, main_score, main_multiplier, cross_total)
+
+                    # Keep extending to the left, without placing tiles on another anchor
+                    # (those moves are generated from that anchor)
+                    if col > 0 and (squares[col - 1] is not None or (has_tiles and not anchors[col - 1])):
+                        generate(position - 1, letters, placed, blank_codes, node,
+                                 main_score, main_multiplier, cross_total)
+
+                    # Switch to extending to the right of the anchor
+                    if separator_node is not None and left_empty and anchor + 1 < BOARD_SIZE and (
+                            has_tiles or not right_of_anchor_empty):
+                        generate(1, letters, placed, blank_codes, separator_node,
+                                 main_score, main_multiplier, cross_total)
+                else:
+                    letters = letters + (code,)
+                    right_empty = col + 1 >= BOARD_SIZE or squares[col + 1] is None
+                    if right_empty and final_flags[node]:
+                        designate_blanks(col - len(letters) + 1, letters, placed, blank_codes,
+                                         main_score, main_multiplier, cross_total)
+                    if col + 1 < BOARD_SIZE and (has_tiles or not right_empty):
+                        generate(position + 1, letters, placed, blank_codes, node,
+                                 main_score, main_multiplier, cross_total)
+
+            def generate(position, letters, placed, blank_codes, node, main_score, main_multiplier, cross_total):
+                if score_floor is not None:
+                    bound_key = (position, len(placed))
+                    if bound_key not in bounds:
+                        bounds[bound_key] = score_bound(anchor, position, tile_count - len(placed))
+                    main_bound, multiplier_bound, other_bound = bounds[bound_key]
+                    if (main_score + main_bound) * main_multiplier * multiplier_bound + cross_total + other_bound \
+                            <= score_floor[0]:
+                        return
+
+                col = anchor + position
+                code = squares[col]
+                if code is not None:
+                    child = transitions(node).get(code)
+                    if child is not None:
+                        go_on(position, code, letters, placed, blank_codes, child,
+                              main_score + board_points[col], main_multiplier, cross_total)
+                    return
+
+                mask = masks[col]
+                letter_multiplier = letter_multipliers[col]
+                word_multiplier = word_multipliers[col]
+                cross_score = cross_scores[col]
+
+                for code, child in transitions(node).items():
+                    if code == SEPARATOR or not mask >> code & 1:
+                        continue
+                    rack_code = code if rack[code] else 0
+                    if not rack[rack_code]:
+                        continue
+                    letter_score = LETTER_POINTS[code] * letter_multiplier
+                    rack[rack_code] -= 1
+                    go_on(position, code, letters, placed + ((col, code),),
+                          blank_codes + (code,) if rack_code == 0 else blank_codes, child,
+                          main_score + letter_score, main_multiplier * word_multiplier,
+                          cross_total if cross_score is None
+                          else cross_total + (cross_score + letter_score) * word_multiplier)
+                    rack[rack_code] += 1
+
+            generate(0, (), (), (), 0, 0, 1, 0)
+
+    def _generate(self, board, rack, record, all_designations=True, mirror_empty_board=True, score_floor=None):
+        """
+        Generate every legal move, across and down, passing each one to record() in board coordinates.
+
+        :param board: The board
+        :param rack: The rack string
+        :param record: Callable receiving (direction, row, col, letters, placed, score), where placed
+                       is a tuple of (row, col, is_blank) tuples
+        :param all_designations: Whether to record every choice of blank tiles, or only the highest scoring one
+        :param mirror_empty_board: Whether to record the down moves of an empty board, which mirror its across moves
+        :param score_floor: One-element list holding the score the recorded moves must beat (see generate_row_moves)
+        :return: None
+        """
+        rack_counts = parse_rack(rack)
+        seen_single_tiles = set()
+
+        # On an empty board every down move mirrors an across move with the same score, as the premium
+        # squares are symmetric, so only the across moves are generated
+        empty_board = board.is_empty()
+        directions = [("across", board)] if empty_board else [("across", board), ("down", board.transposed())]
+        for direction, oriented_board in directions:
+            def record_row_move(row, start_col, letters, placed, score):
+                if len(letters) < 2:
+                    return
+                if direction == "across":
+                    placed = tuple((row, col, is_blank) for col, is_blank in placed)
+                    start = (row, start_col)
+                else:
+                    placed = tuple((col, row, is_blank) for col, is_blank in placed)
+                    start = (start_col, row)
+
+                # A single tile forming words both ways is found once per direction; keep it once
+                if len(placed) == 1:
+                    key = (placed[0], letters[placed[0][1] - start[1] + placed[0][0] - start[0]])
+                    if key in seen_single_tiles:
+                        return
+                    seen_single_tiles.add(key)
+
+                record(direction, start[0], start[1], letters, placed, score)
+                if empty_board and mirror_empty_board:
+                    record("down", start[1], start[0], letters,
+                           tuple((col, row, is_blank) for row, col, is_blank in placed), score)
+
+            for row in range(BOARD_SIZE):
+                self.generate_row_moves(
+                    oriented_board, row, rack_counts, record_row_move, all_designations, score_floor)
+
+    @staticmethod
+    def _make_move(direction, row, col, letters, placed, score):
+        """
+        Build the move dictionary returned by generate_moves() and best_moves().
+        """
+        word = "".join(GREEK_LETTERS[code - 1] for code in letters)
+        tiles = [
+            (tile_row, tile_col, word[tile_row - row + tile_col - col], is_blank)
+            for tile_row, tile_col, is_blank in placed]
+        return {"word": word, "row": row, "col": col, "direction": direction, "score": score, "tiles": tiles}
+
+    def generate_moves(self, board, rack):
+        """
+        Generate every legal move for a rack, across and down, with its score.
+
+        :param board: The board
+        :param rack: The rack, e.g. "ΑΒΓΔΕ**" ('*' for blank tiles)
+        :return: List of moves; each move is a dictionary with the word, its start square, direction,
+                 score and the placed tiles as (row, col, letter, is_blank) tuples
+        """
+        moves = []
+        self._generate(board, rack, lambda *move: moves.append(self._make_move(*move)))
+        return moves
+
+    def best_moves(self, board, rack, count=10):
+        """
+        Return the highest scoring legal moves for a rack.
+
+        Only the highest scoring choice of blank tiles is considered for each word placement, the best
+        candidates are kept in a bounded heap while generating, and only those are turned into move dictionaries.
+        Once the heap is full, the score of its worst move is the floor below which the generator stops
+        walking (branch and bound). On an empty board, the down moves mirroring across moves are left out.
+
+        :param board: The board
+        :param rack: The rack, e.g. "ΑΒΓΔΕ**" ('*' for blank tiles)
+        :param count: Number of moves to return
+        :return: List of moves (see generate_moves), highest score first
+        """
+        heap = []
+        counter = itertools.count()
+        # Moves that do not score above the floor could not enter the heap (ties keep the earlier move)
+        score_floor = [-1]
+
+        def record(*move):
+            item = (move[-1], -next(counter), move)
+            if len(heap) < count:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            if len(heap) == count:
+                score_floor[0] = heap[0][0]
+
+        if count > 0:
+            self._generate(board, rack, record, all_designations=False, mirror_empty_board=False,
+                           score_floor=score_floor)
+        return [self._make_move(*move) for _, _, move in sorted(heap, reverse=True)]
+
+
+def format_move(move):
+    """
+    Format a move in the usual notation: "8H ΛΕΞΗ" for across moves, "H8 ΛΕΞΗ" for down moves.
+
+    Letters played with a blank tile are shown in lowercase.
+
+    :param move: A move returned by the move generator
+    :return: The formatted move
+    """
+    row_label = str(move["row"] + 1)
+    col_label = "ABCDEFGHIJKLMNO"[move["col"]]
+    square = row_label + col_label if move["direction"] == "across" else col_label + row_label
+
+    blank_squares = {(row, col) for row, col, _, is_blank in move["tiles"] if is_blank}
+    letters = []
+    for offset, letter in enumerate(move["word"]):
+        row = move["row"] + (offset if move["direction"] == "down" else 0)
+        col = move["col"] + (offset if move["direction"] == "across" else 0)
+        letters.append(letter.lower() if (row, col) in blank_squares else letter)
+    return f"{square} {''.join(letters)} ({move['score']})"
+
+
+if __name__ == "__main__":
+    rack = sys.argv[1] if len(sys.argv) > 1 else "ΑΕΡΙΣΤ*"
+
+    start_time = time.perf_counter()
+    move_generator = MoveGenerator(Gaddag.load())
+    print(f"GADDAG loaded in {time.perf_counter() - start_time:.2f} s")
+
+    start_time = time.perf_counter()
+    best_moves = move_generator.best_moves(Board(), rack)
+    print(f"Best opening moves for {rack} ({(time.perf_counter() - start_time) * 1000:.1f} ms):")
+    for move in best_moves:
+        print(f"  {format_move(move)}")
@@ -0,0 +1,367 @@
+import argparse
+import asyncio
+import bisect
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from lexicon.anagram_engine import AnagramEngine
+from lexicon.suggestions import DEFAULT_LIMIT, MAX_EDIT_DISTANCE, SuggestionEngine
+from utils.caching import LRUCache, canonical_rack
+from utils.greek_letters import normalize_word
+
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000]
+
+# Largest accepted request body and batch
+MAX_BODY_SIZE = 4 * 1024 * 1024
+MAX_BATCH_SIZE = 10000
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed buckets (see LATENCY_BUCKETS_MS).
+    """
+
+    def __init__(self, bucket_bounds_ms=LATENCY_BUCKETS_MS):
+        """
+        :param bucket_bounds_ms: Upper bounds of the buckets, in milliseconds
+        """
+        self.bucket_bounds_ms = list(bucket_bounds_ms)
+        self.counts = [0] * (len(self.bucket_bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms):
+        """
+        Add a latency to the histogram.
+
+        :param latency_ms: The latency, in milliseconds
+        :return: None
+        """
+        self.counts[bisect.bisect_left(self.bucket_bounds_ms, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction):
+        """
+        Estimate a latency percentile as the upper bound of the bucket it falls in.
+
+        :param fraction: The percentile, between 0 and 1 (e.g. 0.99)
+        :return: The latency in milliseconds, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bucket_bounds_ms + [self.max_ms], self.counts):
+            seen += count
+            if seen >= target:
+                return round(min(bound, self.max_ms), 4)
+        return round(self.max_ms, 4)
+
+    def stats(self):
+        """
+        :return: Dictionary with the request count, mean, max and estimated percentiles, and the bucket counts
+        """
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else None,
+            "max_ms": round(self.max_ms, 4),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                **{f"<={bound}ms": count for bound, count in zip(self.bucket_bounds_ms, self.counts)},
+                f">{self.bucket_bounds_ms[-1]}ms": self.counts[-1],
+            },
+        }
+
+
+def is_string_list(items):
+    """Whether a request body value is a list of strings, of at most MAX_BATCH_SIZE items."""
+    return isinstance(items, list) and len(items) <= MAX_BATCH_SIZE and all(isinstance(item, str) for item in items)
+
+
+class LexiconService:
+    """
+    In-memory query service over the processed lexicon: word validation, "did you mean" suggestions and
+    anagram search, with LRU result caches.
+    """
+
+    def __init__(self, data, cache_size=10000):
+        """
+        :param data: The processed word entries
+        :param cache_size: Maximum number of cached results per query type
+        """
+        self.entries = {entry["word"]: entry for entry in data}
+        self.anagram_engine = AnagramEngine(data)
+        self.suggestion_engine = SuggestionEngine.from_data(data)
+        self.validate_cache = LRUCache(cache_size)
+        self.suggest_cache = LRUCache(cache_size)
+        self.anagram_cache = LRUCache(cache_size)
+
+    @classmethod
+    def from_json_file(cls, input_file="assets/data/json/scrabble_words_2_to_8_chars.json", cache_size=10000):
+        """
+        Load the service from the processed lexicon JSON file.
+
+        :param input_file: Path to the processed lexicon JSON file
+        :param cache_size: Maximum number of cached results per query type
+        :return: The service
+        """
+        with open(input_file, "r", encoding="utf-8") as f:
+            return cls(json.load(f), cache_size)
+
+    def validate(self, word):
+        """
+        Check whether a word is valid and return its metadata.
+
+        :param word: The word as typed (accents and case are normalized)
+        :return: Dictionary with the normalized word, whether it is valid and, if it is, its lemma, dictionary and points
+        """
+        word = normalize_word(word)
+        return self.validate_cache.get(word, lambda: self._validate(word))
+
+    def _validate(self, word):
+        entry = self.entries.get(word)
+        if entry is None:
+            return {"word": word, "valid": False}
+        return {
+            "word": word,
+            "valid": True,
+            "lemma": entry["lemma"],
+            "dictionary": entry["dictionary"],
+            "points": entry["points"],
+        }
+
+    def suggest(self, word, max_distance=MAX_EDIT_DISTANCE, limit=DEFAULT_LIMIT):
+        """
+        Suggest the valid words closest to a word, e.g. after it failed validation.
+
+        :param word: The word as typed (accents and case are normalized)
+        :param max_distance: The maximum edit distance (0 to 2)
+        :param limit: Maximum number of suggestions
+        :return: Dictionary with the normalized word and its suggestions (word, distance and points), closest first
+        """
+        word = normalize_word(word)
+        return self.suggest_cache.get(
+            (word, max_distance, limit),
+            lambda: {"word": word, "suggestions": self.suggestion_engine.suggest(word, max_distance, limit)})
+
+    def anagram(self, rack, min_length=2):
+        """
+        Find all words that can be formed from a rack.
+
+        :param rack: The rack as typed, e.g. "ΑΒΓ*" ('*' for blank tiles, accents and case are normalized)
+        :param min_length: Minimum word length to include
+        :return: Dictionary with the canonical rack and the words grouped by length (longest first), highest points first
+        """
+        rack = canonical_rack(normalize_word(rack))
+        return self.anagram_cache.get(
+            (rack, min_length),
+            lambda: {"rack": rack, "words": self.anagram_engine.search(rack, min_length)})
+
+    def stats(self):
+        """
+        :return: Dictionary with the lexicon size and the cache statistics
+        """
+        return {
+            "words": len(self.entries),
+            "validate_cache": self.validate_cache.stats(),
+            "suggest_cache": self.suggest_cache.stats(),
+            "anagram_cache": self.anagram_cache.stats(),
+        }
+
+
+class QueryServer:
+    """
+    Minimal HTTP/1.1 JSON server over asyncio streams.
+
+    Endpoints:
+
+        GET  /validate?word=ΛΕΞΗ
+        GET  /suggest?word=ΛΕΞΙ&max_distance=2&limit=10
+        GET  /anagram?rack=ΑΕΡΙΣΤ*&min_length=2
+        POST /validate/batch    {"words": [...]}
+        POST /anagram/batch     {"racks": [...], "min_length": 2}
+        GET  /stats             cache statistics and per-endpoint latency histograms
+
+    Words and racks are normalized the same way on every endpoint (see normalize_word): accents, case
+    and surrounding whitespace are ignored. Connections are kept alive unless the client asks otherwise.
+    Latencies are measured from the parsed request to the serialized response.
+    """
+
+    def __init__(self, service):
+        """
+        :param service: The lexicon service answering the queries
+        """
+        self.service = service
+        self.routes = {
+            ("GET", "/validate"): self.handle_validate,
+            ("GET", "/suggest"): self.handle_suggest,
+            ("GET", "/anagram"): self.handle_anagram,
+            ("POST", "/validate/batch"): self.handle_validate_batch,
+            ("POST", "/anagram/batch"): self.handle_anagram_batch,
+            ("GET", "/stats"): self.handle_stats,
+        }
+        self.histograms = {path: LatencyHistogram() for _, path in self.routes}
+
+    def handle_validate(self, query, body):
+        word = query.get("word")
+        if not word:
+            return 400, {"error": "Missing 'word' parameter"}
+        return 200, self.service.validate(word)
+
+    def handle_suggest(self, query, body):
+        word = query.get("word")
+        if not word:
+            return 400, {"error": "Missing 'word' parameter"}
+        max_distance = int(query.get("max_distance", MAX_EDIT_DISTANCE))
+        if not 0 <= max_distance <= MAX_EDIT_DISTANCE:
+            return 400, {"error": f"'max_distance' must be between 0 and {MAX_EDIT_DISTANCE}"}
+        limit = int(query.get("limit", DEFAULT_LIMIT))
+        if limit < 0:
+            return 400, {"error": "'limit' must not be negative"}
+        return 200, self.service.suggest(word, max_distance, limit)
+
+    def handle_anagram(self, query, body):
+        rack = query.get("rack")
+        if not rack:
+            return 400, {"error": "Missing 'rack' parameter"}
+        return 200, self.service.anagram(rack, int(query.get("min_length", 2)))
+
+    def handle_validate_batch(self, query, body):
+        words = body.get("words")
+        if not is_string_list(words):
+            return 400, {"error": f"'words' must be a list of at most {MAX_BATCH_SIZE} word strings"}
+        return 200, {"results": [self.service.validate(word) for word in words]}
+
+    def handle_anagram_batch(self, query, body):
+        racks = body.get("racks")
+        if not is_string_list(racks):
+            return 400, {"error": f"'racks' must be a list of at most {MAX_BATCH_SIZE} rack strings"}
+        min_length = body.get("min_length", 2)
+        # bool is a subclass of int, but not a length
+        if not isinstance(min_length, int) or isinstance(min_length, bool):
+            return 400, {"error": "'min_length' must be an integer"}
+        return 200, {"results": [self.service.anagram(rack, min_length) for rack in racks]}
+
+    def handle_stats(self, query, body):
+        return 200, {
+            **self.service.stats(),
+            "latency": {path: histogram.stats() for path, histogram in self.histograms.items()},
+        }
+
+    def dispatch(self, method, target, body):
+        """
+        Route a request to its handler and serialize the response.
+
+        :param method: The HTTP method
+        :param target: The request target (path and query string)
+        :param body: The request body
+        :return: Tuple of (status, JSON response body as bytes)
+        """
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return 405, json.dumps({"error": f"Method {method} not allowed"}).encode("utf-8")
+            return 404, json.dumps({"error": f"Unknown endpoint {url.path}"}).encode("utf-8")
+
+        start_time = time.perf_counter()
+        try:
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise ValueError("The request body must be a JSON object")
+            status, response = handler(query, payload)
+        except ValueError as e:
+            status, response = 400, {"error": str(e)}
+        response_body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        self.histograms[url.path].record((time.perf_counter() - start_time) * 1000)
+        return status, response_body
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve the requests of one client connection.
+
+        :param reader: The stream reader of the connection
+        :param writer: The stream writer of the connection
+        :return: None
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header_line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                content_length = int(headers.get("content-length", 0))
+                if content_length > MAX_BODY_SIZE:
+                    status, response_body = 413, b'{"error": "Request body too large"}'
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(content_length) if content_length else b""
+                    status, response_body = self.dispatch(method, target, body)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(response_body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + response_body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass  # Malformed request or client gone; drop the connection
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """
+        Accept connections until cancelled.
+
+        :param host: The interface to listen on
+        :param port: The port to listen on
+        :return: None
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving {len(self.service.entries)} words on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve word validation, suggestions and anagram search over HTTP.")
+    parser.add_argument("--input-file", default="assets/data/json/scrabble_words_2_to_8_chars.json",
+                        help="Processed lexicon JSON file")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="Maximum number of cached results per query type (default: 10000)")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    lexicon_service = LexiconService.from_json_file(args.input_file, args.cache_size)
+    print(f"Lexicon loaded in {time.perf_counter() - start_time:.2f} s")
+
+    try:
+        asyncio.run(QueryServer(lexicon_service).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
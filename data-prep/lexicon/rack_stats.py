@@ -0,0 +1,145 @@
+"""
+Rack statistics file layout: a sectioned file (see lexicon/sectioned_file.py) whose record count is the
+number of 7- and 8-letter words, with the sections below (all integers little-endian).
+
+There is one table per rack size (7 and 8 tiles) and kind of rack (all letters, or one blank).
+A table is made of two sections:
+
+    racks_<table>   the racks with at least one valid word, 8 bytes each: the letter codes of the
+                    rack (see utils/greek_letters.py) sorted ascending and zero padded, so the racks
+                    sort like big-endian uint64 and a lookup is a binary search
+    counts_<table>  one uint16 per rack: the number of valid words using all the tiles of the rack
+
+A rack with one blank is stored by its letters only (6 or 7 of them). Racks that are drawable
+from the tile bag but have no valid word are not stored; their count is 0. The totals section
+holds, per table, the number of drawable racks that were counted, as uint32.
+"""
+import numpy as np
+
+from lexicon.anagram_engine import WILDCARD
+from lexicon.sectioned_file import read_section_table
+from utils.greek_letters import LETTER_CODES, MAX_WORD_LENGTH
+
+
+MAGIC = b"SWRACKS\0"
+FORMAT_VERSION = 1
+
+RACK_SIZES = (7, 8)
+TABLES = [f"{rack_size}{'_blank' if blank else ''}" for rack_size in RACK_SIZES for blank in (False, True)]
+SECTIONS = ["totals"] + [f"{kind}_{table}" for table in TABLES for kind in ("racks", "counts")]
+
+RACK_KEY_DTYPE = np.dtype(">u8")
+COUNT_DTYPE = np.dtype("<u2")
+
+
+def table_name(rack_size, blank):
+    """Name of the table holding the racks of a size, with or without one blank."""
+    return f"{rack_size}{'_blank' if blank else ''}"
+
+
+def rack_codes(letters):
+    """
+    Encode the letters of a rack as its sorted, zero-padded letter codes.
+
+    :param letters: The letters of the rack (uppercase Greek letters, no blanks)
+    :return: The codes as bytes, MAX_WORD_LENGTH long
+    """
+    codes = sorted(LETTER_CODES[letter] for letter in letters)
+    return bytes(codes + [0] * (MAX_WORD_LENGTH - len(codes)))
+
+
+class RackStats:
+    """
+    Read-only view over a rack statistics file: how many valid 7- or 8-letter words (bingos) a
+    rack of 7 or 8 tiles forms, with or without one blank.
+
+    The file is memory-mapped and every table is viewed as sorted uint64 rack keys, so a lookup
+    is a single binary search (and many lookups are one vectorized search).
+    """
+
+    def __init__(self, file_path="assets/data/bin/scrabble_rack_stats.bin"):
+        """
+        :param file_path: Path to the rack statistics file
+        """
+        self._mm = np.memmap(file_path, dtype=np.uint8, mode="r")
+
+        try:
+            self.word_count, sections = read_section_table(
+                self._mm, MAGIC, FORMAT_VERSION, SECTIONS, "rack statistics", file_path)
+        except ValueError:
+            self.close()
+            raise
+        self._sections = {
+            name: self._mm[offset:offset + size]
+            for name, (offset, size) in sections.items()
+        }
+        self.totals = dict(zip(TABLES, self._sections["totals"].view("<u4").tolist()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map.
+
+        The map is unmapped once the arrays returned by table() are released too.
+
+        :return: None
+        """
+        self._sections = {}
+        self._mm = None
+
+    def table(self, rack_size, blank=False):
+        """
+        Return a table as arrays.
+
+        :param rack_size: Number of tiles of the racks (7 or 8)
+        :param blank: Whether the racks hold one blank
+        :return: Tuple of (sorted big-endian uint64 rack keys, uint16 word counts)
+        """
+        name = table_name(rack_size, blank)
+        if name not in TABLES:
+            raise ValueError(f"No rack statistics for racks of {rack_size} tiles")
+        return (self._sections[f"racks_{name}"].view(RACK_KEY_DTYPE),
+                self._sections[f"counts_{name}"].view(COUNT_DTYPE))
+
+    def bingo_counts(self, racks):
+        """
+        Count the bingos of many racks with one binary search per table.
+
+        :param racks: The racks, e.g. ["ΑΕΙΝΡΣΤ", "ΑΕΙΝΡΣ*"], each of 7 or 8 tiles with at most one blank
+        :return: List of the number of valid words using all the tiles of each rack
+        """
+        grouped = {}
+        for position, rack in enumerate(racks):
+            letters = rack.strip().upper()
+            blanks = letters.count(WILDCARD)
+            letters = letters.replace(WILDCARD, "")
+            if blanks > 1 or len(letters) + blanks not in RACK_SIZES:
+                raise ValueError(f"Rack '{rack}' must have {' or '.join(map(str, RACK_SIZES))} tiles and "
+                                 "at most one blank")
+            if any(letter not in LETTER_CODES for letter in letters):
+                raise ValueError(f"Invalid letter in rack '{rack}'")
+            grouped.setdefault((len(letters) + blanks, blanks == 1), []).append((position, rack_codes(letters)))
+
+        results = [0] * len(racks)
+        for (rack_size, blank), items in grouped.items():
+            keys, counts = self.table(rack_size, blank)
+            wanted = np.frombuffer(b"".join(codes for _, codes in items), dtype=RACK_KEY_DTYPE)
+            indexes = np.minimum(np.searchsorted(keys, wanted), max(len(keys) - 1, 0))
+            found = (keys[indexes] == wanted) if len(keys) else np.zeros(len(wanted), dtype=bool)
+            for (position, _), is_found, index in zip(items, found, indexes):
+                results[position] = int(counts[index]) if is_found else 0
+        return results
+
+    def bingo_count(self, rack):
+        """
+        Count the bingos of a rack.
+
+        :param rack: The rack, e.g. "ΑΕΙΝΡΣΤ" or "ΑΕΙΝΡΣ*" (7 or 8 tiles, '*' for at most one blank)
+        :return: Number of valid words using all the tiles of the rack
+        """
+        return self.bingo_counts([rack])[0]
@@ -0,0 +1,160 @@
+"""
+Reverse index file layout: a sectioned file (see lexicon/sectioned_file.py) whose record count is the
+key count, with the sections (all integers little-endian):
+
+    key_offsets     (key count + 1) x uint32 offsets into key_strings
+    key_strings     the UTF-8 encoded keys, sorted, concatenated
+    posting_offsets (key count + 1) x uint32 offsets (in word IDs) into postings
+    postings        the sorted word IDs of every key, concatenated, as uint32
+
+Word IDs are the indexes of the words in the binary lexicon (see lexicon/binary_lexicon.py).
+"""
+import bisect
+import mmap
+import re
+import struct
+
+from lexicon.sectioned_file import read_section_table
+
+
+MAGIC = b"SWRIDX\0\0"
+FORMAT_VERSION = 1
+SECTIONS = ["key_offsets", "key_strings", "posting_offsets", "postings"]
+
+OFFSET = struct.Struct("<I")
+
+# A lemma is one or more uppercase Greek words. Anything else in a lemma field is a reference,
+# e.g. "πίνακας σελ. 627" or "Τριαντ.(ξε-)", and is not indexed.
+LEMMA_PATTERN = re.compile(r"[Α-ΩΆΈΉΊΌΎΏΪΫ]+(?: [Α-ΩΆΈΉΊΌΎΏΪΫ]+)*")
+
+
+def normalize_key(key):
+    """Normalized form of an index key (lemma or dictionary): trimmed and uppercase."""
+    return key.strip().upper()
+
+
+def split_dictionaries(dictionary):
+    """
+    Split a dictionary field into the dictionaries it names, e.g. "ΜΠΑΜΠ, ΤΡΙΑΝ" or "ΤΡΙΑΝ + ΜΠΑΜΠ".
+
+    :param dictionary: The dictionary field of a word entry
+    :return: List of normalized dictionary names (empty when the field is empty)
+    """
+    names = dictionary.replace("+", ",").split(",")
+    return [normalize_key(name) for name in names if name.strip()]
+
+
+def split_lemmas(lemma):
+    """
+    Split a lemma field into the lemmas it names, e.g. "ΑΚΟΥΩ, ΟΥΣ", leaving out references.
+
+    :param lemma: The lemma field of a word entry
+    :return: List of normalized lemmas (empty when the field is empty or only holds references)
+    """
+    names = (name.strip() for name in lemma.replace("+", ",").split(","))
+    return [normalize_key(name) for name in names if LEMMA_PATTERN.fullmatch(name)]
+
+
+class ReverseIndex:
+    """
+    Read-only view over a reverse index file, mapping keys (e.g. lemmas) to sorted word IDs.
+
+    The file is memory-mapped: a lookup binary-searches the sorted keys and decodes only the
+    postings of the key it finds.
+    """
+
+    def __init__(self, file_path):
+        """
+        :param file_path: Path to the reverse index file
+        """
+        self._file = open(file_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.key_count, self._sections = read_section_table(
+                self._mm, MAGIC, FORMAT_VERSION, SECTIONS, "reverse index", file_path)
+        except ValueError:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.key_count
+
+    def __contains__(self, key):
+        return self.index_of(key) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and close the file.
+
+        :return: None
+        """
+        self._mm.close()
+        self._file.close()
+
+    def _offset_at(self, section, index):
+        """Return the offset stored at the given index of an offsets section."""
+        return OFFSET.unpack_from(self._mm, self._sections[section][0] + index * OFFSET.size)[0]
+
+    def _key_bytes(self, index):
+        """Return the UTF-8 encoded key at the given index."""
+        strings_start = self._sections["key_strings"][0]
+        return self._mm[strings_start + self._offset_at("key_offsets", index):
+                        strings_start + self._offset_at("key_offsets", index + 1)]
+
+    def key(self, index):
+        """
+        Return the key at the given index.
+
+        :param index: The key index
+        :return: The key
+        """
+        return self._key_bytes(index).decode("utf-8")
+
+    def keys(self):
+        """
+        :return: List of all the keys, sorted
+        """
+        return [self.key(index) for index in range(self.key_count)]
+
+    def index_of(self, key):
+        """
+        Find the index of a key using binary search over the sorted keys.
+
+        :param key: The key to look up (case-insensitive, surrounding whitespace ignored)
+        :return: The index of the key, or None if the key is not in the index
+        """
+        key_bytes = normalize_key(key).encode("utf-8")
+        # Keys are sorted by their UTF-8 bytes, which is also their code point order
+        low = bisect.bisect_left(range(self.key_count), key_bytes, key=self._key_bytes)
+        if low < self.key_count and self._key_bytes(low) == key_bytes:
+            return low
+        return None
+
+    def postings(self, index):
+        """
+        Return the word IDs of the key at the given index.
+
+        :param index: The key index
+        :return: Sorted list of word IDs
+        """
+        start = self._offset_at("posting_offsets", index)
+        end = self._offset_at("posting_offsets", index + 1)
+        postings_start = self._sections["postings"][0] + start * OFFSET.size
+        return list(struct.unpack_from(f"<{end - start}I", self._mm, postings_start))
+
+    def lookup(self, key):
+        """
+        Return the word IDs of a key.
+
+        :param key: The key to look up (case-insensitive, surrounding whitespace ignored)
+        :return: Sorted list of word IDs (empty if the key is not in the index)
+        """
+        index = self.index_of(key)
+        return [] if index is None else self.postings(index)
@@ -0,0 +1,71 @@
+"""
+Sectioned binary file layout, shared by the binary lexicon, the reverse indexes, the rack statistics
+and the hook index (all integers little-endian):
+
+    header          magic (8 bytes), format version (uint16), section count (uint16), record count (uint32)
+    section table   one (offset, size) uint32 pair per section, in the order of the format's SECTIONS
+    sections        each one starting on an 8-byte boundary, zero padded in between
+
+Every format defines its own magic, version, sections and what its record count counts.
+"""
+import os
+import struct
+
+
+HEADER = struct.Struct("<8sHHI")
+SECTION_ENTRY = struct.Struct("<II")
+SECTION_ALIGNMENT = 8
+
+
+def write_sectioned_file(file_path, magic, version, count, sections):
+    """
+    Write a sectioned binary file.
+
+    :param file_path: Path to the file (its directory is created if needed)
+    :param magic: The 8-byte magic of the format
+    :param version: The format version
+    :param count: The record count stored in the header (e.g. number of words or keys)
+    :param sections: List of the section contents, as bytes, in the order of the format's SECTIONS
+    :return: None
+    """
+    # Lay out the sections after the header and section table, aligned to SECTION_ALIGNMENT bytes
+    section_table = []
+    position = HEADER.size + SECTION_ENTRY.size * len(sections)
+    for section in sections:
+        position += -position % SECTION_ALIGNMENT
+        section_table.append((position, len(section)))
+        position += len(section)
+
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(HEADER.pack(magic, version, len(sections), count))
+        for offset, size in section_table:
+            f.write(SECTION_ENTRY.pack(offset, size))
+        for section, (offset, _) in zip(sections, section_table):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+
+
+def read_section_table(buffer, magic, version, section_names, kind, file_path):
+    """
+    Check the header of a sectioned binary file and read its section table.
+
+    :param buffer: The file content, e.g. a memory map
+    :param magic: The magic of the expected format
+    :param version: The supported format version
+    :param section_names: The names of the format's SECTIONS
+    :param kind: Name of the format, for the error messages (e.g. "hook index")
+    :param file_path: Path to the file, for the error messages
+    :return: Tuple of (record count, dictionary mapping each section name to its (offset, size))
+    """
+    file_magic, file_version, section_count, count = HEADER.unpack_from(buffer, 0)
+    if file_magic != magic:
+        raise ValueError(f"{file_path} is not a {kind} file")
+    if file_version != version or section_count != len(section_names):
+        raise ValueError(f"Unsupported {kind} version {file_version} in {file_path}")
+
+    sections = {
+        name: SECTION_ENTRY.unpack_from(buffer, HEADER.size + index * SECTION_ENTRY.size)
+        for index, name in enumerate(section_names)
+    }
+    return count, sections
@@ -0,0 +1,252 @@
+import json
+import sys
+import time
+
+from lexicon.dawg import Dawg, encode_symbols
+from utils.greek_letters import GREEK_LETTERS, normalize_word
+
+
+# Largest supported edit distance; beyond 2 nearly every short word is a match
+MAX_EDIT_DISTANCE = 2
+
+# Default number of suggestions returned
+DEFAULT_LIMIT = 10
+
+
+class LevenshteinAutomaton:
+    """
+    Levenshtein automaton of a word: a deterministic automaton accepting exactly the strings within
+    a maximum edit distance (insertions, deletions and substitutions) of the word.
+
+    Every state stands for a row of the edit distance table: the distance between the letters read
+    so far and every prefix of the word, capped at max_distance + 1. States are numbered as they
+    are reached, and every transition is computed the first time it is followed; all the letters
+    that do not appear in the word behave the same and share one computed transition. A walk over
+    a DAWG then mostly does list lookups.
+
+    Every state also has a mask of the numbers of letters that may still follow it: bit r is set
+    when reading r more letters can end within the maximum distance. Whatever the letters, the
+    edit distance from a row is at least min(row[i] + |remaining word length from i - r|).
+    """
+
+    # Transition target of the letters that lead to no match
+    DEAD = -1
+    # Transition not computed yet
+    UNKNOWN = -2
+
+    def __init__(self, symbols, max_distance):
+        """
+        :param symbols: The letter codes of the word
+        :param max_distance: The maximum edit distance
+        """
+        self.symbols = tuple(symbols)
+        self.max_distance = max_distance
+        self._rows = []
+        self._state_ids = {}
+        self._transitions = []
+        self._word_symbols = set(self.symbols)
+        # Edit distance of every state, None when above the maximum
+        self.distances = []
+        # Bit mask of the numbers of letters that may still follow every state
+        self.length_masks = []
+        self.start = self._state_id(tuple(min(position, max_distance + 1) for position in range(len(self.symbols) + 1)))
+
+    def _state_id(self, row):
+        """Number of the state of a row, adding the state if it is new."""
+        state = self._state_ids.get(row)
+        if state is None:
+            state = self._state_ids[row] = len(self._rows)
+            self._rows.append(row)
+            self._transitions.append([self.UNKNOWN] * (len(GREEK_LETTERS) + 1))
+            self.distances.append(row[-1] if row[-1] <= self.max_distance else None)
+            self.length_masks.append(self._length_mask(row))
+        return state
+
+    def _length_mask(self, row):
+        """Bit mask of the numbers of letters that may still follow a row."""
+        mask = 0
+        for position, distance in enumerate(row):
+            slack = self.max_distance - distance
+            if slack >= 0:
+                # r more letters cost at least |len(word) - position - r|, which must fit in the slack
+                lowest = len(self.symbols) - position - slack
+                mask |= ((1 << (2 * slack + 1)) - 1) << lowest if lowest >= 0 else (1 << (lowest + 2 * slack + 1)) - 1
+        return mask
+
+    def _next_row(self, row, symbol):
+        """The row after reading one letter."""
+        cap = self.max_distance + 1
+        next_row = [min(row[0] + 1, cap)]
+        for position, word_symbol in enumerate(self.symbols, start=1):
+            next_row.append(min(
+                row[position - 1] + (word_symbol != symbol),  # Substitution (or match)
+                row[position] + 1,  # Insertion
+                next_row[position - 1] + 1,  # Deletion
+                cap,
+            ))
+        return tuple(next_row)
+
+    def step(self, state, symbol):
+        """
+        Compute the transition of a state on one letter.
+
+        :param state: The state number
+        :param symbol: The letter code read
+        :return: The next state, or DEAD if no string starting with the letters read can match
+        """
+        state_transitions = self._transitions[state]
+        # Letters outside the word share the transition stored at index 0
+        key = symbol if symbol in self._word_symbols else 0
+        next_state = state_transitions[key]
+        if next_state == self.UNKNOWN:
+            next_state = self._state_id(self._next_row(self._rows[state], key))
+            if not self.length_masks[next_state]:
+                next_state = self.DEAD
+            state_transitions[key] = next_state
+        state_transitions[symbol] = next_state
+        return next_state
+
+    def transitions(self, state):
+        """
+        Return the transitions of a state, to be read by letter code; an entry is UNKNOWN until
+        step() has computed it.
+
+        :param state: The state number
+        :return: List indexed by letter code of the next state (DEAD if no match can follow)
+        """
+        return self._transitions[state]
+
+
+class SuggestionEngine:
+    """
+    "Did you mean" suggestions: the valid words closest to a misspelled word.
+
+    The words are walked in a DAWG in step with the Levenshtein automaton of the query, so only
+    the branches that can still lead to a close enough word are visited: a branch is skipped as
+    soon as the automaton rejects its prefix, or when none of the lengths of the words below it
+    can end close enough to the query.
+    """
+
+    def __init__(self, dawg, points):
+        """
+        :param dawg: DAWG over the words
+        :param points: Dictionary mapping every word to its points, used to rank equally close words
+        """
+        self.dawg = dawg
+        self.points = points
+        self.suffix_length_masks = self._suffix_length_masks()
+
+    def _suffix_length_masks(self):
+        """
+        Compute, for every DAWG node, the bit mask of the lengths of the paths from it to a word end.
+
+        :return: List of masks indexed by node
+        """
+        masks = [None] * self.dawg.node_count
+
+        def mask_of(node):
+            if masks[node] is None:
+                mask = 1 if self.dawg.is_final(node) else 0
+                for child in self.dawg.transitions(node).values():
+                    mask |= mask_of(child) << 1
+                masks[node] = mask
+            return masks[node]
+
+        mask_of(0)
+        return masks
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Build the engine from the processed word entries.
+
+        :param data: The processed word entries (with word and points)
+        :return: The suggestion engine
+        """
+        points = {entry["word"]: entry["points"] for entry in data}
+        return cls(Dawg.from_words(points), points)
+
+    @classmethod
+    def from_json_file(cls, input_file="assets/data/json/scrabble_words_2_to_8_chars.json"):
+        """
+        Build the engine from the processed lexicon JSON file.
+
+        :param input_file: Path to the processed lexicon JSON file
+        :return: The suggestion engine
+        """
+        with open(input_file, "r", encoding="utf-8") as f:
+            return cls.from_data(json.load(f))
+
+    def matches(self, word, max_distance=MAX_EDIT_DISTANCE):
+        """
+        Find every word within an edit distance of a word.
+
+        :param word: The normalized word (uppercase Greek letters)
+        :param max_distance: The maximum edit distance
+        :return: Dictionary mapping each matching word to its edit distance
+        """
+        symbols = encode_symbols(word)
+        if symbols is None:
+            raise ValueError(f"'{word}' has letters outside the Greek alphabet")
+        automaton = LevenshteinAutomaton(symbols, max_distance)
+        length_masks = automaton.length_masks
+        distances = automaton.distances
+        suffix_length_masks = self.suffix_length_masks
+        final_flags = self.dawg.final_flags
+        dawg_transitions = self.dawg.transitions
+        found = {}
+
+        def walk(node, state, prefix):
+            if final_flags[node] and distances[state] is not None:
+                found[prefix] = distances[state]
+            state_transitions = automaton.transitions(state)
+            for symbol, child in dawg_transitions(node).items():
+                next_state = state_transitions[symbol]
+                if next_state == automaton.UNKNOWN:
+                    next_state = automaton.step(state, symbol)
+                if next_state != automaton.DEAD and length_masks[next_state] & suffix_length_masks[child]:
+                    walk(child, next_state, prefix + GREEK_LETTERS[symbol - 1])
+
+        walk(0, automaton.start, "")
+        return found
+
+    def suggest(self, word, max_distance=MAX_EDIT_DISTANCE, limit=DEFAULT_LIMIT):
+        """
+        Suggest the valid words closest to a word.
+
+        The input is normalized first (accents and diaeresis removed, uppercase), so "λέξη" is
+        matched as "ΛΕΞΗ". A word that is valid once normalized comes first, at distance 0.
+
+        :param word: The word as typed
+        :param max_distance: The maximum edit distance (0 to MAX_EDIT_DISTANCE)
+        :param limit: Maximum number of suggestions
+        :return: List of {"word", "distance", "points"} dictionaries, closest first, then highest points first
+        """
+        if not 0 <= max_distance <= MAX_EDIT_DISTANCE:
+            raise ValueError(f"The maximum edit distance must be between 0 and {MAX_EDIT_DISTANCE}")
+        normalized = normalize_word(word)
+        if encode_symbols(normalized) is None:
+            return []
+
+        found = self.matches(normalized, max_distance)
+        ranked = sorted(found, key=lambda match: (found[match], -self.points[match], match))
+        return [
+            {"word": match, "distance": found[match], "points": self.points[match]}
+            for match in ranked[:limit]
+        ]
+
+
+if __name__ == "__main__":
+    queries = sys.argv[1:] or ["λέξη", "ΑΕΡΟΠΛΑΝ", "ΚΑΛΙΜΕΡΑ", "ΣΚΡΑΜΠΛ"]
+
+    start_time = time.perf_counter()
+    suggestion_engine = SuggestionEngine.from_json_file()
+    print(f"Suggestion engine built in {time.perf_counter() - start_time:.2f} s")
+
+    for query in queries:
+        start_time = time.perf_counter()
+        suggestions = suggestion_engine.suggest(query)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(f"{query}: {len(suggestions)} suggestions in {elapsed_ms:.2f} ms")
+        for suggestion in suggestions:
+            print(f"  {suggestion['word']} (distance {suggestion['distance']}, {suggestion['points']} points)")
@@ -1,16 +1,91 @@
+import argparse
+import json
 import os
+import time
 
-from extractors.extract_scrabble_words_from_pdf import extract_scrabble_words
+from extractors.extract_scrabble_words_from_pdf import EXTRACTION_MODES, extract_scrabble_words
 from extractors.extract_scrabble_word_refs_from_pdf import extract_scrabble_word_refs
-from processors.fix_scrabble_word_refs import fix_scrabble_refs
-from processors.filter_scrabble_word_refs_by_length import filter_scrabble_word_refs
-from processors.merge_scrabble_words_with_references import merge_scrabble_words_with_refs
-from processors.preprocess_scrabble_data import preprocess_scrabble_data
+from processors.fix_scrabble_word_refs import fix_scrabble_refs, fix_scrabble_refs_streaming
+from processors.filter_scrabble_word_refs_by_length import (
+    filter_scrabble_word_refs, filter_scrabble_word_refs_streaming)
+from processors.merge_scrabble_words_with_references import (
+    merge_scrabble_words_with_refs, merge_scrabble_words_with_refs_streaming)
+from processors.preprocess_scrabble_data import preprocess_scrabble_data, preprocess_scrabble_data_streaming
+from processors.build_hook_index import build_hook_index
+from utils.instrumentation import RunReport
+from utils.stage_cache import StageCache
+from utils.streaming import RecordFile
 
-def run_pipeline():
+# Pipeline stages, in the order they run
+STAGES = [
+    "extract_words",
+    "extract_word_refs",
+    "fix_word_refs",
+    "filter_word_refs",
+    "merge_words_with_refs",
+    "preprocess",
+    "hooks",
+]
+
+# Stages whose outputs are always written, as they are the pipeline's outputs
+OUTPUT_STAGES = ["preprocess", "hooks"]
+
+def count_records(data):
+    """Number of records in the data of a stage (words for the extracted word list, entries otherwise)."""
+    return len(data["words"]) if isinstance(data, dict) else len(data)
+
+def load_stage_data(json_file, key=None, streaming=False):
+    """
+    Load the data of a stage output file.
+
+    :param json_file: Path to the JSON or NDJSON file
+    :param key: Top-level key holding the records of the file, if any (e.g. "words" for the extracted word list)
+    :param streaming: Return a RecordFile, which reads the records lazily, instead of loading them
+    :return: The data, as the stage returns it
+    """
+    if streaming:
+        return RecordFile(json_file, key)
+    with open(json_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_records_count(json_file, key=None, streaming=False):
+    """Number of records in a stage output file."""
+    return count_records(load_stage_data(json_file, key, streaming))
+
+def run_pipeline(
+        workers=1, force=None, use_cache=True, checkpoint=False, manifest_file="assets/data/stage_manifest.json",
+        report_file=None, profile_dir=None, trace_memory=True, extraction_mode="text", debug_dumps=True,
+        streaming=False):
     """
     Run the full pipeline for extracting Scrabble words from the PDF.
+
+    Every stage is keyed by a hash of its inputs, parameters and code. A stage whose key matches
+    the one recorded in the stage manifest reuses its cached output instead of running again.
+    The processing stages pass their results to each other in memory; their intermediate JSON
+    files are only written (and cached) when checkpoints are requested.
+
+    In streaming mode, the processing stages never hold the word list in memory: they read their input
+    one record at a time and write their output to line-delimited JSON (NDJSON) intermediate files,
+    which are always kept and cached. The words are merged with their references by a sorted-merge
+    join, after an external sort of the references, so the peak memory does not grow with the input
+    (except for the hook index, which needs every word at once).
+
+    :param workers: Number of worker processes used by the PDF extractors
+    :param force: Name of a stage to rerun, together with every stage after it
+    :param use_cache: When False every stage runs, regardless of the stage manifest
+    :param checkpoint: Write the intermediate JSON files of the processing stages
+    :param manifest_file: Path to the JSON file where the stage manifest is kept
+    :param report_file: Path to the JSON run report with the per-stage metrics (None disables the report)
+    :param profile_dir: Directory where a cProfile dump is written per stage (None disables profiling)
+    :param trace_memory: Measure the peak memory of every stage with tracemalloc when instrumenting
+    :param extraction_mode: Text extraction mode of the word list PDF (see extractors/extract_scrabble_words_from_pdf.py)
+    :param debug_dumps: Save the full text of every word list page for debugging
+    :param streaming: Run the processing stages in streaming mode, through NDJSON intermediate files
+    :return: The run report (see utils/instrumentation.py)
     """
+    stage_cache = StageCache(manifest_file, enabled=use_cache)
+    run_report = RunReport(report_file, profile_dir, trace_memory)
+    forced_stages = set(STAGES[STAGES.index(force):]) if force else set()
 
     # Generic Directories
     json_output_dir = "assets/data/json"
@@ -35,7 +110,31 @@ def run_pipeline():
     scrabble_words_json_file = f"{json_output_dir}/scrabble_words_raw.json"
 
     # Extract Scrabble Words
-    extract_scrabble_words(scrabble_words_pdf_path, scrabble_words_start_page, scrabble_words_end_page, scrabble_words_txt_dir, scrabble_words_json_file)
+    with run_report.stage(
+            "extract_words",
+            inputs=[scrabble_words_pdf_path],
+            outputs=[scrabble_words_json_file, scrabble_words_txt_dir],
+            pages=scrabble_words_end_page - scrabble_words_start_page + 1) as metrics:
+        extract_words_key, ran = stage_cache.run(
+            "extract_words",
+            extract_scrabble_words,
+            params={
+                "pdf_path": scrabble_words_pdf_path,
+                "start_page": scrabble_words_start_page,
+                "end_page": scrabble_words_end_page,
+                "output_txt_dir": scrabble_words_txt_dir,
+                "output_json_file": scrabble_words_json_file,
+                "workers": workers,
+                "mode": extraction_mode,
+                "debug_dumps": debug_dumps,
+            },
+            outputs=[scrabble_words_json_file],
+            inputs=[scrabble_words_pdf_path],
+            force="extract_words" in forced_stages,
+            ignored_params=["workers", "debug_dumps"])
+        metrics["status"] = "ran" if ran else "cached"
+    if run_report.enabled:
+        metrics["records_out"] = load_records_count(scrabble_words_json_file, "words", streaming)
 
     # Configuration for Scrabble Word References (swr)
     scrabble_word_refs_pdf_path = "assets/pdf/scrabble-word-refs-2020-02-12.pdf"
@@ -50,30 +149,227 @@ def run_pipeline():
     scrabble_word_refs_json_file = f"{json_output_dir}/scrabble_word_refs_raw.json"
 
     # Extract Scrabble Word References
-    extract_scrabble_word_refs(scrabble_word_refs_pdf_path, scrabble_word_refs_start_page, scrabble_word_refs_end_page, scrabble_word_refs_txt_dir, scrabble_word_refs_json_file)
+    with run_report.stage(
+            "extract_word_refs",
+            inputs=[scrabble_word_refs_pdf_path],
+            outputs=[scrabble_word_refs_json_file, scrabble_word_refs_txt_dir],
+            pages=scrabble_word_refs_end_page - scrabble_word_refs_start_page + 1) as metrics:
+        extract_word_refs_key, ran = stage_cache.run(
+            "extract_word_refs",
+            extract_scrabble_word_refs,
+            params={
+                "swr_pdf_path": scrabble_word_refs_pdf_path,
+                "swr_start_page": scrabble_word_refs_start_page,
+                "swr_end_page": scrabble_word_refs_end_page,
+                "swr_output_txt_dir": scrabble_word_refs_txt_dir,
+                "swr_output_json_file": scrabble_word_refs_json_file,
+                "workers": workers,
+            },
+            outputs=[scrabble_word_refs_json_file],
+            inputs=[scrabble_word_refs_pdf_path],
+            force="extract_word_refs" in forced_stages,
+            ignored_params=["workers"])
+        metrics["status"] = "ran" if ran else "cached"
+    if run_report.enabled:
+        metrics["records_out"] = load_records_count(scrabble_word_refs_json_file, streaming=streaming)
 
-    # Fix Scrabble Word References
+    # Processing stages. They are chained in memory and their intermediate JSON files are only written
+    # when checkpoints are requested. The raw extraction outputs are always kept on disk.
     scrabble_word_refs_fixed_json_file = f"{json_output_dir}/scrabble_word_refs_fixed.json"
-    fix_scrabble_refs(scrabble_word_refs_json_file, scrabble_word_refs_fixed_json_file)
-
-    # Filter Scrabble Words by Length (2 to 8 characters)
     filtered_scrabble_word_refs_json_file = f"{json_output_dir}/scrabble_words_filtered_2_to_8_chars.json"
-    filter_scrabble_word_refs(scrabble_word_refs_fixed_json_file, filtered_scrabble_word_refs_json_file)
-
-    # Merge Scrabble Words with References
     merged_scrabble_words_json_file = f"{json_output_dir}/merged_scrabble_words_with_refs.json"
-    merge_scrabble_words_with_refs(
-        dict_file=scrabble_words_json_file,
-        fixed_file=filtered_scrabble_word_refs_json_file,
-        output_file=merged_scrabble_words_json_file)
-
-    # Final Preprocessing of Scrabble Words
     final_scrabble_words_json_file = f"{json_output_dir}/scrabble_words_2_to_8_chars.json"
     final_scrabble_words_metadata_json_file = f"{json_output_dir}/scrabble_words_2_to_8_chars_metadata.json"
-    preprocess_scrabble_data(
-        input_file=merged_scrabble_words_json_file, 
-        output_words_file=final_scrabble_words_json_file, 
-        output_stats_file=final_scrabble_words_metadata_json_file)
+    hook_index_file = "assets/data/bin/scrabble_hooks.bin"
+
+    if streaming:
+        # Streaming mode: the stages pass RecordFile readers over their NDJSON intermediate files to each other
+        ndjson_output_dir = "assets/data/ndjson"
+        os.makedirs(ndjson_output_dir, exist_ok=True)
+        scrabble_word_refs_fixed_ndjson_file = f"{ndjson_output_dir}/scrabble_word_refs_fixed.ndjson"
+        filtered_scrabble_word_refs_ndjson_file = f"{ndjson_output_dir}/scrabble_words_filtered_2_to_8_chars.ndjson"
+        merged_scrabble_words_ndjson_file = f"{ndjson_output_dir}/merged_scrabble_words_with_refs.ndjson"
+
+        processor_stages = {
+            "fix_word_refs": {
+                "func": fix_scrabble_refs_streaming,
+                "upstream": ["extract_word_refs"],
+                "run": lambda refs: fix_scrabble_refs_streaming(
+                    output_file=scrabble_word_refs_fixed_ndjson_file, data=refs),
+                "outputs": [scrabble_word_refs_fixed_ndjson_file],
+            },
+            "filter_word_refs": {
+                "func": filter_scrabble_word_refs_streaming,
+                "upstream": ["fix_word_refs"],
+                "run": lambda fixed_refs: filter_scrabble_word_refs_streaming(
+                    output_file=filtered_scrabble_word_refs_ndjson_file, data=fixed_refs),
+                "outputs": [filtered_scrabble_word_refs_ndjson_file],
+            },
+            "merge_words_with_refs": {
+                "func": merge_scrabble_words_with_refs_streaming,
+                "upstream": ["extract_words", "filter_word_refs"],
+                "run": lambda words, filtered_refs: merge_scrabble_words_with_refs_streaming(
+                    output_file=merged_scrabble_words_ndjson_file,
+                    words=words,
+                    refs=filtered_refs,
+                    spill_dir=ndjson_output_dir),
+                "outputs": [merged_scrabble_words_ndjson_file],
+            },
+            "preprocess": {
+                "func": preprocess_scrabble_data_streaming,
+                "upstream": ["merge_words_with_refs"],
+                "run": lambda merged_words: preprocess_scrabble_data_streaming(
+                    output_words_file=final_scrabble_words_json_file,
+                    output_stats_file=final_scrabble_words_metadata_json_file,
+                    data=merged_words),
+                "outputs": [final_scrabble_words_json_file, final_scrabble_words_metadata_json_file],
+            },
+            "hooks": {
+                "func": build_hook_index,
+                "upstream": ["preprocess"],
+                # Only the words are needed, not their metadata
+                "run": lambda processed_words: build_hook_index(
+                    output_file=hook_index_file, data=({"word": entry["word"]} for entry in processed_words)),
+                "outputs": [hook_index_file],
+            },
+        }
+    else:
+        processor_stages = {
+            # Fix Scrabble Word References
+            "fix_word_refs": {
+                "func": fix_scrabble_refs,
+                "upstream": ["extract_word_refs"],
+                "run": lambda refs: fix_scrabble_refs(
+                    output_file=scrabble_word_refs_fixed_json_file if checkpoint else None,
+                    data=refs),
+                "outputs": [scrabble_word_refs_fixed_json_file],
+            },
+            # Filter Scrabble Words by Length (2 to 8 characters)
+            "filter_word_refs": {
+                "func": filter_scrabble_word_refs,
+                "upstream": ["fix_word_refs"],
+                "run": lambda fixed_refs: filter_scrabble_word_refs(
+                    output_file=filtered_scrabble_word_refs_json_file if checkpoint else None,
+                    data=fixed_refs),
+                "outputs": [filtered_scrabble_word_refs_json_file],
+            },
+            # Merge Scrabble Words with References
+            "merge_words_with_refs": {
+                "func": merge_scrabble_words_with_refs,
+                "upstream": ["extract_words", "filter_word_refs"],
+                "run": lambda words, filtered_refs: merge_scrabble_words_with_refs(
+                    output_file=merged_scrabble_words_json_file if checkpoint else None,
+                    words=words["words"],
+                    refs=filtered_refs),
+                "outputs": [merged_scrabble_words_json_file],
+            },
+            # Final Preprocessing of Scrabble Words (always written, as it is the pipeline's output)
+            "preprocess": {
+                "func": preprocess_scrabble_data,
+                "upstream": ["merge_words_with_refs"],
+                "run": lambda merged_words: preprocess_scrabble_data(
+                    output_words_file=final_scrabble_words_json_file,
+                    output_stats_file=final_scrabble_words_metadata_json_file,
+                    data=merged_words),
+                "outputs": [final_scrabble_words_json_file, final_scrabble_words_metadata_json_file],
+            },
+            # Front/Back Hooks and Insert Extensions of every word (always written)
+            "hooks": {
+                "func": build_hook_index,
+                "upstream": ["preprocess"],
+                "run": lambda processed_words: build_hook_index(output_file=hook_index_file, data=processed_words),
+                "outputs": [hook_index_file],
+            },
+        }
+
+    stage_keys = {"extract_words": extract_words_key, "extract_word_refs": extract_word_refs_key}
+    stage_outputs = {"extract_words": scrabble_words_json_file, "extract_word_refs": scrabble_word_refs_json_file}
+    stage_output_keys = {"extract_words": "words"}
+    # The mode is part of the key, so the outputs of one mode are never reused by the other
+    stage_params = {"streaming": streaming}
+    for name, stage in processor_stages.items():
+        stage_keys[name] = stage_cache.stage_key(
+            name, stage["func"], stage_params,
+            upstream_keys=[stage_keys[upstream] for upstream in stage["upstream"]])
+
+    def load_stage_output(name, json_file):
+        """Load the output file of a stage, reported as a cached stage."""
+        with run_report.stage(f"load_{name}", inputs=[json_file]) as metrics:
+            data = load_stage_data(json_file, stage_output_keys.get(name), streaming)
+            metrics["status"] = "cached"
+            metrics["records_out"] = count_records(data)
+        return data
+
+    def resolve(name):
+        """Return the data produced by a stage, loading it from disk or running the stage as needed."""
+        if name in stage_outputs:
+            return load_stage_output(name, stage_outputs[name])
+
+        stage = processor_stages[name]
+        if name not in forced_stages and stage_cache.is_fresh(name, stage_keys[name], stage["outputs"]):
+            print(f"Stage '{name}' is up to date, reusing cached outputs.")
+            return load_stage_output(name, stage["outputs"][0])
+
+        upstream_data = [resolve(upstream) for upstream in stage["upstream"]]
+
+        stage_cache.invalidate(name)
+        started_at = time.time()
+        with run_report.stage(
+                name,
+                outputs=stage["outputs"],
+                records_in=sum(count_records(data) for data in upstream_data)) as metrics:
+            data = stage["run"](*upstream_data)
+            if data is None:
+                raise RuntimeError(f"Stage '{name}' failed.")
+            metrics["records_out"] = count_records(data)
+
+        if name in OUTPUT_STAGES or checkpoint or streaming:
+            stage_cache.record(name, stage_keys[name], stage["outputs"], started_at)
+        return data
+
+    # Only the final stage is requested; earlier stages run on demand, when their data is needed
+    if "hooks" not in forced_stages and stage_cache.is_fresh("hooks", stage_keys["hooks"], processor_stages["hooks"]["outputs"]):
+        print("Stage 'hooks' is up to date, reusing cached outputs.")
+        with run_report.stage("hooks") as metrics:
+            metrics["status"] = "cached"
+    else:
+        resolve("hooks")
+
+    return run_report.save()
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="Extract and process the Greek Scrabble word lists.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes used by the PDF extractors (1 runs them serially)")
+    parser.add_argument("--force", choices=STAGES,
+                        help="Rerun the given stage and every stage after it, even if their cached outputs are up to date")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rerun every stage, ignoring the stage manifest")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Write the intermediate JSON files of the processing stages (fixed, filtered and merged refs)")
+    parser.add_argument("--report", nargs="?", const="assets/data/run_report.json", metavar="FILE",
+                        help="Instrument every stage and write a JSON run report (default: assets/data/run_report.json)")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="Profile every stage with cProfile and write one .prof dump per stage to DIR")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="Do not measure the peak memory of the stages with tracemalloc, which slows them down")
+    parser.add_argument("--extraction-mode", choices=EXTRACTION_MODES, default="text",
+                        help="Text extraction mode of the word list PDF (default: text)")
+    parser.add_argument("--no-debug-dumps", action="store_true",
+                        help="Do not save the full text of every word list page to assets/data/txt/scrabble_words_raw")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Run the processing stages in streaming mode, with bounded memory and NDJSON intermediate "
+                             "files in assets/data/ndjson")
+    args = parser.parse_args()
+
+    run_pipeline(
+        workers=args.workers,
+        force=args.force,
+        use_cache=not args.no_cache,
+        checkpoint=args.checkpoint,
+        report_file=args.report,
+        profile_dir=args.profile_dir,
+        trace_memory=not args.no_trace_memory,
+        extraction_mode=args.extraction_mode,
+        debug_dumps=not args.no_debug_dumps,
+        streaming=args.streaming)
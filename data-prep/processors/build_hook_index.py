@@ -0,0 +1,78 @@
+import json
+import os
+
+from lexicon.binary_lexicon import word_ids
+from lexicon.hook_index import FORMAT_VERSION, MAGIC, MASK_SIZE, SECTIONS
+from lexicon.sectioned_file import write_sectioned_file
+from utils.greek_letters import LETTER_CODES
+
+
+def compute_hook_masks(data):
+    """
+    Compute the front hooks, back hooks and one-letter insert extensions of every word in one pass.
+
+    Instead of trying every letter at every position of every word, every word is joined with the
+    words one letter shorter: deleting the letter at each position gives a candidate, which is
+    looked up in a hash of all the words. When it is a word, the deleted letter is a hook of it:
+    a front hook for the first position, a back hook for the last one and an insert extension
+    otherwise.
+
+    :param data: The processed word entries
+    :return: Tuple of (front, back, insert) lists of 24-bit letter masks, indexed by word ID
+    """
+    entries = word_ids(data)
+    ids = {entry["word"]: word_id for word_id, entry in entries}
+    front = [0] * len(entries)
+    back = [0] * len(entries)
+    insert = [0] * len(entries)
+
+    for word in ids:
+        last = len(word) - 1
+        for position, letter in enumerate(word):
+            shorter_id = ids.get(word[:position] + word[position + 1:])
+            if shorter_id is None:
+                continue
+            bit = 1 << (LETTER_CODES[letter] - 1)
+            if position == 0:
+                front[shorter_id] |= bit
+            elif position == last:
+                back[shorter_id] |= bit
+            else:
+                insert[shorter_id] |= bit
+
+    return front, back, insert
+
+
+def build_hook_index(
+        input_file="assets/data/json/scrabble_words_2_to_8_chars.json",
+        output_file="assets/data/bin/scrabble_hooks.bin",
+        data=None):
+    """
+    Build the hook index of the processed words and write it to a packed binary file.
+
+    See lexicon/hook_index.py for the file layout.
+
+    :param input_file: Path to the processed lexicon JSON file (ignored when data is given)
+    :param output_file: Path to the hook index file
+    :param data: The processed word entries, instead of loading them from input_file
+    :return: List of (front, back, insert) letter masks, indexed by word ID
+    """
+    if data is None:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    masks = compute_hook_masks(data)
+    sections = {
+        name: b"".join(mask.to_bytes(MASK_SIZE, "little") for mask in section_masks)
+        for name, section_masks in zip(SECTIONS, masks)
+    }
+
+    word_count = len(masks[0])
+    write_sectioned_file(output_file, MAGIC, FORMAT_VERSION, word_count, [sections[name] for name in SECTIONS])
+
+    hooked = {name: sum(1 for mask in section_masks if mask) for name, section_masks in zip(SECTIONS, masks)}
+    print(f"Hook index of {word_count} words saved to {output_file} ({os.path.getsize(output_file)} bytes): "
+          f"{hooked['front']} with front hooks, {hooked['back']} with back hooks, "
+          f"{hooked['insert']} with insert extensions")
+
+    return list(zip(*masks))
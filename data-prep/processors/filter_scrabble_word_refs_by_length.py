@@ -1,46 +1,91 @@
 from utils.helpers import save_to_json
+from utils.streaming import RecordFile, write_ndjson
 import json
 
+def filter_ref_entry(entry):
+    """
+    Keep only the first word in the 'word' field of a word ref entry, if it has 2-8 characters.
+
+    :param entry: The word ref entry, whose 'word' field is updated in place when it is kept
+    :return: True if the entry is kept, False otherwise
+    """
+    word_field = entry.get('word', "").strip()  # Safely get 'word' and strip whitespace
+    if not word_field:  # Skip entries with empty 'word' fields
+        print(f"Skipping entry due to empty 'word': {entry}")
+        return False
+
+    # Split the word field into individual words
+    words = word_field.split()
+
+    # Use the full 'word' field if splitting fails
+    first_word = words[0] if words else word_field
+
+    if 2 <= len(first_word) <= 8:
+        # Update the word field to retain only the first word
+        entry['word'] = first_word
+
+        # Keep the entry if the first word's length is between 2 and 8
+        return True
+    return False
+
 def filter_scrabble_word_refs(
         input_file="assets/data/json/scrabble_word_refs_fixed.json",
-        output_file="assets/data/json/scrabble_words_filtered_2_to_8_chars.json"):
+        output_file="assets/data/json/scrabble_words_filtered_2_to_8_chars.json",
+        data=None):
     """
     Filter entries to include only those where the first word in the 'word' field has 2-8 characters.
 
-    :param input_file: Path to the input JSON file
-    :param output_file: Path to the output JSON file
-    :return: None
+    :param input_file: Path to the input JSON file (ignored when data is given)
+    :param output_file: Path to the output JSON file (None to skip writing it)
+    :param data: The word ref entries to filter, instead of loading them from input_file
+    :return: The filtered entries, or None if processing failed
     """
     try:
         # Load the data from the input file
-        with open(input_file, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
+        if data is None:
+            with open(input_file, 'r', encoding='utf-8') as json_file:
+                data = json.load(json_file)
         
         filtered_data = []
 
         for entry in data:
-            word_field = entry.get('word', "").strip()  # Safely get 'word' and strip whitespace
-            if not word_field:  # Skip entries with empty 'word' fields
-                print(f"Skipping entry due to empty 'word': {entry}")
-                continue
-            
-            # Split the word field into individual words
-            words = word_field.split()
-            
-            # Use the full 'word' field if splitting fails
-            first_word = words[0] if words else word_field
-            
-            if 2 <= len(first_word) <= 8:
-                # Update the word field to retain only the first word
-                entry['word'] = first_word
-
-                # Keep the entry if the first word's length is between 2 and 8
+            if filter_ref_entry(entry):
                 filtered_data.append(entry)
         
         # Save the filtered data to the output file
-        save_to_json(output_file, filtered_data)
-        print(f"Filtered data saved successfully to {output_file}.")
+        if output_file:
+            save_to_json(output_file, filtered_data)
+            print(f"Filtered data saved successfully to {output_file}.")
         print(f"Total valid entries: {len(filtered_data)}")
+
+        return filtered_data
     
     except Exception as e:
         print(f"Error processing the file: {e}")
+        return None
+
+def filter_scrabble_word_refs_streaming(
+        input_file="assets/data/ndjson/scrabble_word_refs_fixed.ndjson",
+        output_file="assets/data/ndjson/scrabble_words_filtered_2_to_8_chars.ndjson",
+        data=None):
+    """
+    Streaming version of filter_scrabble_word_refs: filter the entries one at a time and write them to an NDJSON file.
+
+    :param input_file: Path to the input JSON or NDJSON file (ignored when data is given)
+    :param output_file: Path to the output NDJSON file
+    :param data: Iterable of the word ref entries to filter, instead of reading them from input_file
+    :return: The filtered entries, read back lazily from output_file, or None if processing failed
+    """
+    try:
+        if data is None:
+            data = RecordFile(input_file)
+
+        count = write_ndjson(output_file, (entry for entry in data if filter_ref_entry(entry)))
+        print(f"Filtered data saved successfully to {output_file}.")
+        print(f"Total valid entries: {count}")
+
+        return RecordFile(output_file, count=count)
+
+    except Exception as e:
+        print(f"Error processing the file: {e}")
+        return None
@@ -1,54 +1,99 @@
 from utils.helpers import save_to_json
+from utils.streaming import RecordFile, write_ndjson
 import json
 
+def fix_ref_entry(entry):
+    """
+    Fix the empty 'lemma' or 'dictionary' field of a word ref entry, from the text that spilled into the previous field.
+
+    :param entry: The word ref entry, updated in place
+    :return: The word ref entry
+    """
+    # Skip entries where both 'lemma' and 'dictionary' are empty
+    if not entry['lemma'] and not entry['dictionary']:
+        return entry
+
+    # Fix empty 'lemma' field
+    if not entry['lemma']:
+        # Assume lemma is the last word in the 'word' field split by spaces
+        words = entry['word'].split()
+
+        # If the word field contains more than one word, extract the last word as the lemma
+        if len(words) > 1:
+            entry['lemma'] = words[-1]
+
+            # Remove the extracted lemma from the 'word' field
+            entry['word'] = ' '.join(words[:-1]).strip()
+
+    # Fix empty 'dictionary' field
+    if not entry['dictionary']:
+        # Assume dictionary is the last word in the 'lemma' field split by spaces
+        lemmas = entry['lemma'].split()
+
+        # If the lemma field contains more than one word, extract the last word as the dictionary
+        if len(lemmas) > 1:
+            entry['dictionary'] = lemmas[-1]
+
+            # Remove the extracted dictionary from the 'lemma' field
+            entry['lemma'] = ' '.join(lemmas[:-1]).strip()
+
+    return entry
+
 def fix_scrabble_refs(
         input_file="assets/data/json/scrabble_word_refs_raw.json",
-        output_file="assets/data/json/scrabble_word_refs_fixed.json"):
+        output_file="assets/data/json/scrabble_word_refs_fixed.json",
+        data=None):
     """
     Fix entries with empty 'lemma' or 'dictionary' fields in a JSON file.
 
-    :param input_file: Path to the input JSON file
-    :param output_file: Path to the output JSON file
-    :return: None
+    :param input_file: Path to the input JSON file (ignored when data is given)
+    :param output_file: Path to the output JSON file (None to skip writing it)
+    :param data: The word ref entries to fix, instead of loading them from input_file
+    :return: The fixed entries, or None if processing failed
     """
     try:
         # Load the data from the input file
-        with open(input_file, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
+        if data is None:
+            with open(input_file, 'r', encoding='utf-8') as json_file:
+                data = json.load(json_file)
         
         for entry in data:
-            # Skip entries where both 'lemma' and 'dictionary' are empty
-            if not entry['lemma'] and not entry['dictionary']:
-                continue
-
-            # Fix empty 'lemma' field
-            if not entry['lemma']:
-                # Assume lemma is the last word in the 'word' field split by spaces
-                words = entry['word'].split()
-
-                # If the word field contains more than one word, extract the last word as the lemma
-                if len(words) > 1:
-                    entry['lemma'] = words[-1]
-
-                    # Remove the extracted lemma from the 'word' field
-                    entry['word'] = ' '.join(words[:-1]).strip()
-            
-            # Fix empty 'dictionary' field
-            if not entry['dictionary']:
-                # Assume dictionary is the last word in the 'lemma' field split by spaces
-                lemmas = entry['lemma'].split()
-
-                # If the lemma field contains more than one word, extract the last word as the dictionary
-                if len(lemmas) > 1:
-                    entry['dictionary'] = lemmas[-1]
-
-                    # Remove the extracted dictionary from the 'lemma' field
-                    entry['lemma'] = ' '.join(lemmas[:-1]).strip()
+            fix_ref_entry(entry)
         
         # Save the fixed data to the output file
-        save_to_json(output_file, data)
-        print("Entries fixed and saved successfully.")
+        if output_file:
+            save_to_json(output_file, data)
+            print("Entries fixed and saved successfully.")
+        else:
+            print("Entries fixed successfully.")
+
+        return data
     
     except Exception as e:
         print(f"Error processing the file: {e}")
+        return None
+
+def fix_scrabble_refs_streaming(
+        input_file="assets/data/json/scrabble_word_refs_raw.json",
+        output_file="assets/data/ndjson/scrabble_word_refs_fixed.ndjson",
+        data=None):
+    """
+    Streaming version of fix_scrabble_refs: fix the entries one at a time and write them to an NDJSON file.
 
+    :param input_file: Path to the input JSON or NDJSON file (ignored when data is given)
+    :param output_file: Path to the output NDJSON file
+    :param data: Iterable of the word ref entries to fix, instead of reading them from input_file
+    :return: The fixed entries, read back lazily from output_file, or None if processing failed
+    """
+    try:
+        if data is None:
+            data = RecordFile(input_file)
+
+        count = write_ndjson(output_file, (fix_ref_entry(entry) for entry in data))
+        print(f"{count} entries fixed and saved successfully to {output_file}.")
+
+        return RecordFile(output_file, count=count)
+
+    except Exception as e:
+        print(f"Error processing the file: {e}")
+        return None
@@ -1,30 +1,38 @@
 from utils.helpers import save_to_json
+from utils.streaming import RecordFile, external_sort, write_ndjson
 import json
 
 def merge_scrabble_words_with_refs(
         dict_file="assets/data/json/scrabble_words_raw.json",
         fixed_file="assets/data/json/scrabble_words_filtered_2_to_8_chars.json",
-        output_file="assets/data/json/merged_scrabble_words_with_refs.json"):
+        output_file="assets/data/json/merged_scrabble_words_with_refs.json",
+        words=None,
+        refs=None):
     """
     Merge all words from the dictionary JSON with data from the fixed JSON.
 
-    :param dict_file: Path to the dictionary JSON file
-    :param fixed_file: Path to the fixed JSON file
-    :param output_file: Path to the output JSON file
-    :return: None
+    :param dict_file: Path to the dictionary JSON file (ignored when words is given)
+    :param fixed_file: Path to the fixed JSON file (ignored when refs is given)
+    :param output_file: Path to the output JSON file (None to skip writing it)
+    :param words: The sorted list of words, instead of loading it from dict_file
+    :param refs: The filtered word ref entries, instead of loading them from fixed_file
+    :return: The merged entries, or None if processing failed
     """
     try:
         # Load data from the dictionary JSON
-        with open(dict_file, 'r', encoding='utf-8') as dict_json:
-            dictionary_data = json.load(dict_json)["words"]
+        if words is None:
+            with open(dict_file, 'r', encoding='utf-8') as dict_json:
+                words = json.load(dict_json)["words"]
         
         # Load data from the fixed JSON
-        with open(fixed_file, 'r', encoding='utf-8') as fixed_json:
-            fixed_data = {entry['word']: entry for entry in json.load(fixed_json)}
+        if refs is None:
+            with open(fixed_file, 'r', encoding='utf-8') as fixed_json:
+                refs = json.load(fixed_json)
+        fixed_data = {entry['word']: entry for entry in refs}
         
         merged_data = []
 
-        for word in dictionary_data:
+        for word in words:
             # Check if the word exists in the fixed data
             if word in fixed_data:
                 merged_data.append(fixed_data[word])
@@ -38,10 +46,95 @@ def merge_scrabble_words_with_refs(
                 })
         
         # Save the merged data to the output file
-        save_to_json(output_file, merged_data)
-        print(f"Merged data saved successfully to {output_file}.")
+        if output_file:
+            save_to_json(output_file, merged_data)
+            print(f"Merged data saved successfully to {output_file}.")
         print(f"Total entries: {len(merged_data)}")
+
+        return merged_data
     
     except Exception as e:
         print(f"Error processing the files: {e}")
+        return None
+
+def merge_sorted_words_with_refs(words, refs):
+    """
+    Merge the sorted words with the ref entries sorted by word, in one pass over both (a sorted-merge join).
+
+    Gives the same entries as merge_scrabble_words_with_refs: the ref entry of every word that has one
+    (the last one, when a word has several) and a blank entry otherwise.
+
+    :param words: Iterable of the words, in sorted order
+    :param refs: Iterable of the ref entries, sorted by word (stably, for the last one to win)
+    :return: Generator of the merged entries, in the order of the words
+    """
+    refs = iter(refs)
+    ref = next(refs, None)
+    previous_word = None
+    entry = None
+
+    for word in words:
+        if previous_word is not None and word <= previous_word:
+            if word < previous_word:
+                raise ValueError(f"The words are not sorted: '{word}' comes after '{previous_word}'")
+            # A repeated word gets the same entry again
+            yield entry
+            continue
+        previous_word = word
+
+        # Skip the refs of words that are not in the list, and keep the last ref of this word
+        match = None
+        while ref is not None and ref['word'] <= word:
+            if ref['word'] == word:
+                match = ref
+            ref = next(refs, None)
+
+        # Create a blank entry if no match is found
+        entry = match or {
+            "word": word,
+            "lemma": "",
+            "dictionary": "",
+            "comments": ""
+        }
+        yield entry
+
+def merge_scrabble_words_with_refs_streaming(
+        dict_file="assets/data/json/scrabble_words_raw.json",
+        fixed_file="assets/data/ndjson/scrabble_words_filtered_2_to_8_chars.ndjson",
+        output_file="assets/data/ndjson/merged_scrabble_words_with_refs.ndjson",
+        words=None,
+        refs=None,
+        spill_dir=None):
+    """
+    Streaming version of merge_scrabble_words_with_refs, writing the merged entries to an NDJSON file.
+
+    The refs are sorted by word with an external sort, then merged with the sorted words in one pass
+    (see merge_sorted_words_with_refs), so neither the words nor the refs are held in memory.
+
+    :param dict_file: Path to the dictionary JSON file (ignored when words is given)
+    :param fixed_file: Path to the fixed JSON or NDJSON file (ignored when refs is given)
+    :param output_file: Path to the output NDJSON file
+    :param words: Iterable of the words in sorted order, instead of reading them from dict_file
+    :param refs: Iterable of the filtered word ref entries, instead of reading them from fixed_file
+    :param spill_dir: Directory for the external sort run files (None uses the system temporary directory)
+    :return: The merged entries, read back lazily from output_file, or None if processing failed
+    """
+    try:
+        if words is None:
+            words = RecordFile(dict_file, key="words")
+        if refs is None:
+            refs = RecordFile(fixed_file)
 
+        sorted_refs = external_sort(refs, key=lambda entry: entry['word'], spill_dir=spill_dir)
+        try:
+            count = write_ndjson(output_file, merge_sorted_words_with_refs(words, sorted_refs))
+        finally:
+            sorted_refs.close()  # Remove the run files, even when the words ended before the refs
+        print(f"Merged data saved successfully to {output_file}.")
+        print(f"Total entries: {count}")
+
+        return RecordFile(output_file, count=count)
+
+    except Exception as e:
+        print(f"Error processing the files: {e}")
+        return None
@@ -1,4 +1,5 @@
 from utils.helpers import save_to_json
+from utils.streaming import RecordFile, write_json
 import json
 
 # Greek Scrabble points based on the Wikipedia description
@@ -11,50 +12,63 @@ scrabble_points_gr = {
     'Ζ': 10, 'Θ': 10, 'Ξ': 10, 'Ψ': 10,
 }
 
+def add_derived_fields(word_entry):
+    """
+    Add the fields derived from the word itself to a word entry: alphagram, length and points.
+
+    Args:
+        word_entry (dict): The word entry, updated in place.
+
+    Returns:
+        dict: The word entry.
+    """
+    word = word_entry['word']
+
+    # Calculate the alphagram (sorted letters)
+    word_entry['alphagram'] = ''.join(sorted(word.upper()))
+
+    # Calculate the length of the word
+    word_entry['length'] = len(word)
+
+    # Calculate the Scrabble points for the word
+    word_entry['points'] = sum(scrabble_points_gr.get(letter.upper(), 0) for letter in word)
+
+    return word_entry
+
 def preprocess_scrabble_data(
         input_file="assets/data/json/merged_scrabble_words_with_refs.json", 
         output_words_file="assets/data/json/scrabble_words_2_to_8_chars.json", 
-        output_stats_file="assets/data/json/scrabble_words_2_to_8_chars_metadata.json"):
+        output_stats_file="assets/data/json/scrabble_words_2_to_8_chars_metadata.json",
+        data=None):
     """
     Processes the Scrabble word data and calculates the necessary fields.
 
     Args:
-        input_file (str): Path to the input JSON file containing the merged scrabble words.
-        output_words_file (str): Path to the output JSON file to save the processed word data.
-        output_stats_file (str): Path to the output JSON file to save the statistics.
+        input_file (str): Path to the input JSON file containing the merged scrabble words (ignored when data is given).
+        output_words_file (str): Path to the output JSON file to save the processed word data (None to skip writing it).
+        output_stats_file (str): Path to the output JSON file to save the statistics (None to skip writing it).
+        data (list): The merged scrabble words, instead of loading them from input_file.
 
     Returns:
-        None
+        list: The processed word entries.
     """
     # Load the merged scrabble words JSON
-    with open(input_file, 'r', encoding='utf-8') as f:
-        words = json.load(f)
+    if data is None:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
 
     processed_words = []
     min_length = float('inf')
     max_length = 0
 
     # Loop through the words and process each
-    for word_entry in words:
-        word = word_entry['word']
-        
-        # Calculate the alphagram (sorted letters)
-        alphagram = ''.join(sorted(word.upper()))
-        
-        # Calculate the length of the word
-        length = len(word)
-        
-        # Calculate the Scrabble points for the word
-        points = sum(scrabble_points_gr.get(letter.upper(), 0) for letter in word)
-        
+    for word_entry in data:
+        # Add the alphagram, length and points
+        add_derived_fields(word_entry)
+
         # Update min and max lengths for stats purposes
-        min_length = min(min_length, length)
-        max_length = max(max_length, length)
-        
-        # Add the new keys to the word entry
-        word_entry['alphagram'] = alphagram
-        word_entry['length'] = length
-        word_entry['points'] = points
+        min_length = min(min_length, word_entry['length'])
+        max_length = max(max_length, word_entry['length'])
 
         processed_words.append(word_entry)
 
@@ -66,9 +80,68 @@ def preprocess_scrabble_data(
     }
 
     # Save the processed words directly to the file
-    save_to_json(output_words_file, processed_words)
+    if output_words_file:
+        save_to_json(output_words_file, processed_words)
 
     # Save the stats to scrabble_words_metadata.json
-    save_to_json(output_stats_file, stats)
+    if output_stats_file:
+        save_to_json(output_stats_file, stats)
 
     print(f"Preprocessing complete. Total words: {len(processed_words)}, Min length: {min_length}, Max length: {max_length}.")
+
+    return processed_words
+
+def preprocess_scrabble_data_streaming(
+        input_file="assets/data/ndjson/merged_scrabble_words_with_refs.ndjson",
+        output_words_file="assets/data/json/scrabble_words_2_to_8_chars.json",
+        output_stats_file="assets/data/json/scrabble_words_2_to_8_chars_metadata.json",
+        data=None):
+    """
+    Streaming version of preprocess_scrabble_data: the word entries are processed and written one at a time.
+
+    The processed words file is byte-for-byte the one preprocess_scrabble_data writes, and the statistics
+    are gathered along the way.
+
+    Args:
+        input_file (str): Path to the input JSON or NDJSON file containing the merged scrabble words
+            (ignored when data is given).
+        output_words_file (str): Path to the output JSON file to save the processed word data.
+        output_stats_file (str): Path to the output JSON file to save the statistics (None to skip writing it).
+        data (iterable): The merged scrabble words, instead of reading them from input_file.
+
+    Returns:
+        RecordFile: The processed word entries, read back lazily from output_words_file.
+    """
+    if data is None:
+        data = RecordFile(input_file)
+
+    stats = {
+        'total_words': 0,
+        'min_length': float('inf'),
+        'max_length': 0
+    }
+
+    def processed_words():
+        for word_entry in data:
+            # Add the alphagram, length and points
+            add_derived_fields(word_entry)
+
+            # Update the stats on the way
+            stats['total_words'] += 1
+            stats['min_length'] = min(stats['min_length'], word_entry['length'])
+            stats['max_length'] = max(stats['max_length'], word_entry['length'])
+
+            yield word_entry
+
+    # Same format as save_to_json
+    write_json(output_words_file, processed_words(), indent=4)
+    print(f"Data successfully saved to {output_words_file}")
+
+    # Save the stats to scrabble_words_metadata.json
+    if output_stats_file:
+        save_to_json(output_stats_file, stats)
+
+    print(f"Preprocessing complete. Total words: {stats['total_words']}, "
+          f"Min length: {stats['min_length']}, Max length: {stats['max_length']}.")
+
+    return RecordFile(output_words_file, count=stats['total_words'])
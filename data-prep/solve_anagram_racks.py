@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from lexicon.batch_anagram_solver import DEFAULT_MEMO_SIZE, BatchAnagramSolver, normalize_rack
+from validate_words import read_chunks
+
+
+# Number of input racks sent to a worker at a time
+CHUNK_SIZE = 2000
+
+# Number of chunks queued per worker; bounds the memory used by pending input and results
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Batch anagram solver loaded once per worker process by init_worker
+_worker_solver = None
+
+
+def init_worker(alphagram_file, memo_size):
+    """
+    Load the batch anagram solver in a worker process.
+
+    Every worker keeps its own memo table for the whole run, so the sub-racks it solved for one
+    chunk are reused by the next ones.
+
+    :param alphagram_file: Path to the words grouped by alphagram JSON file
+    :param memo_size: Maximum number of sub-rack results kept in the memo table
+    :return: None
+    """
+    global _worker_solver
+    _worker_solver = BatchAnagramSolver.from_json_file(alphagram_file, memo_size)
+
+
+def solve_partition(racks, min_length, solver=None):
+    """
+    Solve a partition of distinct canonical racks.
+
+    The racks are solved in sorted order, so that racks sharing letters follow each other and
+    find their common sub-racks in the memo table.
+
+    :param racks: The distinct canonical racks
+    :param min_length: Minimum word length to include
+    :param solver: The batch anagram solver (defaults to the one loaded by init_worker)
+    :return: Tuple of (dictionary mapping each rack to the JSON text of its words, memo hits, memo misses)
+    """
+    solver = solver or _worker_solver
+    hits, misses = solver.memo.hits, solver.memo.misses
+    results = {
+        rack: json.dumps(solver.solve(rack, min_length), ensure_ascii=False)
+        for rack in sorted(racks)
+    }
+    return results, solver.memo.hits - hits, solver.memo.misses - misses
+
+
+def canonicalize_chunk(lines):
+    """
+    Canonicalize the racks of a chunk of input lines (one rack per line, blank lines skipped).
+
+    :param lines: The input lines
+    :return: Tuple of (list of (rack, canonical rack or None, error message or None), set of distinct canonical racks)
+    """
+    racks = []
+    distinct = set()
+    for line in lines:
+        rack = line.strip()
+        if not rack:
+            continue
+        try:
+            canonical = normalize_rack(rack)
+        except ValueError as e:
+            racks.append((rack, None, str(e)))
+            continue
+        racks.append((rack, canonical, None))
+        distinct.add(canonical)
+    return racks, distinct
+
+
+def format_results(racks, results):
+    """
+    Format the results of a chunk as NDJSON, one line per input rack, in input order.
+
+    :param racks: The racks of the chunk, as returned by canonicalize_chunk
+    :param results: Dictionary mapping each canonical rack to the JSON text of its words
+    :return: The NDJSON text
+    """
+    lines = []
+    for rack, canonical, error in racks:
+        if error is not None:
+            lines.append(json.dumps({"rack": rack, "error": error}, ensure_ascii=False) + "\n")
+        else:
+            # The words are already JSON text, shared by the duplicates of the rack
+            lines.append(
+                f'{{"rack": {json.dumps(rack, ensure_ascii=False)}, '
+                f'"canonical": {json.dumps(canonical, ensure_ascii=False)}, "words": {results[canonical]}}}\n')
+    return "".join(lines)
+
+
+def solve_anagram_racks(
+        input_file,
+        output_file,
+        alphagram_file="assets/web_data/words_by_alphagram/words_grouped_by_alphagram_min.json",
+        min_length=2,
+        workers=os.cpu_count(),
+        chunk_size=CHUNK_SIZE,
+        memo_size=DEFAULT_MEMO_SIZE):
+    """
+    Solve a batch of racks of any size, streaming NDJSON results.
+
+    The input is read in chunks of racks. The racks of every chunk are canonicalized (accents removed,
+    letters sorted, blanks last) and deduplicated, and the distinct ones are sent as one partition to a
+    pool of processes, each keeping a bounded memo table of sub-rack results across partitions (see
+    lexicon/batch_anagram_solver.py). Only a few chunks per worker are in flight at any time and their
+    results are written as soon as they are ready, in input order, so memory use does not depend on the
+    size of the input.
+
+    :param input_file: The open input text file (one rack per line, '*' for blank tiles)
+    :param output_file: The open output text file, receiving one JSON object per rack
+    :param alphagram_file: Path to the words grouped by alphagram JSON file (see split_scrabble_data_for_web.py)
+    :param min_length: Minimum word length to include
+    :param workers: Number of worker processes to use (1 solves in this process)
+    :param chunk_size: Number of input lines per chunk
+    :param memo_size: Maximum number of sub-rack results kept in the memo table of every worker
+    :return: Dictionary with the number of racks, distinct racks per chunk, invalid racks, and memo hits and misses
+    """
+    totals = {"racks": 0, "distinct": 0, "invalid": 0, "memo_hits": 0, "memo_misses": 0}
+
+    def write_chunk(racks, distinct, solved):
+        results, hits, misses = solved
+        output_file.write(format_results(racks, results))
+        totals["racks"] += len(racks)
+        totals["distinct"] += len(distinct)
+        totals["invalid"] += sum(error is not None for _, _, error in racks)
+        totals["memo_hits"] += hits
+        totals["memo_misses"] += misses
+
+    chunks = (canonicalize_chunk(lines) for lines in read_chunks(input_file, chunk_size))
+
+    if workers > 1:
+        with ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(alphagram_file, memo_size)) as executor:
+            pending = deque()
+            for racks, distinct in chunks:
+                pending.append((racks, distinct, executor.submit(solve_partition, distinct, min_length)))
+                if len(pending) < workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    continue
+                racks, distinct, future = pending.popleft()
+                write_chunk(racks, distinct, future.result())
+
+            while pending:
+                racks, distinct, future = pending.popleft()
+                write_chunk(racks, distinct, future.result())
+    else:
+        solver = BatchAnagramSolver.from_json_file(alphagram_file, memo_size)
+        for racks, distinct in chunks:
+            write_chunk(racks, distinct, solve_partition(distinct, min_length, solver))
+
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find the anagrams of a batch of racks, writing one JSON result per rack (NDJSON).")
+    parser.add_argument("input_file", help="Text file with one rack per line, '*' for blank tiles "
+                                           "('-' reads standard input)")
+    parser.add_argument("-o", "--output-file", default="-",
+                        help="NDJSON output file ('-' writes to standard output, the default)")
+    parser.add_argument("--alphagram-file",
+                        default="assets/web_data/words_by_alphagram/words_grouped_by_alphagram_min.json",
+                        help="Words grouped by alphagram, written by split_scrabble_data_for_web.py")
+    parser.add_argument("--min-length", type=int, default=2, help="Minimum word length to include (default: 2)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Number of input racks per chunk (default: {CHUNK_SIZE})")
+    parser.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE,
+                        help=f"Maximum number of sub-rack results memoized per worker (default: {DEFAULT_MEMO_SIZE})")
+    args = parser.parse_args()
+
+    input_stream = sys.stdin if args.input_file == "-" else open(args.input_file, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output_file == "-" else open(args.output_file, "w", encoding="utf-8")
+
+    start_time = time.perf_counter()
+    try:
+        stats = solve_anagram_racks(
+            input_stream, output_stream, args.alphagram_file, args.min_length, args.workers, args.chunk_size,
+            args.memo_size)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    elapsed = time.perf_counter() - start_time
+
+    # Statistics go to standard error, so they never mix with NDJSON written to standard output
+    lookups = stats["memo_hits"] + stats["memo_misses"]
+    print(f"{stats['racks']} racks solved ({stats['distinct']} distinct per chunk, {stats['invalid']} invalid) "
+          f"in {elapsed:.2f} s ({stats['racks'] / elapsed if elapsed else 0:.0f} racks/s, "
+          f"memo hit rate {stats['memo_hits'] / lookups if lookups else 0:.1%})", file=sys.stderr)
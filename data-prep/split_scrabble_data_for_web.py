@@ -1,83 +1,901 @@
+import argparse
+import bisect
+import ctypes
+import errno
+import hashlib
 import os
 import json
+import random
 import shutil  # Import shutil for folder cleanup
+import statistics
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import combinations
 
-def split_data_by_starting_letter(data, output_dir):
+from lexicon.membership_filter import MembershipFilter
+from processors.preprocess_scrabble_data import add_derived_fields
+from utils.compression import compress_directory, compression_size_report, print_compression_size_report
+from utils.greek_letters import TILE_COUNTS
+from utils.instrumentation import RunReport
+from utils.streaming import JsonObjectStream, RecordFile, external_sort, group_sorted, write_json, write_ndjson
+
+# Target number of words per alphagram shard
+SHARD_TARGET_WORDS = 2000
+SHARD_MANIFEST_VERSION = 1
+SHARD_MANIFEST_FILE = "alphagram_shards_manifest.json"
+
+# Format version of the compact per-letter files
+COMPACT_FORMAT_VERSION = 1
+
+# Sample of 7-letter racks used to measure how many shards an anagram query touches
+RACK_SAMPLE_SIZE = 1000
+RACK_SAMPLE_SEED = 2024
+
+def write_json_file(file_path, data, minified=False):
     """
-    Split data into separate JSON files based on the starting letter of each word.
+    Write data to a JSON file, either readable (indented) or minified.
+
+    :param file_path: Path to the JSON file
+    :param data: Data to be written to JSON
+    :param minified: Write the minified version instead of the readable one
+    :return: Dictionary with the size in bytes and the SHA-256 checksum of the written file
+    """
+    if minified:
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(file_path, "wb") as f:
+        f.write(content)
+    return {"bytes": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+
+def write_json_variants(executor, output_dir, base_name, data):
+    """
+    Schedule the readable and minified versions of a JSON file to be written concurrently.
+
+    :param executor: The executor the writes are submitted to
+    :param output_dir: Directory where the files should be saved
+    :param base_name: File name without extension; the minified version gets a '_min' suffix
+    :param data: Data to be written to JSON
+    :return: List of futures, one per written file
+    """
+    return [
+        executor.submit(write_json_file, os.path.join(output_dir, f"{base_name}.json"), data),
+        executor.submit(write_json_file, os.path.join(output_dir, f"{base_name}_min.json"), data, True),
+    ]
+
+def run_writes(schedule_writes, executor=None):
+    """
+    Run the writes scheduled by a split function, on the given executor or on a temporary thread pool.
+
+    :param schedule_writes: Callable that submits the writes to an executor and returns their futures
+    :param executor: The executor to use; when None, a thread pool is created and the writes are awaited
+    :return: List of futures, one per written file
+    """
+    if executor is not None:
+        return schedule_writes(executor)
+
+    with ThreadPoolExecutor() as own_executor:
+        futures = schedule_writes(own_executor)
+        for future in futures:
+            future.result()  # Re-raise any write error
+    return futures
+
+def group_words_by_starting_letter(data):
+    """
+    Group the word entries by the starting letter of their word.
+
+    :param data: The processed word entries
+    :return: Dictionary mapping each starting letter to its entries
     """
-    # Group words by starting letter
     grouped_data = {}
     for entry in data:
         starting_letter = entry["word"][0].upper()
         if starting_letter not in grouped_data:
             grouped_data[starting_letter] = []
         grouped_data[starting_letter].append(entry)
+    return grouped_data
+
+def split_data_by_starting_letter(data, output_dir, executor=None):
+    """
+    Split data into separate JSON files based on the starting letter of each word.
+
+    :param data: The processed word entries
+    :param output_dir: Directory where the JSON files should be saved
+    :param executor: Optional executor the file writes are submitted to (the caller then awaits the returned futures)
+    :return: List of futures, one per written file
+    """
+    grouped_data = group_words_by_starting_letter(data)
 
-    # Write each group to a separate file
-    for letter, words in grouped_data.items():
-        letter_file_readable = os.path.join(output_dir, f"words_starting_with_{letter}.json")
-        letter_file_minified = os.path.join(output_dir, f"words_starting_with_{letter}_min.json")
+    # Write each group to a separate file, readable and minified version
+    return run_writes(
+        lambda pool: [
+            future
+            for letter, words in grouped_data.items()
+            for future in write_json_variants(pool, output_dir, f"words_starting_with_{letter}", words)
+        ],
+        executor)
 
-        # Write readable version
-        with open(letter_file_readable, "w", encoding="utf-8") as f:
-            json.dump(words, f, ensure_ascii=False, indent=2)
+def build_compact_words(entries):
+    """
+    Build the compact form of a list of word entries.
 
-        # Write minified version
-        with open(letter_file_minified, "w", encoding="utf-8") as f:
-            json.dump(words, f, ensure_ascii=False, separators=(',', ':'))
+    Only the words with a lemma, dictionary or comments get a metadata row, and their dictionary
+    is stored as an index into the list of dictionaries used in the file (0 is no dictionary).
+    The alphagram, length and points are left out, since they are derived from the word.
 
-def split_data_by_alphagram(data, output_dir):
+    :param entries: The processed word entries
+    :return: Dictionary with the format version, the words, the dictionaries and the metadata rows
+        ([word index, lemma, dictionary index, comments])
     """
-    Split data into a single JSON file with words grouped by alphagram, without metadata.
+    dictionaries = [""] + sorted({entry["dictionary"] for entry in entries} - {""})
+    dictionary_codes = {dictionary: code for code, dictionary in enumerate(dictionaries)}
+    return {
+        "format": COMPACT_FORMAT_VERSION,
+        "words": [entry["word"] for entry in entries],
+        "dictionaries": dictionaries,
+        "metadata": [
+            [index, entry["lemma"], dictionary_codes[entry["dictionary"]], entry["comments"]]
+            for index, entry in enumerate(entries)
+            if entry["lemma"] or entry["dictionary"] or entry["comments"]
+        ],
+    }
+
+def expand_compact_words(compact):
+    """
+    Rebuild the full word entries from their compact form, recomputing the derived fields.
+
+    :param compact: The compact words, as built by build_compact_words
+    :return: The processed word entries
+    """
+    if compact["format"] != COMPACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact format version {compact['format']}")
+
+    entries = [{"word": word, "lemma": "", "dictionary": "", "comments": ""} for word in compact["words"]]
+    for index, lemma, dictionary_code, comments in compact["metadata"]:
+        entries[index].update(lemma=lemma, dictionary=compact["dictionaries"][dictionary_code], comments=comments)
+    return [add_derived_fields(entry) for entry in entries]
+
+def split_data_by_starting_letter_compact(data, output_dir, executor=None):
+    """
+    Split data into separate compact JSON files based on the starting letter of each word.
+
+    See build_compact_words for the format.
+
+    :param data: The processed word entries
+    :param output_dir: Directory where the JSON files should be saved
+    :param executor: Optional executor the file writes are submitted to (the caller then awaits the returned futures)
+    :return: List of futures, one per written file
+    """
+    grouped_data = group_words_by_starting_letter(data)
+
+    # Write each group to a separate file, readable and minified version
+    return run_writes(
+        lambda pool: [
+            future
+            for letter, words in grouped_data.items()
+            for future in write_json_variants(
+                pool, output_dir, f"words_starting_with_{letter}_compact", build_compact_words(words))
+        ],
+        executor)
+
+def group_words_by_alphagram(data):
+    """
+    Group the words by alphagram (sorted letters), without metadata.
+
+    :param data: The processed word entries
+    :return: Dictionary mapping each alphagram to its words
     """
-    # Group words by alphagram (sorted letters)
     grouped_words_by_alphagram = {}
     for entry in data:
         alphagram_key = entry["alphagram"]
         if alphagram_key not in grouped_words_by_alphagram:
             grouped_words_by_alphagram[alphagram_key] = []
         grouped_words_by_alphagram[alphagram_key].append(entry["word"])
+    return grouped_words_by_alphagram
+
+def split_data_by_alphagram(data, output_dir, executor=None):
+    """
+    Split data into a single JSON file with words grouped by alphagram, without metadata.
+
+    :param data: The processed word entries
+    :param output_dir: Directory where the JSON files should be saved
+    :param executor: Optional executor the file writes are submitted to (the caller then awaits the returned futures)
+    :return: List of futures, one per written file
+    """
+    grouped_words_by_alphagram = group_words_by_alphagram(data)
+
+    # Write readable and minified version
+    return run_writes(
+        lambda pool: write_json_variants(pool, output_dir, "words_grouped_by_alphagram", grouped_words_by_alphagram),
+        executor)
+
+def shard_key(alphagram, previous_alphagram):
+    """
+    Shortest prefix of an alphagram that sorts after the previous alphagram.
+
+    :param alphagram: The first alphagram of a shard
+    :param previous_alphagram: The last alphagram of the previous shard ("" for the first shard)
+    :return: The shard key
+    """
+    for index, letter in enumerate(alphagram):
+        if index >= len(previous_alphagram) or letter != previous_alphagram[index]:
+            return alphagram[:index + 1]
+    return alphagram
+
+def build_alphagram_shards(grouped_words_by_alphagram, target_words=SHARD_TARGET_WORDS):
+    """
+    Split the alphagram groups into shards of about the same number of words.
+
+    Every shard holds alphagrams of a single length and a contiguous range of them in sorted order.
+    It is keyed by the length and the shortest alphagram prefix that sorts after the previous
+    shard, so the shard of an alphagram is the last shard of its length whose key is not greater
+    than the alphagram. The anagrams of a rack share few prefixes, so a rack query only needs the
+    handful of shards covering them.
+
+    :param grouped_words_by_alphagram: Dictionary mapping each alphagram to its words
+    :param target_words: Target number of words per shard (a shard only exceeds it when a single alphagram does)
+    :return: List of shards, sorted by length and key, each with its length, key, word count and alphagram groups
+    """
+    sorted_alphagrams = sorted(grouped_words_by_alphagram, key=lambda alphagram: (len(alphagram), alphagram))
+    return list(iter_alphagram_shards(
+        ((alphagram, grouped_words_by_alphagram[alphagram]) for alphagram in sorted_alphagrams), target_words))
+
+def iter_alphagram_shards(groups, target_words=SHARD_TARGET_WORDS):
+    """
+    Split alphagram groups already sorted by length and alphagram into shards, one shard at a time.
+
+    See build_alphagram_shards for the shards.
+
+    :param groups: Iterable of (alphagram, words) pairs, sorted by length and alphagram
+    :param target_words: Target number of words per shard (a shard only exceeds it when a single alphagram does)
+    :return: Generator of the shards, each one yielded once it is complete
+    """
+    shard = None
+    previous_alphagram = ""
+    for alphagram, words in groups:
+        if shard is None or shard["length"] != len(alphagram) or shard["words"] + len(words) > target_words:
+            if shard is not None:
+                if shard["length"] != len(alphagram):
+                    previous_alphagram = ""
+                yield shard
+            shard = {
+                "length": len(alphagram),
+                "key": shard_key(alphagram, previous_alphagram),
+                "words": 0,
+                "groups": {},
+            }
+        shard["groups"][alphagram] = words
+        shard["words"] += len(words)
+        previous_alphagram = alphagram
+    if shard is not None:
+        yield shard
+
+def shard_file_name(shard):
+    """File name of a shard, without extension and '_min' suffix."""
+    return f"alphagrams_{shard['length']}_{shard['key']}"
+
+def split_data_by_alphagram_shards(shards, output_dir, executor=None):
+    """
+    Write every alphagram shard to its own JSON file, readable and minified version.
+
+    :param shards: The shards, as returned by build_alphagram_shards
+    :param output_dir: Directory where the shard files should be saved
+    :param executor: Optional executor the file writes are submitted to (the caller then awaits the returned futures)
+    :return: List of futures, two per shard (readable then minified), in shard order
+    """
+    return run_writes(
+        lambda pool: [
+            future
+            for shard in shards
+            for future in write_json_variants(pool, output_dir, shard_file_name(shard), shard["groups"])
+        ],
+        executor)
+
+def find_shard(shard_keys, alphagram):
+    """
+    Find the shard holding an alphagram.
+
+    :param shard_keys: Dictionary mapping each length to the sorted keys of its shards
+    :param alphagram: The alphagram
+    :return: Tuple of (length, shard key), or None if there is no shard of that length
+    """
+    keys = shard_keys.get(len(alphagram))
+    if not keys:
+        return None
+    return len(alphagram), keys[max(bisect.bisect_right(keys, alphagram) - 1, 0)]
+
+def write_alphagram_shard_manifest(shards, shard_futures, output_dir):
+    """
+    Write the manifest mapping the shard keys to the shard files, with their sizes and checksums.
+
+    :param shards: The shards, as returned by build_alphagram_shards
+    :param shard_futures: The completed write futures, as returned by split_data_by_alphagram_shards
+    :param output_dir: Directory where the manifest should be saved
+    :return: The manifest
+    """
+    return save_alphagram_shard_manifest(
+        [
+            alphagram_shard_manifest_entry(
+                shard, shard_futures[2 * index].result(), shard_futures[2 * index + 1].result())
+            for index, shard in enumerate(shards)
+        ],
+        output_dir)
+
+def alphagram_shard_manifest_entry(shard, readable, minified):
+    """
+    Describe a written shard in the shard manifest.
+
+    :param shard: The shard
+    :param readable: Size and checksum of its readable file, as returned by write_json_file
+    :param minified: Size and checksum of its minified file
+    :return: Tuple of (length, manifest entry)
+    """
+    return shard["length"], {
+        "key": shard["key"],
+        "file": shard_file_name(shard),
+        "words": shard["words"],
+        "alphagrams": len(shard["groups"]),
+        "readable": readable,
+        "minified": minified,
+    }
+
+def save_alphagram_shard_manifest(shard_entries, output_dir):
+    """
+    Write the shard manifest.
+
+    :param shard_entries: List of (length, manifest entry) tuples in shard order, from alphagram_shard_manifest_entry
+    :param output_dir: Directory where the manifest should be saved
+    :return: The manifest
+    """
+    lengths = {}
+    for length, entry in shard_entries:
+        lengths.setdefault(str(length), []).append(entry)
+
+    manifest = {
+        "version": SHARD_MANIFEST_VERSION,
+        "target_words_per_shard": SHARD_TARGET_WORDS,
+        "words": sum(entry["words"] for _, entry in shard_entries),
+        "alphagrams": sum(entry["alphagrams"] for _, entry in shard_entries),
+        "lengths": lengths,
+    }
+    write_json_file(os.path.join(output_dir, SHARD_MANIFEST_FILE), manifest)
+    return manifest
+
+def alphagram_shard_stats(manifest, full_file_bytes=None):
+    """
+    Calculate the shard size and load balance statistics of a shard manifest.
+
+    The query statistics count the shards covering all the sub-alphagrams (2 letters or more) of a
+    seeded sample of 7-tile racks drawn from the tile bag, i.e. the shards an anagram query fetches.
+
+    :param manifest: The shard manifest
+    :param full_file_bytes: Size of the unsharded minified alphagram file, to compare the query size with
+    :return: Dictionary with the statistics
+    """
+    shards = [shard for length_shards in manifest["lengths"].values() for shard in length_shards]
+    words = [shard["words"] for shard in shards]
+    sizes = [shard["minified"]["bytes"] for shard in shards]
+    shard_keys = {int(length): [shard["key"] for shard in length_shards]
+                  for length, length_shards in manifest["lengths"].items()}
+    shard_sizes = {(int(length), shard["key"]): shard["minified"]["bytes"]
+                   for length, length_shards in manifest["lengths"].items() for shard in length_shards}
+
+    # Racks are drawn from a full tile bag, without the blank tiles
+    bag = [letter for letter, count in TILE_COUNTS.items() for _ in range(count)]
+    rng = random.Random(RACK_SAMPLE_SEED)
+    rack_shards = []
+    rack_bytes = []
+    for _ in range(RACK_SAMPLE_SIZE):
+        rack = "".join(sorted(rng.sample(bag, 7)))
+        touched = {
+            find_shard(shard_keys, "".join(letters))
+            for length in range(2, len(rack) + 1)
+            for letters in set(combinations(rack, length))} - {None}
+        rack_shards.append(len(touched))
+        rack_bytes.append(sum(shard_sizes[shard] for shard in touched))
+
+    mean_words = statistics.mean(words)
+    stats = {
+        "shards": len(shards),
+        "words_per_shard": {
+            "min": min(words),
+            "median": statistics.median(words),
+            "mean": round(mean_words, 1),
+            "max": max(words),
+            "stdev": round(statistics.pstdev(words), 1),
+        },
+        "imbalance": round(max(words) / mean_words, 2),
+        "minified_bytes_per_shard": {"min": min(sizes), "median": statistics.median(sizes), "max": max(sizes)},
+    }
+    stats["rack_query"] = {
+        "racks": len(rack_shards),
+        "mean_shards": round(statistics.mean(rack_shards), 1),
+        "max_shards": max(rack_shards),
+        "mean_bytes": round(statistics.mean(rack_bytes)),
+        "full_file_bytes": full_file_bytes,
+    }
+    return stats
+
+def print_alphagram_shard_stats(stats):
+    """
+    Print the shard size and load balance statistics.
+
+    :param stats: The statistics, as returned by alphagram_shard_stats
+    :return: None
+    """
+    words = stats["words_per_shard"]
+    sizes = stats["minified_bytes_per_shard"]
+    print(f"Alphagram shards: {stats['shards']}, words per shard min {words['min']} / median {words['median']} / "
+          f"mean {words['mean']} / max {words['max']} (stdev {words['stdev']}, max/mean {stats['imbalance']})")
+    print(f"Minified shard size: min {sizes['min']} / median {sizes['median']} / max {sizes['max']} bytes")
+    rack_query = stats["rack_query"]
+    full_file = f" (full file: {rack_query['full_file_bytes']} bytes)" if rack_query["full_file_bytes"] else ""
+    print(f"7-tile rack query: {rack_query['mean_shards']} shards on average (max {rack_query['max_shards']}), "
+          f"{rack_query['mean_bytes']} bytes{full_file}")
+
+def partition_words_by_starting_letter(data, work_dir):
+    """
+    Write the word entries to one NDJSON file per starting letter, keeping their order.
+
+    :param data: Iterable of the processed word entries
+    :param work_dir: Directory where the NDJSON files should be saved
+    :return: Dictionary mapping each starting letter to a RecordFile of its entries, in order of first appearance
+    """
+    letter_files = {}
+    counts = {}
+    try:
+        for entry in data:
+            starting_letter = entry["word"][0].upper()
+            if starting_letter not in letter_files:
+                letter_files[starting_letter] = open(
+                    os.path.join(work_dir, f"words_starting_with_{starting_letter}.ndjson"), "w", encoding="utf-8")
+                counts[starting_letter] = 0
+            letter_files[starting_letter].write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            counts[starting_letter] += 1
+    finally:
+        for f in letter_files.values():
+            f.close()
+    return {letter: RecordFile(f.name, count=counts[letter]) for letter, f in letter_files.items()}
+
+def write_streamed_json_variants(executor, output_dir, base_name, document):
+    """
+    Schedule the readable and minified versions of a streamed JSON file to be written concurrently.
+
+    :param executor: The executor the writes are submitted to
+    :param output_dir: Directory where the files should be saved
+    :param base_name: File name without extension; the minified version gets a '_min' suffix
+    :param document: Callable returning the document to write (see utils/streaming.py write_json), called once per file
+    :return: List of futures, one per written file
+    """
+    return [
+        executor.submit(write_json, os.path.join(output_dir, f"{base_name}.json"), document(), 2),
+        executor.submit(write_json, os.path.join(output_dir, f"{base_name}_min.json"), document()),
+    ]
+
+def compact_words_document(entries):
+    """
+    Streamed equivalent of build_compact_words, for write_json.
+
+    :param entries: The processed word entries, as a RecordFile (read once for the dictionaries, then once per file)
+    :return: Callable returning the compact words document
+    """
+    dictionaries = [""] + sorted({entry["dictionary"] for entry in entries} - {""})
+    dictionary_codes = {dictionary: code for code, dictionary in enumerate(dictionaries)}
+    return lambda: JsonObjectStream([
+        ("format", COMPACT_FORMAT_VERSION),
+        ("words", (entry["word"] for entry in entries)),
+        ("dictionaries", dictionaries),
+        ("metadata", (
+            [index, entry["lemma"], dictionary_codes[entry["dictionary"]], entry["comments"]]
+            for index, entry in enumerate(entries)
+            if entry["lemma"] or entry["dictionary"] or entry["comments"]
+        )),
+    ])
+
+def sorted_alphagram_groups(data, spill_dir=None):
+    """
+    Group the words by alphagram with an external sort, without holding them in memory.
+
+    :param data: Iterable of the processed word entries
+    :param spill_dir: Directory for the external sort run files (None uses the system temporary directory)
+    :return: Generator of [alphagram, index of its first word, words] groups, sorted by length and alphagram,
+        with the words of each group in their original order
+    """
+    records = ([entry["alphagram"], index, entry["word"]] for index, entry in enumerate(data))
+    sorted_records = external_sort(
+        records, key=lambda record: (len(record[0]), record[0], record[1]), spill_dir=spill_dir)
+    for alphagram, group in group_sorted(sorted_records, key=lambda record: record[0]):
+        yield [alphagram, group[0][1], [record[2] for record in group]]
+
+def split_data_by_alphagram_shards_streaming(groups, output_dir):
+    """
+    Write the alphagram shards and their manifest, building and writing one shard at a time.
+
+    :param groups: Iterable of (alphagram, words) pairs, sorted by length and alphagram
+    :param output_dir: Directory where the shard files and the manifest should be saved
+    :return: The manifest
+    """
+    shard_entries = []
+    for shard in iter_alphagram_shards(groups):
+        readable = write_json_file(os.path.join(output_dir, f"{shard_file_name(shard)}.json"), shard["groups"])
+        minified = write_json_file(
+            os.path.join(output_dir, f"{shard_file_name(shard)}_min.json"), shard["groups"], True)
+        shard_entries.append(alphagram_shard_manifest_entry(shard, readable, minified))
+    return save_alphagram_shard_manifest(shard_entries, output_dir)
+
+# renameat2 flag swapping two paths atomically (Linux 3.15+, glibc 2.28+)
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+def exchange_directories(first_dir, second_dir):
+    """
+    Atomically swap two directories with renameat2(RENAME_EXCHANGE), where the platform supports it.
+
+    :param first_dir: The first directory
+    :param second_dir: The second directory, on the same file system
+    :return: True if the directories were swapped, False if the platform or file system cannot exchange them
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except AttributeError:
+        return False
+
+    result = renameat2(AT_FDCWD, os.fsencode(first_dir), AT_FDCWD, os.fsencode(second_dir), RENAME_EXCHANGE)
+    if result == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP):
+        return False
+    raise OSError(error, os.strerror(error), first_dir, None, second_dir)
 
-    # Write readable version
-    alphagrams_file_readable = os.path.join(output_dir, "words_grouped_by_alphagram.json")
-    with open(alphagrams_file_readable, "w", encoding="utf-8") as f:
-        json.dump(grouped_words_by_alphagram, f, ensure_ascii=False, indent=2)
+def backup_directory_path(target_dir):
+    """
+    Path where replace_directory keeps the previous data while it renames the new data in place.
+
+    :param target_dir: The directory being replaced
+    :return: Path to the backup directory, next to the target directory
+    """
+    return f"{os.path.abspath(target_dir)}.old"
+
+def recover_directory(target_dir):
+    """
+    Clean up after a replace_directory that was interrupted between its two renames.
+
+    If only the backup is left, the previous data is renamed back in place. If both the target and
+    the backup exist, the new data was already in place and the backup is removed.
+
+    :param target_dir: The directory being replaced
+    :return: None
+    """
+    backup_dir = backup_directory_path(target_dir)
+    if not os.path.exists(backup_dir):
+        return
+    if os.path.exists(target_dir):
+        shutil.rmtree(backup_dir)
+    else:
+        print(f"Restoring {target_dir} from the backup left by an interrupted export.")
+        os.replace(backup_dir, target_dir)
+
+def replace_directory(staging_dir, target_dir):
+    """
+    Swap a fully written staging directory in place of the target directory.
 
-    # Write minified version
-    alphagrams_file_minified = os.path.join(output_dir, "words_grouped_by_alphagram_min.json")
-    with open(alphagrams_file_minified, "w", encoding="utf-8") as f:
-        json.dump(grouped_words_by_alphagram, f, ensure_ascii=False, separators=(',', ':'))
+    On Linux the two directories are exchanged atomically, so the target directory is always either
+    the old one or the new one. Elsewhere (or on file systems without RENAME_EXCHANGE) the target is
+    first renamed to a backup and the staging directory renamed in its place: the target is briefly
+    missing in between, and if the process dies there, recover_directory restores the backup at the
+    start of the next export.
+
+    :param staging_dir: The directory holding the new content
+    :param target_dir: The directory to replace
+    :return: None
+    """
+    if not os.path.exists(target_dir):
+        os.replace(staging_dir, target_dir)
+        return
+
+    if exchange_directories(staging_dir, target_dir):
+        # The staging directory now holds the previous data
+        shutil.rmtree(staging_dir)
+        return
+
+    backup_dir = backup_directory_path(target_dir)
+    os.replace(target_dir, backup_dir)
+    try:
+        os.replace(staging_dir, target_dir)
+    except OSError:
+        # Put the previous data back before giving up
+        os.replace(backup_dir, target_dir)
+        raise
+    shutil.rmtree(backup_dir)
+
+def publish_web_data(staging_dir, web_output_dir, run_report, compression_formats, compress_workers):
+    """
+    Write the precompressed siblings of the staged web data files, then swap the staging directory in.
+
+    :param staging_dir: The directory holding the new web data
+    :param web_output_dir: Directory where the web data should be saved
+    :param run_report: The run report the stages are added to
+    :param compression_formats: Formats of the precompressed siblings written for every JSON file
+        (see utils/compression.py); empty to skip compression
+    :param compress_workers: Number of compression worker processes (None uses the number of CPUs)
+    :return: None
+    """
+    if compression_formats:
+        with run_report.stage("compress_web_data", outputs=[staging_dir]) as metrics:
+            # Unchanged files reuse the compressed siblings of the current web data
+            manifest = compress_directory(
+                staging_dir, compression_formats, previous_dir=web_output_dir, workers=compress_workers)
+            size_report = compression_size_report(manifest)
+            print_compression_size_report(size_report, compression_formats)
+            metrics["records_in"] = len(manifest["files"])
+            metrics["records_out"] = sum(not entry.get("reused") for entry in manifest["files"].values())
+            metrics["size_report"] = size_report
+
+    with run_report.stage("replace_web_data"):
+        # tempfile.mkdtemp creates the directory with owner-only permissions
+        os.chmod(staging_dir, 0o755)
+        replace_directory(staging_dir, web_output_dir)
+
+def export_web_data(
+        data, web_output_dir, max_workers=None, run_report=None, compression_formats=("gz",), compress_workers=None):
+    """
+    Export the web data (words by starting letter, in full and compact form, words by alphagram,
+    the alphagram shards and the word membership filter),
+    with precompressed siblings (e.g. .json.gz) of every JSON file.
+
+    Every group is built once and its readable and minified versions are written concurrently
+    on a thread pool. Everything is written to a staging directory next to the output directory,
+    which is only swapped in once all files are written, so a failed export leaves the previous
+    data untouched.
+
+    When the export is instrumented, the writes of each split are awaited before the next one starts,
+    so that they are measured as part of their own stage. The alphagram shards are always awaited,
+    since their manifest records the sizes and checksums of the written files.
+
+    :param data: The processed word entries
+    :param web_output_dir: Directory where the web data should be saved
+    :param max_workers: Maximum number of writer threads (None uses the ThreadPoolExecutor default)
+    :param run_report: Optional run report (see utils/instrumentation.py) the export stages are added to
+    :param compression_formats: Formats of the precompressed siblings written for every JSON file
+        (see utils/compression.py); empty to skip compression
+    :param compress_workers: Number of compression worker processes (None uses the number of CPUs)
+    :return: None
+    """
+    run_report = run_report or RunReport()
+    parent_dir = os.path.dirname(os.path.abspath(web_output_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    recover_directory(web_output_dir)
+    staging_dir = tempfile.mkdtemp(prefix=".web_data_", dir=parent_dir)
+
+    try:
+        words_by_letter_dir = os.path.join(staging_dir, "words_by_starting_letter")
+        compact_words_by_letter_dir = os.path.join(staging_dir, "words_by_starting_letter_compact")
+        words_by_alphagram_dir = os.path.join(staging_dir, "words_by_alphagram")
+        alphagram_shards_dir = os.path.join(staging_dir, "alphagram_shards")
+        membership_filter_dir = os.path.join(staging_dir, "membership_filter")
+        os.makedirs(words_by_letter_dir)
+        os.makedirs(compact_words_by_letter_dir)
+        os.makedirs(words_by_alphagram_dir)
+        os.makedirs(alphagram_shards_dir)
+        os.makedirs(membership_filter_dir)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            with run_report.stage(
+                    "split_by_starting_letter", outputs=[words_by_letter_dir], records_in=len(data)) as metrics:
+                futures = split_data_by_starting_letter(data, words_by_letter_dir, executor)
+                if run_report.enabled:
+                    wait(futures)
+                metrics["records_out"] = len(data)
+
+            with run_report.stage(
+                    "split_by_starting_letter_compact", outputs=[compact_words_by_letter_dir],
+                    records_in=len(data)) as metrics:
+                compact_futures = split_data_by_starting_letter_compact(data, compact_words_by_letter_dir, executor)
+                if run_report.enabled:
+                    wait(compact_futures)
+                metrics["records_out"] = len(data)
+
+            with run_report.stage(
+                    "split_by_alphagram", outputs=[words_by_alphagram_dir], records_in=len(data)) as metrics:
+                alphagram_futures = split_data_by_alphagram(data, words_by_alphagram_dir, executor)
+                if run_report.enabled:
+                    wait(alphagram_futures)
+                metrics["records_out"] = len({entry["alphagram"] for entry in data})
+
+            with run_report.stage(
+                    "split_by_alphagram_shard", outputs=[alphagram_shards_dir], records_in=len(data)) as shard_metrics:
+                shards = build_alphagram_shards(group_words_by_alphagram(data))
+                shard_futures = split_data_by_alphagram_shards(shards, alphagram_shards_dir, executor)
+                # The manifest needs the sizes and checksums of all the shard files
+                manifest = write_alphagram_shard_manifest(shards, shard_futures, alphagram_shards_dir)
+                shard_metrics["records_out"] = len(shards)
+
+            with run_report.stage(
+                    "membership_filter", outputs=[membership_filter_dir], records_in=len(data)) as metrics:
+                membership_filter = MembershipFilter.build(entry["word"] for entry in data)
+                membership_filter.save(os.path.join(membership_filter_dir, "scrabble_words.bloom"))
+                metrics["records_out"] = membership_filter.word_count
+
+            for future in futures + compact_futures + alphagram_futures:
+                future.result()  # Re-raise any write error
+
+            shard_stats = alphagram_shard_stats(manifest, alphagram_futures[1].result()["bytes"])
+            # Reported with the shard stage, whose metrics can still be updated after its block
+            shard_metrics["shard_stats"] = shard_stats
+            print_alphagram_shard_stats(shard_stats)
+
+        publish_web_data(staging_dir, web_output_dir, run_report, compression_formats, compress_workers)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+def export_web_data_streaming(
+        input_file, web_output_dir, max_workers=None, run_report=None, compression_formats=("gz",),
+        compress_workers=None):
+    """
+    Streaming version of export_web_data: the same files, without ever holding the word list in memory.
+
+    The processed words are read one at a time and partitioned into one NDJSON file per starting letter.
+    The words by starting letter and their compact form are then written from these files, while the
+    alphagram groups are gathered with an external sort into an NDJSON file of groups, sorted by length
+    and alphagram, from which the shards are written one at a time. A second external sort puts the
+    groups back in the order of their first word for the single alphagram file. The peak memory is
+    bounded by the external sort chunk size and the size of a single alphagram group, not by the
+    number of words (apart from the membership filter bits, which are part of the output).
+
+    :param input_file: Path to the processed lexicon, as a JSON array or an NDJSON file
+    :param web_output_dir: Directory where the web data should be saved
+    :param max_workers: Maximum number of writer threads (None uses the ThreadPoolExecutor default)
+    :param run_report: Optional run report (see utils/instrumentation.py) the export stages are added to
+    :param compression_formats: Formats of the precompressed siblings written for every JSON file
+        (see utils/compression.py); empty to skip compression
+    :param compress_workers: Number of compression worker processes (None uses the number of CPUs)
+    :return: None
+    """
+    run_report = run_report or RunReport()
+    parent_dir = os.path.dirname(os.path.abspath(web_output_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    recover_directory(web_output_dir)
+    staging_dir = tempfile.mkdtemp(prefix=".web_data_", dir=parent_dir)
+    # Intermediate NDJSON and external sort files, next to the staging directory
+    work_dir = tempfile.mkdtemp(prefix=".web_data_work_", dir=parent_dir)
+
+    try:
+        words_by_letter_dir = os.path.join(staging_dir, "words_by_starting_letter")
+        compact_words_by_letter_dir = os.path.join(staging_dir, "words_by_starting_letter_compact")
+        words_by_alphagram_dir = os.path.join(staging_dir, "words_by_alphagram")
+        alphagram_shards_dir = os.path.join(staging_dir, "alphagram_shards")
+        membership_filter_dir = os.path.join(staging_dir, "membership_filter")
+        os.makedirs(words_by_letter_dir)
+        os.makedirs(compact_words_by_letter_dir)
+        os.makedirs(words_by_alphagram_dir)
+        os.makedirs(alphagram_shards_dir)
+        os.makedirs(membership_filter_dir)
+
+        with run_report.stage("partition_by_starting_letter", inputs=[input_file]) as metrics:
+            letter_files = partition_words_by_starting_letter(RecordFile(input_file), work_dir)
+            word_count = sum(len(entries) for entries in letter_files.values())
+            metrics["records_out"] = word_count
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            with run_report.stage(
+                    "split_by_starting_letter", outputs=[words_by_letter_dir], records_in=word_count) as metrics:
+                futures = [
+                    future
+                    for letter, entries in letter_files.items()
+                    for future in write_streamed_json_variants(
+                        executor, words_by_letter_dir, f"words_starting_with_{letter}",
+                        lambda entries=entries: iter(entries))
+                ]
+                wait(futures)
+                metrics["records_out"] = word_count
+
+            with run_report.stage(
+                    "split_by_starting_letter_compact", outputs=[compact_words_by_letter_dir],
+                    records_in=word_count) as metrics:
+                compact_futures = [
+                    future
+                    for letter, entries in letter_files.items()
+                    for future in write_streamed_json_variants(
+                        executor, compact_words_by_letter_dir, f"words_starting_with_{letter}_compact",
+                        compact_words_document(entries))
+                ]
+                wait(compact_futures)
+                metrics["records_out"] = word_count
+
+            with run_report.stage(
+                    "group_by_alphagram", outputs=[work_dir], records_in=word_count) as metrics:
+                # Sorted by length and alphagram, for the shards
+                alphagram_groups_file = os.path.join(work_dir, "alphagram_groups.ndjson")
+                alphagram_count = write_ndjson(
+                    alphagram_groups_file, sorted_alphagram_groups(RecordFile(input_file), spill_dir=work_dir))
+                # Sorted by first word, for the single alphagram file (the order export_web_data writes them in)
+                alphagram_groups_by_first_word_file = os.path.join(work_dir, "alphagram_groups_by_first_word.ndjson")
+                write_ndjson(
+                    alphagram_groups_by_first_word_file,
+                    external_sort(RecordFile(alphagram_groups_file), key=lambda group: group[1], spill_dir=work_dir))
+                metrics["records_out"] = alphagram_count
+
+            with run_report.stage(
+                    "split_by_alphagram", outputs=[words_by_alphagram_dir], records_in=word_count) as metrics:
+                alphagram_futures = write_streamed_json_variants(
+                    executor, words_by_alphagram_dir, "words_grouped_by_alphagram",
+                    lambda: JsonObjectStream(
+                        (alphagram, words) for alphagram, _, words in RecordFile(alphagram_groups_by_first_word_file)))
+                wait(alphagram_futures)
+                metrics["records_out"] = alphagram_count
+
+            with run_report.stage(
+                    "split_by_alphagram_shard", outputs=[alphagram_shards_dir], records_in=word_count) as shard_metrics:
+                manifest = split_data_by_alphagram_shards_streaming(
+                    ((alphagram, words) for alphagram, _, words in RecordFile(alphagram_groups_file)),
+                    alphagram_shards_dir)
+                shard_metrics["records_out"] = sum(len(length_shards) for length_shards in manifest["lengths"].values())
+
+            with run_report.stage(
+                    "membership_filter", outputs=[membership_filter_dir], records_in=word_count) as metrics:
+                words = (word for _, _, group_words in RecordFile(alphagram_groups_file) for word in group_words)
+                membership_filter = MembershipFilter.build(words, word_count=word_count)
+                membership_filter.save(os.path.join(membership_filter_dir, "scrabble_words.bloom"))
+                metrics["records_out"] = membership_filter.word_count
+
+            for future in futures + compact_futures + alphagram_futures:
+                future.result()  # Re-raise any write error
+
+            shard_stats = alphagram_shard_stats(manifest, alphagram_futures[1].result()["bytes"])
+            # Reported with the shard stage, whose metrics can still be updated after its block
+            shard_metrics["shard_stats"] = shard_stats
+            print_alphagram_shard_stats(shard_stats)
+
+        publish_web_data(staging_dir, web_output_dir, run_report, compression_formats, compress_workers)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split the processed word list into the web app data files.")
+    parser.add_argument("--report", nargs="?", const="assets/data/web_export_report.json", metavar="FILE",
+                        help="Instrument every stage and write a JSON run report "
+                             "(default: assets/data/web_export_report.json)")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="Profile every stage with cProfile and write one .prof dump per stage to DIR")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="Do not measure the peak memory of the stages with tracemalloc, which slows them down")
+    parser.add_argument("--xz", action="store_true",
+                        help="Also write .xz siblings of the JSON files, next to the .gz ones")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="Do not write precompressed siblings of the JSON files")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stream the processed words instead of loading them, with bounded memory")
+    args = parser.parse_args()
+
     # File paths
     final_scrabble_words_json_file = "assets/data/json/scrabble_words_2_to_8_chars.json"
     web_output_dir = "assets/web_data"
 
-    # Create output directory if it doesn't exist
-    if not os.path.exists(web_output_dir):
-        os.makedirs(web_output_dir)
+    run_report = RunReport(args.report, args.profile_dir, trace_memory=not args.no_trace_memory)
+    compression_formats = () if args.no_compress else ("gz", "xz") if args.xz else ("gz",)
+
+    if args.streaming:
+        # Split data by starting letter and by alphagram, reading the words one at a time
+        export_web_data_streaming(
+            final_scrabble_words_json_file, web_output_dir, run_report=run_report,
+            compression_formats=compression_formats)
     else:
-        # Remove all contents of the web_data directory
-        for file_or_dir in os.listdir(web_output_dir):
-            path = os.path.join(web_output_dir, file_or_dir)
-            if os.path.isfile(path) or os.path.islink(path):
-                os.unlink(path)  # Remove file or symbolic link
-            elif os.path.isdir(path):
-                shutil.rmtree(path)  # Remove directory
-
-    # Load the data
-    with open(final_scrabble_words_json_file, "r", encoding="utf-8") as f:
-        scrabble_data = json.load(f)
-
-    # Split data by starting letter
-    words_by_letter_dir = os.path.join(web_output_dir, "words_by_starting_letter")
-    os.makedirs(words_by_letter_dir, exist_ok=True)
-    split_data_by_starting_letter(scrabble_data, words_by_letter_dir)
-
-    # Split data by alphagram
-    words_by_alphagram_dir = os.path.join(web_output_dir, "words_by_alphagram")
-    os.makedirs(words_by_alphagram_dir, exist_ok=True)
-    split_data_by_alphagram(scrabble_data, words_by_alphagram_dir)
+        # Load the data
+        with run_report.stage("load_processed_words", inputs=[final_scrabble_words_json_file]) as metrics:
+            with open(final_scrabble_words_json_file, "r", encoding="utf-8") as f:
+                scrabble_data = json.load(f)
+            metrics["records_out"] = len(scrabble_data)
+
+        # Split data by starting letter and by alphagram
+        export_web_data(scrabble_data, web_output_dir, run_report=run_report, compression_formats=compression_formats)
 
     print(f"Data successfully split and stored in {web_output_dir}")
+    run_report.save()
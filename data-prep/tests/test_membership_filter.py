@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from export_membership_filter import verify_false_positive_rate
+from lexicon.membership_filter import MembershipFilter
+from utils.greek_letters import GREEK_LETTERS
+
+
+def random_words(count, seed=0):
+    """
+    Generate a seeded set of distinct random words, with lengths between 2 and 8 letters.
+
+    :param count: Number of words
+    :param seed: Random seed
+    :return: Sorted list of the words
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(GREEK_LETTERS) for _ in range(rng.randint(2, 8))))
+    return sorted(words)
+
+
+class MembershipFilterTest(unittest.TestCase):
+    """
+    Run from data-prep with: python -m pytest tests (or python -m unittest discover tests)
+    """
+
+    def setUp(self):
+        self.words = random_words(20000)
+
+    def test_false_positive_rate(self):
+        for false_positive_rate in (0.01, 0.001):
+            membership_filter = MembershipFilter.build(self.words, false_positive_rate)
+            verification = verify_false_positive_rate(membership_filter, self.words, samples=50000)
+
+            self.assertEqual(verification["false_negatives"], 0)
+            # Allow some sampling noise around the target rate, as export_membership_filter.py does
+            self.assertLess(verification["random_false_positive_rate"], 1.5 * false_positive_rate)
+            self.assertLess(verification["typo_false_positive_rate"], 1.5 * false_positive_rate)
+
+    def test_add_words_matches_add(self):
+        batch_filter = MembershipFilter.build(self.words)
+        single_filter = MembershipFilter(
+            bytearray(len(batch_filter.bits)), batch_filter.bit_count, batch_filter.hash_count)
+        for word in self.words:
+            single_filter.add(word)
+
+        self.assertEqual(batch_filter.bits, single_filter.bits)
+        self.assertEqual(batch_filter.word_count, single_filter.word_count)
+
+    def test_round_trip(self):
+        membership_filter = MembershipFilter.build(self.words)
+        loaded_filter = MembershipFilter.from_bytes(membership_filter.to_bytes())
+
+        self.assertEqual(loaded_filter.to_bytes(), membership_filter.to_bytes())
+        self.assertTrue(all(word in loaded_filter for word in self.words))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+
+# Character used for blank tiles in a rack
+WILDCARD = "*"
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+    """
+
+    def __init__(self, max_size=10000):
+        """
+        :param max_size: Maximum number of cached results (0 disables the cache)
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, compute):
+        """
+        Return the cached value of a key, computing (and caching) it on a miss.
+
+        :param key: The cache key
+        :param compute: Callable returning the value of the key
+        :return: The value
+        """
+        if key in self._items:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+        self.misses += 1
+        value = compute()
+        if self.max_size > 0:
+            self._items[key] = value
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+    def stats(self):
+        """
+        :return: Dictionary with the cache size, hits, misses and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def canonical_word(word):
+    """Canonical form of a word: trimmed and uppercase."""
+    return word.strip().upper()
+
+
+def canonical_rack(rack):
+    """Canonical form of a rack: its letters sorted, followed by its blank tiles, so all orderings share a cache entry."""
+    letters = canonical_word(rack).replace(" ", "")
+    return "".join(sorted(letter for letter in letters if letter != WILDCARD)) + WILDCARD * letters.count(WILDCARD)
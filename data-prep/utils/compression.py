@@ -0,0 +1,140 @@
+import gzip
+import json
+import lzma
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.stage_cache import hash_file
+
+
+# Manifest recording the hash of every compressed file, written at the root of the compressed directory
+COMPRESSION_MANIFEST_FILE = "compression_manifest.json"
+
+# Stdlib codecs, by file extension. gzip gets a fixed mtime so the output only depends on the content
+COMPRESSORS = {
+    "gz": lambda content: gzip.compress(content, compresslevel=9, mtime=0),
+    "xz": lambda content: lzma.compress(content, preset=9),
+}
+
+
+def compress_file(file_path, formats):
+    """
+    Write a compressed sibling of a file for every format, e.g. words.json.gz next to words.json.
+
+    :param file_path: Path to the file
+    :param formats: Compression formats (keys of COMPRESSORS)
+    :return: Dictionary mapping each format to the size of its compressed file in bytes
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    sizes = {}
+    for compression_format in formats:
+        compressed = COMPRESSORS[compression_format](content)
+        with open(f"{file_path}.{compression_format}", "wb") as f:
+            f.write(compressed)
+        sizes[compression_format] = len(compressed)
+    return sizes
+
+
+def compress_directory(directory, formats=("gz",), previous_dir=None, workers=None):
+    """
+    Write compressed siblings of all the JSON files of a directory, in parallel across a process pool.
+
+    A manifest records the SHA-256 hash of every compressed file. When a previous version of the
+    directory is given, files whose hash is unchanged reuse its compressed siblings instead of being
+    compressed again.
+
+    :param directory: The directory holding the JSON files
+    :param formats: Compression formats (keys of COMPRESSORS)
+    :param previous_dir: Previous version of the directory, with its manifest and compressed files (optional)
+    :param workers: Number of worker processes (None uses the number of CPUs)
+    :return: The manifest, mapping each JSON file (relative to the directory) to its hash and sizes
+    """
+    previous_files = {}
+    previous_manifest_file = os.path.join(previous_dir, COMPRESSION_MANIFEST_FILE) if previous_dir else None
+    if previous_manifest_file and os.path.exists(previous_manifest_file):
+        with open(previous_manifest_file, "r", encoding="utf-8") as f:
+            previous_files = json.load(f)["files"]
+
+    relative_paths = sorted(
+        os.path.relpath(os.path.join(dir_path, file_name), directory)
+        for dir_path, _, file_names in os.walk(directory)
+        for file_name in file_names
+        if file_name.endswith(".json") and file_name != COMPRESSION_MANIFEST_FILE)
+
+    files = {}
+    to_compress = []
+    for relative_path in relative_paths:
+        file_path = os.path.join(directory, relative_path)
+        entry = {"sha256": hash_file(file_path), "bytes": os.path.getsize(file_path)}
+        files[relative_path] = entry
+
+        previous_entry = previous_files.get(relative_path, {})
+        previous_siblings = [
+            os.path.join(previous_dir, f"{relative_path}.{compression_format}") for compression_format in formats]
+        if (previous_entry.get("sha256") == entry["sha256"]
+                and all(compression_format in previous_entry for compression_format in formats)
+                and all(os.path.exists(sibling) for sibling in previous_siblings)):
+            for compression_format, sibling in zip(formats, previous_siblings):
+                shutil.copyfile(sibling, f"{file_path}.{compression_format}")
+                entry[compression_format] = previous_entry[compression_format]
+            entry["reused"] = True
+        else:
+            to_compress.append(relative_path)
+
+    if to_compress:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            paths = [os.path.join(directory, relative_path) for relative_path in to_compress]
+            for relative_path, sizes in zip(to_compress, executor.map(compress_file, paths, [formats] * len(paths))):
+                files[relative_path].update(sizes)
+
+    manifest = {"formats": list(formats), "files": files}
+    with open(os.path.join(directory, COMPRESSION_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"Compressed {len(to_compress)} files ({len(files) - len(to_compress)} unchanged, reused) "
+          f"to {', '.join(formats)}")
+    return manifest
+
+
+def compression_size_report(manifest, minified_suffix="_min"):
+    """
+    Build a size report from a compression manifest, with one row per artifact.
+
+    The readable and minified versions of an artifact (name.json and name_min.json) share a row,
+    with the compressed sizes of the minified version (or of the only version there is).
+
+    :param manifest: The compression manifest, as returned by compress_directory
+    :param minified_suffix: Suffix of the minified version's file name
+    :return: List of rows with the artifact name and its raw, minified and compressed sizes in bytes
+    """
+    rows = {}
+    for relative_path, entry in manifest["files"].items():
+        base_path = relative_path[:-len(".json")]
+        minified = base_path.endswith(minified_suffix)
+        artifact = base_path[:-len(minified_suffix)] if minified else base_path
+        row = rows.setdefault(artifact, {"artifact": artifact, "raw": None, "minified": None})
+        row["minified" if minified else "raw"] = entry["bytes"]
+        if minified or not any(compression_format in row for compression_format in manifest["formats"]):
+            row.update({compression_format: entry[compression_format] for compression_format in manifest["formats"]})
+    return [rows[artifact] for artifact in sorted(rows)]
+
+
+def print_compression_size_report(report, formats, largest=10):
+    """
+    Print the size report of the largest artifacts, followed by the totals of all of them.
+
+    :param report: The rows, as returned by compression_size_report
+    :param formats: Compression formats (keys of COMPRESSORS)
+    :param largest: Number of artifacts to list
+    :return: None
+    """
+    columns = ["raw", "minified", *formats]
+    print(f"\n{'artifact':<56}" + "".join(f"{column:>12}" for column in columns))
+    for row in sorted(report, key=lambda row: row["raw"] or row["minified"] or 0, reverse=True)[:largest]:
+        print(f"{row['artifact']:<56}" + "".join(
+            f"{'-' if row.get(column) is None else row[column]:>12}" for column in columns))
+    print(f"{f'total ({len(report)} artifacts)':<56}" + "".join(
+        f"{sum(row.get(column) or 0 for row in report):>12}" for column in columns))
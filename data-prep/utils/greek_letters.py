@@ -0,0 +1,63 @@
+import unicodedata
+
+# The 24 letters of the Greek Scrabble alphabet, in alphabetical order
+GREEK_LETTERS = "ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ"
+
+# Letter codes start at 1, so 0 can be used as padding in fixed-width arrays.
+# The codes follow the alphabetical (and Unicode) order of the letters, so sorting
+# encoded words gives the same order as sorting the words themselves.
+LETTER_CODES = {letter: code for code, letter in enumerate(GREEK_LETTERS, start=1)}
+
+# Maximum length of an accepted word
+MAX_WORD_LENGTH = 8
+
+
+def normalize_word(word):
+    """
+    Normalize typed text to the form of the lexicon words: trimmed, without accents or diaeresis, uppercase.
+
+    For example "λέξη", "Λέξη" and "ΛΈΞΗ" all become "ΛΕΞΗ", and a final "ς" becomes "Σ".
+
+    :param word: The text to normalize
+    :return: The normalized word
+    """
+    decomposed = unicodedata.normalize("NFD", word.strip())
+    return "".join(character for character in decomposed if not unicodedata.combining(character)).upper()
+
+
+def encode_word(word, width=MAX_WORD_LENGTH):
+    """
+    Encode a word as a fixed-width array of letter codes, padded with zeros.
+
+    :param word: The word to encode (uppercase Greek letters)
+    :param width: The number of letter slots
+    :return: The encoded word as bytes, or None if the word is too long or has letters outside the alphabet
+    """
+    if len(word) > width:
+        return None
+    try:
+        codes = bytes(LETTER_CODES[letter] for letter in word)
+    except KeyError:
+        return None
+    return codes.ljust(width, b"\0")
+
+
+def decode_word(codes):
+    """
+    Decode a fixed-width array of letter codes back to a word.
+
+    :param codes: The letter codes (bytes or any iterable of ints), padded with zeros
+    :return: The decoded word
+    """
+    return "".join(GREEK_LETTERS[code - 1] for code in codes if code)
+
+
+# Number of tiles of every letter in the Greek Scrabble set (see src/utils/letterData.ts)
+TILE_COUNTS = {
+    'Α': 12, 'Β': 1, 'Γ': 2, 'Δ': 2, 'Ε': 8, 'Ζ': 1, 'Η': 7, 'Θ': 1,
+    'Ι': 8, 'Κ': 4, 'Λ': 3, 'Μ': 3, 'Ν': 6, 'Ξ': 1, 'Ο': 9, 'Π': 4,
+    'Ρ': 5, 'Σ': 7, 'Τ': 8, 'Υ': 4, 'Φ': 1, 'Χ': 1, 'Ψ': 1, 'Ω': 3,
+}
+
+# Number of blank tiles in the Greek Scrabble set
+BLANK_TILE_COUNT = 2
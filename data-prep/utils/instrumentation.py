@@ -0,0 +1,173 @@
+import cProfile
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.helpers import save_to_json
+from utils.stage_cache import MTIME_RESOLUTION
+
+
+def path_size(path, modified_since=None):
+    """
+    Calculate the size of a file, or the total size of the files in a directory.
+
+    :param path: Path to a file or directory
+    :param modified_since: Only count the files modified at or after this time (as returned by time.time())
+    :return: Size in bytes (0 if the path does not exist)
+    """
+    if os.path.isdir(path):
+        file_paths = [
+            os.path.join(dir_path, file_name)
+            for dir_path, _, file_names in os.walk(path)
+            for file_name in file_names]
+    else:
+        file_paths = [path] if os.path.exists(path) else []
+
+    return sum(
+        os.path.getsize(file_path) for file_path in file_paths
+        if modified_since is None or os.path.getmtime(file_path) >= modified_since)
+
+
+def children_cpu_seconds():
+    """
+    CPU time (user + system) used by the terminated child processes, such as the extractor workers.
+
+    Always 0 on Windows, where child process times are not reported.
+
+    :return: CPU time in seconds
+    """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class RunReport:
+    """
+    Per-stage instrumentation of a pipeline run, written to a JSON run report.
+
+    For every stage the report holds the wall time, the CPU time (of this process and of the worker
+    processes it started), the peak memory allocated by Python during the stage (from tracemalloc),
+    the records going in and out, the bytes read and written and, for the PDF extractors, the pages
+    processed per second. Each stage can also be profiled with cProfile, one dump per stage.
+
+    tracemalloc slows down allocation-heavy code (the pure Python JSON encoder used for indented
+    output runs several times slower), so memory tracing can be turned off for accurate timings.
+
+    When neither a report file nor a profile directory is given, stages run without any instrumentation.
+    """
+
+    def __init__(self, report_file=None, profile_dir=None, trace_memory=True):
+        """
+        :param report_file: Path to the JSON run report (None skips writing the report)
+        :param profile_dir: Directory where a cProfile dump is written per stage (None disables profiling)
+        :param trace_memory: Whether to measure the peak memory of every stage with tracemalloc
+        """
+        self.report_file = report_file
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.enabled = report_file is not None or profile_dir is not None
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self._start_time = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, inputs=(), outputs=(), records_in=None, pages=None):
+        """
+        Instrument the code run inside the `with` block as one stage.
+
+        The stage metrics are yielded as a dictionary, so the caller can fill in what only it knows,
+        e.g. metrics["records_out"] or metrics["status"] = "cached". They can still be updated after
+        the block, until the report is saved.
+
+        :param name: The stage name
+        :param inputs: Paths of the files (or directories) the stage reads
+        :param outputs: Paths of the files (or directories) the stage writes
+        :param records_in: Number of records going into the stage, if known
+        :param pages: Number of PDF pages the stage processes, if any
+        :return: Context manager yielding the stage metrics
+        """
+        metrics = {"name": name, "status": "ran", "records_in": records_in, "records_out": None}
+        if not self.enabled:
+            yield metrics
+            return
+
+        # tracemalloc is started by the first stage and kept running; only the peak is reset per stage
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile() if self.profile_dir else None
+        started_at = time.time()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_children_cpu = children_cpu_seconds()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield metrics
+        except BaseException:
+            metrics["status"] = "failed"
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            wall_seconds = time.perf_counter() - start_wall
+            metrics.update({
+                "wall_seconds": round(wall_seconds, 4),
+                "cpu_seconds": round(time.process_time() - start_cpu, 4),
+                "children_cpu_seconds": round(children_cpu_seconds() - start_children_cpu, 4),
+                "peak_memory_bytes": tracemalloc.get_traced_memory()[1] if self.trace_memory else None,
+                "bytes_read": sum(path_size(input_path) for input_path in inputs),
+                # Only count the outputs written during this stage (not cached ones)
+                "bytes_written": sum(
+                    path_size(output_path, modified_since=started_at - MTIME_RESOLUTION) for output_path in outputs),
+            })
+            if pages is not None and metrics["status"] == "ran":
+                metrics["pages"] = pages
+                metrics["pages_per_second"] = round(pages / wall_seconds, 2) if wall_seconds else None
+
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profile_file = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(profile_file)
+                metrics["profile_file"] = profile_file
+
+            self.stages.append(metrics)
+
+    def save(self):
+        """
+        Stop tracing memory, print a per-stage summary and write the run report.
+
+        :return: The run report as a dictionary
+        """
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._start_time, 4),
+            "python_version": platform.python_version(),
+            "trace_memory": self.trace_memory,
+            "profile_dir": self.profile_dir,
+            "stages": self.stages,
+        }
+        if not self.enabled:
+            return report
+
+        print(f"\n{'stage':<28} {'status':<8} {'wall s':>8} {'cpu s':>8} {'peak MB':>9} {'in':>8} {'out':>8}")
+        for metrics in self.stages:
+            peak_memory = metrics["peak_memory_bytes"]
+            print(f"{metrics['name']:<28} {metrics['status']:<8} {metrics['wall_seconds']:>8.2f} "
+                  f"{metrics['cpu_seconds'] + metrics['children_cpu_seconds']:>8.2f} "
+                  f"{'-' if peak_memory is None else f'{peak_memory / 2 ** 20:.1f}':>9} "
+                  f"{'-' if metrics['records_in'] is None else metrics['records_in']:>8} "
+                  f"{'-' if metrics['records_out'] is None else metrics['records_out']:>8}")
+
+        if self.report_file:
+            os.makedirs(os.path.dirname(self.report_file) or ".", exist_ok=True)
+            save_to_json(self.report_file, report)
+        return report
@@ -0,0 +1,248 @@
+import ast
+import hashlib
+import inspect
+import json
+import os
+import time
+
+from utils.helpers import save_to_json
+
+
+# The data-prep directory: only the modules under it are hashed into the stage keys
+CODE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files whose code is shared by every stage, so a change to them invalidates all stages
+SHARED_CODE_FILES = [os.path.join(CODE_ROOT, "utils", "helpers.py")]
+
+# Slack (in seconds) for file systems with a coarse modification time resolution
+MTIME_RESOLUTION = 2
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """
+    Calculate the SHA-256 hash of a file's content.
+
+    :param file_path: Path to the file
+    :param chunk_size: Number of bytes read at a time
+    :return: The hex digest of the file's content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def module_file(module_name):
+    """
+    Find the source file of a module under CODE_ROOT.
+
+    :param module_name: The dotted module name, e.g. "lexicon.hook_index"
+    :return: Path to the module's source file, or None for modules outside CODE_ROOT (standard library, packages)
+    """
+    file_path = os.path.join(CODE_ROOT, *module_name.split(".")) + ".py"
+    return file_path if os.path.isfile(file_path) else None
+
+
+def local_imports(file_path):
+    """
+    Find the source files of the modules under CODE_ROOT that a file imports.
+
+    :param file_path: Path to a Python source file
+    :return: Set of paths to the imported source files
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), file_path)
+
+    module_names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            module_names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # "from package import module" imports a module, "from module import name" does not
+            module_names.append(node.module)
+            module_names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+
+    return {code_file for code_file in map(module_file, module_names) if code_file is not None}
+
+
+def code_files(file_path):
+    """
+    Find the source files a module depends on: the module itself and everything under CODE_ROOT it imports,
+    directly or through other local modules.
+
+    :param file_path: Path to the module's source file
+    :return: Sorted list of paths to the source files
+    """
+    found = set()
+    pending = [os.path.abspath(file_path)]
+    while pending:
+        code_file = pending.pop()
+        if code_file not in found:
+            found.add(code_file)
+            pending.extend(local_imports(code_file))
+    return sorted(found)
+
+
+def compute_stage_key(name, func, params, inputs=(), upstream_keys=()):
+    """
+    Calculate the cache key of a pipeline stage.
+
+    The key covers the stage's code, its parameters, the content of its external input files and the keys of the stages it depends on.
+    Intermediate files produced by earlier stages are covered through the upstream keys, so they do not
+    need to be re-hashed.
+
+    The stage's code is the module defining the stage function, every module under the data-prep directory
+    it imports, transitively (found statically from the import statements, so a module imported only inside
+    a function counts too), and the shared helpers. Installed packages and the standard library are not hashed.
+
+    :param name: The stage name
+    :param func: The function that runs the stage
+    :param params: The parameters the stage function is called with
+    :param inputs: Paths of the external input files of the stage
+    :param upstream_keys: Cache keys of the stages this stage depends on
+    :return: The hex digest identifying this stage run
+    """
+    digest = hashlib.sha256()
+    digest.update(name.encode("utf-8"))
+
+    # Code version
+    for code_file in sorted({*code_files(inspect.getsourcefile(func)), *SHARED_CODE_FILES}):
+        digest.update(hash_file(code_file).encode("utf-8"))
+
+    # Parameters
+    digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+    # Inputs
+    for input_file in inputs:
+        digest.update(hash_file(input_file).encode("utf-8"))
+    for upstream_key in upstream_keys:
+        digest.update(upstream_key.encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Stage manifest that lets the pipeline skip the stages whose inputs, parameters and code are unchanged.
+    """
+
+    def __init__(self, manifest_file="assets/data/stage_manifest.json", enabled=True):
+        """
+        :param manifest_file: Path to the JSON file where the stage manifest is kept
+        :param enabled: When False every stage runs, but the manifest is still updated
+        """
+        self.manifest_file = manifest_file
+        self.enabled = enabled
+        self.manifest = {"stages": {}}
+
+        if os.path.exists(manifest_file):
+            try:
+                with open(manifest_file, "r", encoding="utf-8") as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable stage manifest {manifest_file}: {e}")
+
+    def is_fresh(self, name, key, outputs):
+        """
+        Check whether a stage already ran with the given key, writing the given outputs, and they are still in place.
+
+        :param name: The stage name
+        :param key: The current cache key of the stage
+        :param outputs: Paths of the output files of the stage
+        :return: True if the cached outputs can be reused
+        """
+        record = self.manifest["stages"].get(name)
+        return (
+            self.enabled
+            and record is not None
+            and record.get("key") == key
+            and record.get("outputs") == list(outputs)
+            and all(os.path.exists(output_file) for output_file in outputs)
+        )
+
+    def stage_key(self, name, func, params, inputs=(), upstream_keys=(), ignored_params=()):
+        """
+        Calculate the cache key of a stage, leaving out the parameters that do not affect its output.
+
+        :param name: The stage name
+        :param func: The function that runs the stage
+        :param params: Keyword arguments the stage function is called with
+        :param inputs: Paths of the external input files of the stage
+        :param upstream_keys: Cache keys of the stages this stage depends on
+        :param ignored_params: Names of parameters that do not affect the output (e.g. number of workers)
+        :return: The cache key of the stage
+        """
+        key_params = {param: value for param, value in params.items() if param not in ignored_params}
+        return compute_stage_key(name, func, key_params, inputs, upstream_keys)
+
+    def invalidate(self, name):
+        """
+        Forget a stage, so an interrupted run is never considered fresh.
+
+        :param name: The stage name
+        :return: None
+        """
+        if self.manifest["stages"].pop(name, None) is not None:
+            self.save()
+
+    def record(self, name, key, outputs, started_at):
+        """
+        Record a completed stage in the manifest, if all its outputs were written during the run.
+
+        :param name: The stage name
+        :param key: The cache key of the stage
+        :param outputs: Paths of the output files of the stage
+        :param started_at: Time (as returned by time.time()) the stage started running
+        :return: True if the stage was recorded
+        """
+        # The processors report errors instead of raising, so make sure the outputs were actually written
+        missing_outputs = [
+            output_file for output_file in outputs
+            if not os.path.exists(output_file) or os.path.getmtime(output_file) < started_at - MTIME_RESOLUTION
+        ]
+        if missing_outputs:
+            print(f"Stage '{name}' did not produce {', '.join(missing_outputs)}; not caching it.")
+            return False
+
+        self.manifest["stages"][name] = {
+            "key": key,
+            "outputs": list(outputs),
+            "duration_seconds": round(time.time() - started_at, 3),
+        }
+        self.save()
+        return True
+
+    def run(self, name, func, params, outputs, inputs=(), upstream_keys=(), force=False, ignored_params=()):
+        """
+        Run a stage, unless its cached outputs are up to date.
+
+        :param name: The stage name
+        :param func: The function that runs the stage
+        :param params: Keyword arguments the stage function is called with
+        :param outputs: Paths of the output files of the stage
+        :param inputs: Paths of the external input files of the stage
+        :param upstream_keys: Cache keys of the stages this stage depends on
+        :param force: Run the stage even if its cached outputs are up to date
+        :param ignored_params: Names of parameters that do not affect the output (e.g. number of workers)
+        :return: Tuple of (key, ran): the cache key of the stage and whether it ran (False if its outputs were reused)
+        """
+        key = self.stage_key(name, func, params, inputs, upstream_keys, ignored_params)
+
+        if not force and self.is_fresh(name, key, outputs):
+            print(f"Stage '{name}' is up to date, reusing cached outputs.")
+            return key, False
+
+        self.invalidate(name)
+        started_at = time.time()
+        func(**params)
+        self.record(name, key, outputs, started_at)
+        return key, True
+
+    def save(self):
+        """
+        Save the stage manifest to its JSON file.
+
+        :return: None
+        """
+        save_to_json(self.manifest_file, self.manifest)
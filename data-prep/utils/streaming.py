@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterator
+from itertools import groupby
+
+
+# Number of records sorted in memory before they are spilled to a run file
+DEFAULT_SORT_CHUNK_SIZE = 100000
+
+# Maximum number of run files merged at once; more runs are merged in several passes
+MAX_MERGE_FAN_IN = 64
+
+# Number of characters read at a time by iter_json_array
+READ_SIZE = 64 * 1024
+NON_WHITESPACE = re.compile(r"\S")
+
+# Number of characters buffered by write_json before they are written
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+def read_ndjson(file_path):
+    """
+    Read the records of a line-delimited JSON (NDJSON) file one at a time.
+
+    :param file_path: Path to the NDJSON file
+    :return: Generator of the records, skipping blank lines
+    """
+    decode = json.JSONDecoder().raw_decode
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.isspace():
+                yield decode(line)[0]
+
+
+def write_ndjson(file_path, records):
+    """
+    Write records to a line-delimited JSON (NDJSON) file, one compact JSON document per line.
+
+    :param file_path: Path to the NDJSON file
+    :param records: Iterable of records
+    :return: Number of records written
+    """
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def iter_json_array(file_path, key=None):
+    """
+    Read the items of a JSON array one at a time, without loading the whole file.
+
+    The array is either the whole document or the value of a top-level key, e.g. the "words" of
+    {"words": [...]}; in that case the key must come first in its object.
+
+    :param file_path: Path to the JSON file
+    :param key: Top-level key holding the array (None when the document is the array)
+    :return: Generator of the items
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        end_of_file = False
+
+        def skip_whitespace():
+            """Move past whitespace, reading more of the file as needed; False at the end of the file."""
+            nonlocal buffer, position, end_of_file
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer):
+                    return True
+                if end_of_file:
+                    return False
+                # Drop what was already parsed before reading more
+                buffer, position = f.read(READ_SIZE), 0
+                end_of_file = not buffer
+
+        def expect(token):
+            nonlocal buffer, position, end_of_file
+            if not skip_whitespace():
+                raise ValueError(f"Expected '{token}' in {file_path}")
+            # The token may be cut at the end of the buffer
+            while len(buffer) - position < len(token) and not end_of_file:
+                more = f.read(READ_SIZE)
+                end_of_file = not more
+                buffer, position = buffer[position:] + more, 0
+            if not buffer.startswith(token, position):
+                raise ValueError(f"Expected '{token}' in {file_path}")
+            position += len(token)
+
+        if key is not None:
+            expect("{")
+            expect(json.dumps(key, ensure_ascii=False))
+            expect(":")
+        expect("[")
+
+        first = True
+        while True:
+            if not skip_whitespace():
+                raise ValueError(f"Unterminated array in {file_path}")
+            if buffer[position] == "]":
+                return
+            if not first:
+                expect(",")
+                skip_whitespace()
+            first = False
+
+            # An item cut at the end of the buffer may fail to parse, or parse as a prefix of itself
+            # (e.g. 1.5 out of 1.5e10), so it is only accepted once the separator after it is read
+            while True:
+                try:
+                    item, item_end = decoder.raw_decode(buffer, position)
+                    separator = NON_WHITESPACE.search(buffer, item_end)
+                    if separator and separator.group() in (",", "]") or end_of_file:
+                        break
+                except json.JSONDecodeError:
+                    if end_of_file:
+                        raise
+                more = f.read(READ_SIZE)
+                end_of_file = not more
+                buffer, position = buffer[position:] + more, 0
+            position = item_end
+            yield item
+
+
+def iter_records(file_path, key=None):
+    """
+    Read the records of an NDJSON file (.ndjson) or of a JSON array one at a time.
+
+    :param file_path: Path to the file
+    :param key: Top-level key holding the array of a JSON file (None when the document is the array)
+    :return: Generator of the records
+    """
+    if file_path.endswith(".ndjson"):
+        return read_ndjson(file_path)
+    return iter_json_array(file_path, key)
+
+
+class RecordFile:
+    """
+    The records of an NDJSON file or JSON array file, read lazily every time they are iterated.
+
+    Stands in for a list of records in the streaming stages: it can be iterated several times
+    and counted, without ever being held in memory.
+    """
+
+    def __init__(self, file_path, key=None, count=None):
+        """
+        :param file_path: Path to the file
+        :param key: Top-level key holding the array of a JSON file (None when the document is the array)
+        :param count: Number of records, when already known
+        """
+        self.file_path = file_path
+        self.key = key
+        self.count = count
+
+    def __iter__(self):
+        return iter_records(self.file_path, self.key)
+
+    def __len__(self):
+        if self.count is None:
+            self.count = sum(1 for _ in self)
+        return self.count
+
+
+class JsonObjectStream:
+    """Iterable of (key, value) pairs written by write_json as a JSON object, one member at a time."""
+
+    def __init__(self, items):
+        """
+        :param items: Iterable of (key, value) pairs; the keys are strings and must be unique
+        """
+        self.items = items
+
+
+def _encode_streamed(value, indent, level):
+    """
+    Yield the JSON text of a value as json.dumps would format it, nested level deep.
+
+    Iterators are encoded as arrays and JsonObjectStream as objects, one item at a time;
+    any other value is encoded at once.
+    """
+    if isinstance(value, JsonObjectStream):
+        opening, closing = "{", "}"
+        key_separator = ":" if indent is None else ": "
+        members = ((json.dumps(key, ensure_ascii=False) + key_separator, member) for key, member in value.items)
+    elif isinstance(value, Iterator):
+        opening, closing = "[", "]"
+        members = (("", member) for member in value)
+    else:
+        if indent is None:
+            yield json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        else:
+            yield json.dumps(value, ensure_ascii=False, indent=indent).replace("\n", "\n" + " " * (indent * level))
+        return
+
+    empty = True
+    for prefix, member in members:
+        if indent is None:
+            yield (opening if empty else ",") + prefix
+        else:
+            yield (opening if empty else ",") + "\n" + " " * (indent * (level + 1)) + prefix
+        empty = False
+        yield from _encode_streamed(member, indent, level + 1)
+    if empty:
+        yield opening + closing
+    elif indent is None:
+        yield closing
+    else:
+        yield "\n" + " " * (indent * level) + closing
+
+
+def write_json(file_path, value, indent=None):
+    """
+    Write a JSON document whose arrays and objects may be streamed.
+
+    Iterators (e.g. generators) are written as arrays and JsonObjectStream as objects, one item at
+    a time, so they are never held in memory; they can be nested in each other. The file is
+    byte-for-byte what json.dumps(value, ensure_ascii=False, indent=indent) gives for the same
+    data held in lists and dictionaries (minified, with no spaces, when indent is None).
+
+    :param file_path: Path to the JSON file
+    :param value: The document
+    :param indent: Indentation of the readable format (None for the minified format)
+    :return: Dictionary with the size in bytes and the SHA-256 checksum of the written file
+    """
+    size = 0
+    digest = hashlib.sha256()
+    chunks = []
+    buffered = 0
+    with open(file_path, "wb") as f:
+        for text in _encode_streamed(value, indent, 0):
+            chunks.append(text)
+            buffered += len(text)
+            if buffered >= WRITE_BUFFER_SIZE:
+                content = "".join(chunks).encode("utf-8")
+                f.write(content)
+                size += len(content)
+                digest.update(content)
+                chunks = []
+                buffered = 0
+        content = "".join(chunks).encode("utf-8")
+        f.write(content)
+        size += len(content)
+        digest.update(content)
+    return {"bytes": size, "sha256": digest.hexdigest()}
+
+
+def _merge_runs(run_files, key, output_file=None):
+    """Merge sorted run files, into a new run file or as a generator when output_file is None."""
+    readers = [read_ndjson(run_file) for run_file in run_files]
+    merged = heapq.merge(*readers, key=key)
+    if output_file is None:
+        return merged
+    write_ndjson(output_file, merged)
+    return None
+
+
+def external_sort(records, key, spill_dir=None, chunk_size=DEFAULT_SORT_CHUNK_SIZE):
+    """
+    Sort records that may not fit in memory.
+
+    The records are sorted in chunks of chunk_size, each chunk spilled to an NDJSON run file,
+    and the runs are merged lazily (in several passes when there are more than MAX_MERGE_FAN_IN).
+    The sort is stable, and at most chunk_size records plus one record per merged run are held
+    in memory. The run files are removed once the sorted records have been read.
+
+    :param records: Iterable of JSON-serializable records (lists rather than tuples, as the spilled
+        records are read back from JSON)
+    :param key: Function returning the sort key of a record
+    :param spill_dir: Directory for the run files (None uses the system temporary directory)
+    :param chunk_size: Number of records sorted in memory at a time
+    :return: Generator of the sorted records
+    """
+    run_dir = tempfile.mkdtemp(prefix="external_sort_", dir=spill_dir)
+    try:
+        run_files = []
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                run_files.append(os.path.join(run_dir, f"run_{len(run_files):05d}.ndjson"))
+                write_ndjson(run_files[-1], sorted(chunk, key=key))
+                chunk = []
+
+        # Everything fitted in one chunk: no need to go through the disk
+        if not run_files:
+            yield from sorted(chunk, key=key)
+            return
+        if chunk:
+            run_files.append(os.path.join(run_dir, f"run_{len(run_files):05d}.ndjson"))
+            write_ndjson(run_files[-1], sorted(chunk, key=key))
+            chunk = []
+
+        # Merge the runs in order, in groups of MAX_MERGE_FAN_IN, which keeps the sort stable
+        merge_pass = 0
+        while len(run_files) > MAX_MERGE_FAN_IN:
+            merged_files = []
+            for start in range(0, len(run_files), MAX_MERGE_FAN_IN):
+                merged_files.append(os.path.join(run_dir, f"pass_{merge_pass}_{len(merged_files):05d}.ndjson"))
+                _merge_runs(run_files[start:start + MAX_MERGE_FAN_IN], key, merged_files[-1])
+                for run_file in run_files[start:start + MAX_MERGE_FAN_IN]:
+                    os.remove(run_file)
+            run_files = merged_files
+            merge_pass += 1
+
+        yield from _merge_runs(run_files, key)
+    finally:
+        for name in os.listdir(run_dir):
+            os.remove(os.path.join(run_dir, name))
+        os.rmdir(run_dir)
+
+
+def group_sorted(records, key):
+    """
+    Group consecutive records with the same key, e.g. the output of external_sort.
+
+    :param records: Iterable of records sorted by key
+    :param key: Function returning the grouping key of a record
+    :return: Generator of (key, list of records) pairs
+    """
+    for group_key, group in groupby(records, key=key):
+        yield group_key, list(group)
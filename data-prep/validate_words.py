@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from lexicon.binary_lexicon import BinaryLexicon
+from utils.helpers import extract_words
+
+
+# Number of input lines sent to a worker at a time
+CHUNK_SIZE = 5000
+
+# Number of chunks queued per worker; bounds the memory used by pending input and results
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Binary lexicon opened once per worker process by init_worker
+_worker_lexicon = None
+
+
+def init_worker(lexicon_file):
+    """
+    Open the binary lexicon in a worker process.
+
+    The lexicon is memory-mapped, so all the workers share the same pages of the file.
+
+    :param lexicon_file: Path to the binary lexicon file
+    :return: None
+    """
+    global _worker_lexicon
+    _worker_lexicon = BinaryLexicon(lexicon_file)
+
+
+def validate_lines(lines, lexicon=None):
+    """
+    Validate the words of a chunk of input lines.
+
+    Every line is normalized like the extracted PDF text (split on whitespace and uppercased), so a
+    line with several words gives several results.
+
+    :param lines: The input lines
+    :param lexicon: The binary lexicon (defaults to the one opened by init_worker)
+    :return: Tuple of (NDJSON text with one result per word, number of words, number of valid words)
+    """
+    lexicon = lexicon or _worker_lexicon
+    results = []
+    valid_count = 0
+
+    for line in lines:
+        for word in extract_words(line):
+            entry = lexicon.lookup(word)
+            if entry is None:
+                result = {"word": word, "valid": False}
+            else:
+                valid_count += 1
+                result = {
+                    "word": word,
+                    "valid": True,
+                    "lemma": entry["lemma"],
+                    "dictionary": entry["dictionary"],
+                    "points": entry["points"],
+                }
+            results.append(json.dumps(result, ensure_ascii=False) + "\n")
+
+    return "".join(results), len(results), valid_count
+
+
+def read_chunks(input_file, chunk_size=CHUNK_SIZE):
+    """
+    Read a text file lazily in chunks of lines.
+
+    :param input_file: Iterable of lines (an open text file)
+    :param chunk_size: Number of lines per chunk
+    :return: Generator of lists of lines
+    """
+    while True:
+        chunk = list(islice(input_file, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_words(
+        input_file,
+        output_file,
+        lexicon_file="assets/data/bin/scrabble_lexicon.bin",
+        workers=os.cpu_count(),
+        chunk_size=CHUNK_SIZE):
+    """
+    Validate a word list of any size against the binary lexicon, streaming NDJSON results.
+
+    The input is read in chunks of lines that are validated by a pool of processes. Only a few
+    chunks per worker are in flight at any time and their results are written as soon as they are
+    ready, in input order, so memory use does not depend on the size of the input.
+
+    :param input_file: The open input text file (one or more words per line)
+    :param output_file: The open output text file, receiving one JSON object per word
+    :param lexicon_file: Path to the binary lexicon file (see export_binary_lexicon.py)
+    :param workers: Number of worker processes to use (1 validates in this process)
+    :param chunk_size: Number of input lines per chunk
+    :return: Tuple of (number of words, number of valid words)
+    """
+    word_count = 0
+    valid_count = 0
+    chunks = read_chunks(input_file, chunk_size)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(lexicon_file,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(validate_lines, chunk))
+                if len(pending) < workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    continue
+                ndjson, words, valid = pending.popleft().result()
+                output_file.write(ndjson)
+                word_count += words
+                valid_count += valid
+
+            while pending:
+                ndjson, words, valid = pending.popleft().result()
+                output_file.write(ndjson)
+                word_count += words
+                valid_count += valid
+    else:
+        with BinaryLexicon(lexicon_file) as lexicon:
+            for chunk in chunks:
+                ndjson, words, valid = validate_lines(chunk, lexicon)
+                output_file.write(ndjson)
+                word_count += words
+                valid_count += valid
+
+    return word_count, valid_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validate a word list against the binary lexicon, writing one JSON result per word (NDJSON).")
+    parser.add_argument("input_file", help="Text file with one or more words per line ('-' reads standard input)")
+    parser.add_argument("-o", "--output-file", default="-",
+                        help="NDJSON output file ('-' writes to standard output, the default)")
+    parser.add_argument("--lexicon-file", default="assets/data/bin/scrabble_lexicon.bin",
+                        help="Binary lexicon file, built by export_binary_lexicon.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Number of input lines per chunk (default: {CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    input_stream = sys.stdin if args.input_file == "-" else open(args.input_file, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output_file == "-" else open(args.output_file, "w", encoding="utf-8")
+
+    start_time = time.perf_counter()
+    try:
+        total_words, total_valid = validate_words(
+            input_stream, output_stream, args.lexicon_file, args.workers, args.chunk_size)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    elapsed = time.perf_counter() - start_time
+
+    # Statistics go to standard error, so they never mix with NDJSON written to standard output
+    print(f"{total_words} words validated ({total_valid} valid, {total_words - total_valid} invalid) "
+          f"in {elapsed:.2f} s ({total_words / elapsed if elapsed else 0:.0f} words/s)", file=sys.stderr)